@@ -1,6 +1,7 @@
 """
 应用配置文件
 """
+import os
 import tempfile
 
 class AppConfig:
@@ -10,11 +11,78 @@ class AppConfig:
     UPLOAD_FOLDER = tempfile.gettempdir()
     MAX_CONTENT_LENGTH = 30 * 1024 * 1024  # 最大 30MB
     ALLOWED_EXTENSIONS = {'log', 'txt'}
+    COMPRESSED_EXTENSIONS = {'gz', 'zst', 'zip'}  # .log.gz / .log.zst 及 zip 压缩包
+    DECOMPRESSED_MAX_BYTES = 2 * 1024 * 1024 * 1024  # 解压后最大 2GB
+    UPLOAD_SPOOL_MAX_MEMORY = 8 * 1024 * 1024  # 上传内容超过 8MB 才写入磁盘临时文件
+    PARSE_WORKERS = None  # 并行解析（mode=parallel）的进程数，None 表示 CPU 核数
     
+    # 分析结果缓存配置（以上传内容哈希为键）
+    ANALYSIS_CACHE_MAX_ENTRIES = 32
+    ANALYSIS_CACHE_MAX_BYTES = 256 * 1024 * 1024  # 内存层最大 256MB
+    ANALYSIS_CACHE_DISK = False  # 是否启用磁盘层
+    ANALYSIS_CACHE_DIR = os.path.join(UPLOAD_FOLDER, 'log_analyzer_cache')
+    ANALYSIS_CACHE_DISK_MAX_BYTES = 1024 * 1024 * 1024  # 磁盘层最大 1GB
+    
+    # 瓦片金字塔配置（缩放查询使用）
+    TILE_PYRAMID_MAX_DATASETS = 8
+    TILE_PYRAMID_MAX_BYTES = 512 * 1024 * 1024  # 最大 512MB
+
+    # 服务端图表渲染缓存（PNG，按数据哈希和尺寸）
+    CHART_CACHE_MAX_ENTRIES = 64
+    CHART_CACHE_MAX_BYTES = 64 * 1024 * 1024  # 最大 64MB
+
+    # 后台分析任务配置（async=1 时使用）
+    ANALYSIS_JOB_WORKERS = 2  # 同时执行的分析任务数
+    ANALYSIS_JOB_MAX_PENDING = 16  # 排队与执行中任务总数上限，超过时返回 503
+    ANALYSIS_JOB_TTL = 600  # 已完成任务结果保留 10 分钟
+
+    # 分块上传配置（单个块仍受 MAX_CONTENT_LENGTH 限制）
+    CHUNKED_UPLOAD_MAX_BYTES = 2 * 1024 * 1024 * 1024  # 文件总大小最大 2GB
+    CHUNKED_UPLOAD_CHUNK_SIZE = 8 * 1024 * 1024  # 建议的块大小 8MB
+    CHUNKED_UPLOAD_MAX_SESSIONS = 16  # 同时进行的上传会话数上限
+    CHUNKED_UPLOAD_TTL = 1800  # 会话空闲 30 分钟后丢弃
+    CHUNKED_UPLOAD_ENABLED = True  # 会话只保存在进程内，多 worker 部署时由 gunicorn.conf.py 关闭
+
+    # matplotlib 加载时机：lazy 首次渲染图表时加载；background 启动后在后台线程加载；
+    # eager 启动时同步加载（原有行为，启动慢约 0.5~1 秒）
+    MATPLOTLIB_PRELOAD = 'lazy'
+
+    # RSS 代理缓存（按订阅源 URL）
+    RSS_CACHE_TTL = 300  # 新鲜期 5 分钟，期间不请求上游
+    RSS_CACHE_MAX_STALE = 3600  # 过期 1 小时内先返回旧数据，后台重新验证
+    RSS_CACHE_MAX_FEEDS = 64  # 最多缓存的订阅源数
+    RSS_FETCH_TIMEOUT = 10  # 上游请求超时（秒）
+    RSS_MAX_ITEMS = 200  # 每个订阅源最多解析的条目数（超出部分不解析）
+    RSS_INDEX_MAX_ITEMS = 500  # 每个订阅源在增量索引中保留的条目数（含已滚出上游的旧条目）
+    RSS_STREAM_POLL_INTERVAL = 60  # 推送模式下每个订阅源的上游轮询间隔（秒）
+    RSS_STREAM_HEARTBEAT = 15  # 推送连接空闲时的保活间隔（秒）
+    # 每个 worker 同时在线的推送连接数上限（每个连接占用一个请求线程）；
+    # None 表示按 WSGI_THREADS 减去为普通请求保留的线程数计算，为 0 时不提供推送（前端改为定时增量刷新）
+    RSS_STREAM_MAX_CLIENTS = None
+    RSS_STREAM_RESERVED_THREADS = 8  # 每个 worker 保留给普通请求的线程数
+    RSS_POOL_HOSTS = 16  # 保留 keep-alive 连接池的上游主机数
+    RSS_POOL_CONNECTIONS_PER_HOST = 4  # 每个上游主机的最大连接数
+    RSS_RETRY_TOTAL = 2  # 连接错误及 429/5xx 的最大重试次数
+    RSS_RETRY_BACKOFF = 0.5  # 重试退避系数（0.5s、1s、2s...）
+    RSS_RETRY_MAX_WAIT = 3  # 每次重试前的最长等待（秒，含上游 Retry-After），应小于 RSS_FETCH_TIMEOUT
+    RSS_AGGREGATE_WORKERS = 8  # 聚合接口并发获取的线程数
+    RSS_AGGREGATE_MAX_FEEDS = 20  # 单次聚合的最大RSS源数
+    RSS_AGGREGATE_DEADLINE = 5  # 聚合默认截止时间（秒），超时的RSS源返回部分结果
+    RSS_AGGREGATE_MAX_DEADLINE = 30  # 客户端可指定的最大截止时间（秒）
+
     # 服务器配置
     HOST = '0.0.0.0'
     PORT = 5002
     DEBUG = False
+
+    # 生产部署（gunicorn -c gunicorn.conf.py wsgi:app）
+    WSGI_WORKERS = 1  # worker 进程数（大于 1 时不支持分块上传，解析本身在进程池中并行）
+    WSGI_THREADS = 16  # 每个 worker 的线程数
+    WSGI_TIMEOUT = 300  # 单个请求超时（秒），需覆盖大文件同步分析
+    # 多 worker 共享状态目录（任务状态、解析后的数据集），None 表示单进程；
+    # WSGI_WORKERS > 1 时由 gunicorn.conf.py 设置，并同时启用分析缓存磁盘层
+    SHARED_STATE_DIR = None
+    SHARED_DATASET_MAX_BYTES = 1024 * 1024 * 1024  # 共享数据集最大 1GB
     
     # CORS 配置
     CORS_ORIGINS = "*"
@@ -1,15 +1,29 @@
 """
 日志分析插件 - PM:INFO 日志文件分析
 """
-from flask import Blueprint, request, jsonify
-from werkzeug.utils import secure_filename
+from flask import Blueprint, Response, request, jsonify, json
+from werkzeug.exceptions import BadRequest
+import io
+import itertools
 import os
-import tempfile
 import logging
 import traceback
+from typing import BinaryIO, Optional, Tuple
 
-from .parser import PMInfoParser
-from .visualizer import PMInfoVisualizer
+from .cache import AnalysisResultCache, hash_stream
+from .compression import IncrementalDecompressor, compression_from_filename, detect_compression, open_decompressed
+from .parallel import parse_parallel
+from .downsample import downsample_series, METHODS, METHOD_LTTB
+from .jobs import AnalysisJobManager, JobFailed, JobQueueFullError, STATUS_DONE, STATUS_FAILED
+from .parser import PMInfoParser, iter_text_lines
+from .pyramid import TilePyramid, query_tiles
+from .shared import SharedDatasetStore
+from .streaming import NDJSON_MIMETYPE, iter_ndjson
+from .uploads import UploadOffsetError, UploadSessionStore
+from .visualizer import PMInfoVisualizer, DEFAULT_DPI, DEFAULT_HEIGHT, DEFAULT_WIDTH, warm_up as warm_up_visualizer
+from .wire import BINARY_MIMETYPE, encode_columns
+from config.settings import AppConfig
+from utils.cache import LRUCache
 from utils.file_utils import allowed_file
 
 logger = logging.getLogger(__name__)
@@ -17,9 +31,388 @@ logger = logging.getLogger(__name__)
 # 创建蓝图
 log_analyzer_bp = Blueprint('log_analyzer', __name__)
 
+# 快速格式检查的行数：前 N 行内必须出现 PM:INFO
+SNIFF_LINES = 100
+
+# 响应格式
+FORMAT_JSON = 'json'
+FORMAT_NDJSON = 'ndjson'
+FORMAT_BINARY = 'binary'
+RESPONSE_MIMETYPES = {
+    FORMAT_JSON: 'application/json',
+    FORMAT_NDJSON: NDJSON_MIMETYPE,
+    FORMAT_BINARY: BINARY_MIMETYPE,
+}
+
+# 分块上传时每次从请求体读取并解析的字节数
+UPLOAD_READ_SIZE = 1024 * 1024
+
+# 分析结果缓存（按上传内容哈希）
+analysis_cache = AnalysisResultCache(
+    max_entries=AppConfig.ANALYSIS_CACHE_MAX_ENTRIES,
+    max_bytes=AppConfig.ANALYSIS_CACHE_MAX_BYTES,
+    disk_dir=AppConfig.ANALYSIS_CACHE_DIR if AppConfig.ANALYSIS_CACHE_DISK else None,
+    disk_max_bytes=AppConfig.ANALYSIS_CACHE_DISK_MAX_BYTES
+)
+
+# 瓦片金字塔（按数据集 ID，即上传内容哈希）
+tile_store = LRUCache(
+    max_entries=AppConfig.TILE_PYRAMID_MAX_DATASETS,
+    max_bytes=AppConfig.TILE_PYRAMID_MAX_BYTES,
+    sizeof=lambda pyramid: pyramid.nbytes
+)
+
+# 服务端渲染的图表（agg 模式，按数据哈希和尺寸缓存 PNG）
+chart_cache = LRUCache(
+    max_entries=AppConfig.CHART_CACHE_MAX_ENTRIES,
+    max_bytes=AppConfig.CHART_CACHE_MAX_BYTES
+)
+
+# 服务端渲染图片的尺寸范围（像素）
+CHART_MIN_SIZE = 200
+CHART_MAX_SIZE = 4000
+
+# 多 worker 部署时共享的数据集（其他 worker 据此重建瓦片金字塔），单进程时为 None
+dataset_store = SharedDatasetStore(
+    os.path.join(AppConfig.SHARED_STATE_DIR, 'datasets'),
+    max_bytes=AppConfig.SHARED_DATASET_MAX_BYTES
+) if AppConfig.SHARED_STATE_DIR else None
+
+# 后台分析任务（async=1）
+job_manager = AnalysisJobManager(
+    max_workers=AppConfig.ANALYSIS_JOB_WORKERS,
+    max_pending=AppConfig.ANALYSIS_JOB_MAX_PENDING,
+    ttl=AppConfig.ANALYSIS_JOB_TTL,
+    state_dir=os.path.join(AppConfig.SHARED_STATE_DIR, 'jobs') if AppConfig.SHARED_STATE_DIR else None
+)
+
+# 分块上传会话
+upload_sessions = UploadSessionStore(
+    max_sessions=AppConfig.CHUNKED_UPLOAD_MAX_SESSIONS,
+    ttl=AppConfig.CHUNKED_UPLOAD_TTL
+)
+
+def warm_up() -> None:
+    """预热插件（多 worker 部署时在 fork 之前调用，worker 共享已加载的 matplotlib 和字体缓存）"""
+    warm_up_visualizer()
+
+
+def _store_dataset(content_hash: str, series) -> None:
+    """构建瓦片金字塔，供缩放时按窗口查询；多 worker 部署时同时写入共享目录"""
+    tile_store.put(content_hash, TilePyramid.build(series))
+    if dataset_store is not None:
+        dataset_store.put(content_hash, series)
+
+
+def _get_pyramid(dataset_id: str) -> Optional[TilePyramid]:
+    """读取瓦片金字塔，本进程中没有时从共享目录的数据集重建"""
+    pyramid = tile_store.get(dataset_id)
+    if pyramid is not None or dataset_store is None:
+        return pyramid
+    series = dataset_store.get(dataset_id)
+    if series is None:
+        return None
+    pyramid = TilePyramid.build(series)
+    tile_store.put(dataset_id, pyramid)
+    return pyramid
+
+
+def _cached_result(cache_key: str, content_hash: str) -> Optional[bytes]:
+    """
+    读取缓存的分析结果
+
+    结果缓存比瓦片金字塔保留得久（条目更多且有磁盘层），数据集已被淘汰时
+    缓存的 dataset_id 无法再查询瓦片和图表，此时视为未命中，重新解析并构建金字塔
+    """
+    cached = analysis_cache.get(cache_key)
+    if cached is None:
+        return None
+    if _get_pyramid(content_hash) is None:
+        logger.info(f"分析缓存命中但数据集已淘汰，重新解析: {content_hash[:12]}")
+        return None
+    return cached
+
+
+def _analyze_stream(
+    stream,
+    content_hash: str,
+    cache_key: str,
+    mode: str,
+    max_points: int,
+    method: str,
+    wire_format: str = FORMAT_JSON,
+    parser: Optional[PMInfoParser] = None
+) -> bytes:
+    """
+    解析上传流并计算统计，结果写入缓存
+
+    Args:
+        stream: 可 seek 的二进制文件对象
+        content_hash: 上传内容哈希（即数据集 ID）
+        cache_key: 分析结果缓存键
+        mode: 解析模式（default / stream / parallel / mmap）
+        max_points: 返回序列的最大点数，0 表示返回全部
+        method: 降采样方法
+        wire_format: 响应格式（json / binary）
+        parser: 解析器实例（后台任务通过它读取进度），None 时新建
+
+    Returns:
+        bytes: 响应体
+
+    Raises:
+        ValueError: 文件为空或格式不正确
+    """
+    parser = parser or PMInfoParser()
+    
+    # 直接从上传流解析（Werkzeug 超过阈值时才会落盘），不再另存临时文件
+    stream.seek(0, os.SEEK_END)
+    file_size = stream.tell()
+    stream.seek(0)
+    logger.info(f"文件大小：{file_size} 字节")
+    
+    if file_size == 0:
+        raise ValueError("文件为空")
+    
+    # 压缩文件边解压边流式解析，解压内容不落盘
+    source, compressed = _maybe_decompress(stream)
+    if compressed:
+        data = parser.parse_stream(source, streaming=True, sniff_lines=SNIFF_LINES)
+    # 解析文件（快速格式检查合并在同一次扫描中）
+    elif mode == 'parallel':
+        data = parse_parallel(stream, workers=AppConfig.PARSE_WORKERS, sniff_lines=SNIFF_LINES)
+    elif mode == 'mmap':
+        data = parser.parse_mmap(stream, sniff_lines=SNIFF_LINES)
+    else:
+        data = parser.parse_stream(stream, streaming=mode == 'stream', sniff_lines=SNIFF_LINES)
+    
+    return _build_result(data, content_hash, cache_key, max_points, method, wire_format)
+
+
+def _maybe_decompress(stream) -> Tuple[BinaryIO, bool]:
+    """
+    识别压缩格式，压缩文件返回解压流
+
+    Returns:
+        Tuple[可按行迭代的二进制流, 是否为压缩文件]
+    """
+    compression = detect_compression(stream)
+    if compression is None:
+        return stream, False
+    logger.info(f"压缩格式: {compression}，使用流式解压解析")
+    return open_decompressed(stream, compression, AppConfig.DECOMPRESSED_MAX_BYTES), True
+
+
+def _series_statistics(data) -> dict:
+    """基于完整序列计算统计数据"""
+    visualizer = PMInfoVisualizer()
+    return visualizer._calculate_statistics(
+        data.currents,
+        data.temperatures,
+        data.voltages,
+        data.charging_states
+    )
+
+
+def _ndjson_response(stream, content_hash: str):
+    """
+    边解析边以 NDJSON 输出样本（始终为流式单次扫描，不做降采样，不写入结果缓存）
+
+    格式错误在发送响应头之前发现时返回 400，之后的错误以 error 行输出。
+    """
+    parser = PMInfoParser()
+    try:
+        source, _ = _maybe_decompress(stream)
+        records = parser.iter_records(iter_text_lines(source), sniff_lines=SNIFF_LINES)
+        
+        def finalize(series):
+            _store_dataset(content_hash, series)
+            return {
+                'stats': _series_statistics(series),
+                'total_points': len(series),
+                'lines_scanned': parser.lines_scanned
+            }
+        
+        lines = iter_ndjson(records, {'dataset_id': content_hash}, finalize, lambda e: _error_payload(e)[0])
+        first = next(lines)
+    except Exception as e:
+        stream.close()
+        payload, code = _error_payload(e)
+        return jsonify(payload), code
+    
+    response = Response(
+        itertools.chain([first], lines),
+        mimetype=NDJSON_MIMETYPE,
+        headers={'X-Accel-Buffering': 'no'}  # 禁止反向代理缓冲
+    )
+    # 响应体在视图返回后才生成，上传流在响应发送完毕时关闭
+    response.call_on_close(stream.close)
+    return response
+
+
+def _build_result(
+    data,
+    content_hash: str,
+    cache_key: str,
+    max_points: int,
+    method: str,
+    wire_format: str = FORMAT_JSON
+) -> bytes:
+    """
+    计算统计、构建瓦片金字塔并序列化响应，结果写入缓存
+
+    Args:
+        data: 解析结果（PMInfoSeries）
+        content_hash: 上传内容哈希（即数据集 ID）
+        cache_key: 分析结果缓存键
+        max_points: 返回序列的最大点数，0 表示返回全部
+        method: 降采样方法
+        wire_format: 响应格式，json 为 JSON，binary 为列式二进制（见 wire.py）
+
+    Returns:
+        bytes: 响应体
+    """
+    # 计算统计数据
+    stats = _series_statistics(data)
+    
+    # 构建瓦片金字塔，供缩放时按窗口查询
+    _store_dataset(content_hash, data)
+    
+    # 返回原始数据和统计信息（用于前端动态图表）
+    # 统计信息始终基于完整数据计算，降采样只影响返回的序列
+    reduced = downsample_series(data, max_points, method) if max_points > 0 else data
+    result = {
+        'stats': stats,  # 统计信息
+        'dataset_id': content_hash  # 瓦片查询使用的数据集 ID
+    }
+    if reduced is not data:
+        result['downsample'] = {
+            'method': method,
+            'original_points': len(data),
+            'returned_points': len(reduced)
+        }
+        logger.info(f"降采样: {len(data)} -> {len(reduced)} 点 ({method})")
+    
+    if wire_format == FORMAT_BINARY:
+        # 列直接编码为小端二进制，不经过 Python 浮点数列表
+        body = encode_columns(reduced, result)
+    else:
+        result['data'] = reduced.to_dict()  # 时间序列数据
+        body = json.dumps(result).encode('utf-8')
+    analysis_cache.put(cache_key, body)
+    return body
+
+
+def _downsample_params() -> Tuple[int, str]:
+    """
+    读取可选的服务端降采样参数
+
+    max_points 为返回序列的最大点数，0 表示返回全部；downsample 为降采样方法
+
+    Returns:
+        Tuple[max_points, method]
+
+    Raises:
+        ValueError: 参数不合法
+    """
+    try:
+        max_points = int(request.form.get('max_points', request.args.get('max_points', 0)))
+    except ValueError:
+        raise ValueError('max_points 必须为整数')
+    method = request.form.get('downsample', request.args.get('downsample', METHOD_LTTB))
+    if method not in METHODS:
+        raise ValueError(f'不支持的降采样方法: {method}')
+    return max_points, method
+
+
+def _cache_key(content_hash: str, max_points: int, method: str, wire_format: str = FORMAT_JSON) -> str:
+    """分析结果缓存键：相同内容、降采样参数及响应格式共用结果"""
+    key = f"{content_hash}:{max_points}:{method}" if max_points > 0 else content_hash
+    return f"{key}:{wire_format}" if wire_format != FORMAT_JSON else key
+
+
+def _chunked_upload_unavailable() -> Optional[Tuple[Response, int]]:
+    """
+    分块上传未启用时的错误响应（会话只保存在进程内，多 worker 部署时由 gunicorn.conf.py 关闭）
+    
+    Returns:
+        Optional[Tuple[Response, int]]: 错误响应，已启用时为 None
+    """
+    if AppConfig.CHUNKED_UPLOAD_ENABLED:
+        return None
+    return jsonify({
+        'error': '当前部署（多 worker）不支持分块上传，请使用 /api/analyze 上传整个文件',
+        'chunked': False,
+        # 整个文件上传时的大小上限，客户端据此提示超出的文件
+        'max_content_length': AppConfig.MAX_CONTENT_LENGTH
+    }), 501
+
+
+def _error_payload(e: Exception) -> Tuple[dict, int]:
+    """将解析异常转换为错误响应体和状态码"""
+    if isinstance(e, ValueError):
+        error_msg = f"数据验证错误: {str(e)}"
+        logger.error(error_msg)
+        return {
+            'error': error_msg,
+            'details': '请检查文件格式是否符合要求'
+        }, 400
+    
+    error_msg = f"处理文件时出错：{str(e)}"
+    logger.error(error_msg)
+    logger.error(traceback.format_exc())
+    return {
+        'error': '文件处理失败',
+        'details': error_msg,
+        'trace': traceback.format_exc()
+    }, 500
+
+
+def _run_analysis_job(job, stream, content_hash: str, cache_key: str, *args) -> bytes:
+    """后台任务：解析并计算统计，进度由解析器计数器提供"""
+    parser = PMInfoParser()
+    job.result_key = cache_key
+    job.progress_source = lambda: {
+        'lines_scanned': parser.lines_scanned,
+        'samples_found': parser.samples_found
+    }
+    try:
+        return _analyze_stream(stream, content_hash, cache_key, *args, parser=parser)
+    except Exception as e:
+        payload, code = _error_payload(e)
+        raise JobFailed(payload, code)
+    finally:
+        stream.close()
+
+
+def _response_format() -> str:
+    """
+    响应格式：format 参数优先，否则按 Accept 请求头协商
+
+    Returns:
+        str: json / ndjson / binary
+    """
+    wire_format = request.form.get('format', request.args.get('format'))
+    if wire_format in RESPONSE_MIMETYPES:
+        return wire_format
+    best = request.accept_mimetypes.best_match(list(RESPONSE_MIMETYPES.values()))
+    return next((name for name, mimetype in RESPONSE_MIMETYPES.items() if mimetype == best), FORMAT_JSON)
+
+
+def _job_status_url(job_id: str) -> str:
+    return f"{request.script_root}{request.path.rstrip('/')}/jobs/{job_id}"
+
+
 @log_analyzer_bp.route('/analyze', methods=['POST'])
 def analyze_file():
-    """分析上传的日志文件"""
+    """
+    分析上传的日志文件
+    
+    Form/Query Parameters:
+        async (1/0): 为 1 时提交后台任务，立即返回 202 和任务 ID
+        format (json/ndjson/binary): 响应格式，也可通过 Accept 请求头协商
+            ndjson 边解析边流式输出（application/x-ndjson），
+            binary 为列式二进制（application/vnd.pminfo.columns，见 wire.py）
+    """
     logger.info("收到文件上传请求")
     
     # 验证文件
@@ -31,83 +424,295 @@ def analyze_file():
     if file.filename == '':
         return jsonify({'error': '没有选择文件'}), 400
     
-    if not file or not allowed_file(file.filename):
+    if not file or not allowed_file(file.filename, AppConfig.ALLOWED_EXTENSIONS, AppConfig.COMPRESSED_EXTENSIONS):
         return jsonify({'error': '不支持的文件类型'}), 400
     
-    filename = secure_filename(file.filename)
-    temp_path = os.path.join(tempfile.gettempdir(), filename)
+    # 解析模式：stream 为流式单次扫描，parallel 为多进程分块解析，
+    # mmap 为内存映射字节级扫描，默认为原有的整文件读取
+    mode = request.form.get('mode', request.args.get('mode', 'default'))
+    run_async = request.form.get('async', request.args.get('async', '0')) in ('1', 'true')
     
     try:
-        # 保存文件
-        file.save(temp_path)
-        logger.info(f"文件已保存到：{temp_path}")
-        
-        # 检查文件大小
-        file_size = os.path.getsize(temp_path)
-        logger.info(f"文件大小：{file_size} 字节")
-        
-        if file_size == 0:
-            raise ValueError("文件为空")
-        
-        # 快速检查文件内容
-        has_pm_info = False
-        with open(temp_path, 'r', encoding='utf-8', errors='ignore') as f:
-            for i, line in enumerate(f):
-                if "PM:INFO" in line.upper():
-                    has_pm_info = True
-                    logger.info(f"在第 {i+1} 行找到 PM:INFO")
-                    break
-                if i >= 100:
-                    break
-        
-        if not has_pm_info:
-            raise ValueError("文件中未找到 PM:INFO 内容，请确认文件格式是否正确")
-        
-        # 解析文件
-        parser = PMInfoParser()
-        data = parser.parse_file(temp_path)
-        
-        # 计算统计数据
-        from .visualizer import PMInfoVisualizer
-        visualizer = PMInfoVisualizer()
-        stats = visualizer._calculate_statistics(
-            data['currents'], 
-            data['temperatures'], 
-            data['voltages'], 
-            data['charging_states']
-        )
-        
-        # 返回原始数据和统计信息（用于前端动态图表）
-        result = {
-            'data': data,  # 原始时间序列数据
-            'stats': stats  # 统计信息
-        }
-        
-        return jsonify(result)
-        
-    except ValueError as ve:
-        error_msg = f"数据验证错误: {str(ve)}"
-        logger.error(error_msg)
-        return jsonify({
-            'error': error_msg,
-            'details': '请检查文件格式是否符合要求'
-        }), 400
+        max_points, method = _downsample_params()
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    # 后台任务的结果嵌入状态 JSON 中，始终使用 JSON 格式
+    wire_format = FORMAT_JSON if run_async else _response_format()
+    
+    # 相同内容（及相同降采样参数）直接返回缓存结果
+    content_hash = hash_stream(file.stream)
+    if wire_format == FORMAT_NDJSON:
+        # 请求结束时 Werkzeug 会关闭上传流，这里把流的所有权转交给响应
+        stream = file.stream
+        file.stream = io.BytesIO()
+        return _ndjson_response(stream, content_hash)
+    
+    cache_key = _cache_key(content_hash, max_points, method, wire_format)
+    cached = _cached_result(cache_key, content_hash)
+    if cached is not None:
+        logger.info(f"命中分析缓存: {content_hash[:12]}")
+        if run_async:
+            job = job_manager.add_finished(cache_key)
+            return jsonify({'job_id': job.id, 'status': job.status, 'status_url': _job_status_url(job.id)}), 202
+        return Response(cached, mimetype=RESPONSE_MIMETYPES[wire_format])
+    
+    if run_async:
+        # 请求结束时 Werkzeug 会关闭上传流，这里把流的所有权转交给后台任务
+        stream = file.stream
+        file.stream = io.BytesIO()
+        try:
+            job = job_manager.submit(
+                _run_analysis_job, stream, content_hash, cache_key, mode, max_points, method
+            )
+        except JobQueueFullError as e:
+            stream.close()
+            return jsonify({'error': str(e)}), 503
+        return jsonify({'job_id': job.id, 'status': job.status, 'status_url': _job_status_url(job.id)}), 202
+    
+    try:
+        body = _analyze_stream(file.stream, content_hash, cache_key, mode, max_points, method, wire_format)
+        return Response(body, mimetype=RESPONSE_MIMETYPES[wire_format])
+    except Exception as e:
+        payload, code = _error_payload(e)
+        return jsonify(payload), code
+
+
+@log_analyzer_bp.route('/analyze/jobs/<job_id>', methods=['GET'])
+def get_job(job_id):
+    """
+    查询后台分析任务状态
+    
+    进行中返回状态和进度（lines_scanned / samples_found）；
+    完成时在状态信息中附带 result（与同步接口的响应体相同）；
+    失败时返回与同步接口一致的错误状态码。
+    """
+    job = job_manager.get(job_id)
+    if job is None:
+        return jsonify({'error': '任务不存在或已过期'}), 404
+    
+    if job.status == STATUS_FAILED:
+        return jsonify(job.to_dict()), job.error_code
+    
+    if job.status != STATUS_DONE:
+        return jsonify(job.to_dict())
+    
+    # 结果从分析缓存中读取（多 worker 部署时为共享的磁盘层）
+    result = analysis_cache.get(job.result_key or '')
+    if result is None:
+        return jsonify({'error': '任务结果已过期，请重新提交'}), 404
+    
+    # 直接拼接缓存的 JSON 响应体，避免大结果反序列化后再序列化
+    status = json.dumps(job.to_dict()).encode('utf-8')
+    body = status[:-1] + b', "result": ' + result + b'}'
+    return Response(body, mimetype='application/json')
+
+
+@log_analyzer_bp.route('/analyze/uploads', methods=['POST'])
+def create_upload():
+    """
+    创建分块上传会话
+    
+    Form/Query Parameters:
+        filename (str): 原始文件名（用于校验文件类型）
+        max_points / downsample: 与 /analyze 相同，完成时使用
+    """
+    unavailable = _chunked_upload_unavailable()
+    if unavailable is not None:
+        return unavailable
+    filename = request.form.get('filename', request.args.get('filename', ''))
+    if not filename:
+        return jsonify({'error': '没有提供文件名'}), 400
+    if not allowed_file(filename, AppConfig.ALLOWED_EXTENSIONS, AppConfig.COMPRESSED_EXTENSIONS):
+        return jsonify({'error': '不支持的文件类型'}), 400
+    
+    try:
+        max_points, method = _downsample_params()
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    # 压缩文件（.gz / .zst）逐块解压
+    compression = compression_from_filename(filename)
+    try:
+        decompressor = IncrementalDecompressor(compression, AppConfig.DECOMPRESSED_MAX_BYTES) if compression else None
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    session = upload_sessions.create(
+        filename,
+        max_bytes=AppConfig.CHUNKED_UPLOAD_MAX_BYTES,
+        sniff_lines=SNIFF_LINES,
+        options={'max_points': max_points, 'method': method},
+        decompressor=decompressor
+    )
+    if session is None:
+        return jsonify({'error': '上传会话已满，请稍后重试'}), 503
+    
+    result = session.to_dict()
+    result['chunk_size'] = AppConfig.CHUNKED_UPLOAD_CHUNK_SIZE
+    return jsonify(result), 201
+
+
+@log_analyzer_bp.route('/analyze/uploads/<upload_id>', methods=['GET'])
+def get_upload(upload_id):
+    """查询分块上传会话状态（断点续传时从 received_bytes 继续）"""
+    unavailable = _chunked_upload_unavailable()
+    if unavailable is not None:
+        return unavailable
+    session = upload_sessions.get(upload_id)
+    if session is None:
+        return jsonify({'error': '上传会话不存在或已过期'}), 404
+    return jsonify(session.to_dict())
+
+
+@log_analyzer_bp.route('/analyze/uploads/<upload_id>', methods=['DELETE'])
+def delete_upload(upload_id):
+    """取消分块上传"""
+    unavailable = _chunked_upload_unavailable()
+    if unavailable is not None:
+        return unavailable
+    upload_sessions.discard(upload_id)
+    return '', 204
+
+
+@log_analyzer_bp.route('/analyze/uploads/<upload_id>', methods=['PUT'])
+def upload_chunk(upload_id):
+    """
+    上传一个块（请求体为块的原始字节）
+    
+    Query Parameters:
+        offset (int): 块在文件中的起始字节偏移量
+        final (1/0): 为 1 时表示最后一个块，完成解析并返回分析结果
+    """
+    unavailable = _chunked_upload_unavailable()
+    if unavailable is not None:
+        return unavailable
+    session = upload_sessions.get(upload_id)
+    if session is None:
+        return jsonify({'error': '上传会话不存在或已过期'}), 404
+    
+    offset = request.args.get('offset', None, type=int)
+    if offset is None or offset < 0:
+        return jsonify({'error': 'offset 必须为非负整数'}), 400
+    final = request.args.get('final', '0') in ('1', 'true')
+    
+    # 同一会话的块按顺序处理
+    with session.lock:
+        try:
+            # 边读取请求体边解析，传输与解析重叠
+            for piece in iter(lambda: request.stream.read(UPLOAD_READ_SIZE), b''):
+                session.write(offset, piece)
+                offset += len(piece)
+            
+            if not final:
+                return jsonify(session.to_dict())
+            
+            data = session.finish()
+        except UploadOffsetError as e:
+            result = session.to_dict()
+            result['error'] = str(e)
+            return jsonify(result), 409
+        except BadRequest as e:
+            # 连接中断（ClientDisconnected）或请求体不完整：保留会话，
+            # 已送入解析器的部分计入 received_bytes，客户端从断点续传
+            logger.warning(f"分块上传中断 {upload_id}: {str(e)}")
+            result = session.to_dict()
+            result['error'] = '块未完整接收，请从 received_bytes 处续传'
+            return jsonify(result), 400
+        except ValueError as e:
+            # 数据格式错误或超过大小限制，会话无法继续
+            upload_sessions.discard(upload_id)
+            payload, code = _error_payload(e)
+            return jsonify(payload), code
+        except Exception as e:
+            payload, code = _error_payload(e)
+            return jsonify(payload), code
         
+        upload_sessions.discard(upload_id)
+    
+    # 最后一个块的响应格式同样按 Accept 协商（NDJSON 不适用，按 JSON 返回）
+    wire_format = _response_format()
+    if wire_format == FORMAT_NDJSON:
+        wire_format = FORMAT_JSON
+    content_hash = session.content_hash
+    max_points, method = session.options['max_points'], session.options['method']
+    cache_key = _cache_key(content_hash, max_points, method, wire_format)
+    cached = analysis_cache.get(cache_key)
+    if cached is not None:
+        logger.info(f"命中分析缓存: {content_hash[:12]}")
+        # 数据集可能已从瓦片金字塔中淘汰，用刚解析的序列重建，缓存中的 dataset_id 仍可查询
+        if _get_pyramid(content_hash) is None:
+            _store_dataset(content_hash, data)
+        return Response(cached, mimetype=RESPONSE_MIMETYPES[wire_format])
+    
+    try:
+        body = _build_result(data, content_hash, cache_key, max_points, method, wire_format)
+        return Response(body, mimetype=RESPONSE_MIMETYPES[wire_format])
     except Exception as e:
-        error_msg = f"处理文件时出错：{str(e)}"
-        logger.error(error_msg)
+        payload, code = _error_payload(e)
+        return jsonify(payload), code
+
+
+@log_analyzer_bp.route('/analyze/chart/<dataset_id>', methods=['GET'])
+def get_chart(dataset_id):
+    """
+    服务端渲染的 PNG 图表（电流、温度、电压三个子图）
+    
+    Query Parameters:
+        width (int): 图片宽度（像素），默认 1200
+        height (int): 图片高度（像素），默认 1200
+        dpi (int): 分辨率，默认 100
+    """
+    pyramid = _get_pyramid(dataset_id)
+    if pyramid is None:
+        return jsonify({'error': '数据集不存在或已过期，请重新上传文件'}), 404
+    
+    width = request.args.get('width', DEFAULT_WIDTH, type=int)
+    height = request.args.get('height', DEFAULT_HEIGHT, type=int)
+    dpi = request.args.get('dpi', DEFAULT_DPI, type=int)
+    if not (CHART_MIN_SIZE <= width <= CHART_MAX_SIZE and CHART_MIN_SIZE <= height <= CHART_MAX_SIZE):
+        return jsonify({'error': f'图片尺寸必须在 {CHART_MIN_SIZE}-{CHART_MAX_SIZE} 像素之间'}), 400
+    if not 50 <= dpi <= 300:
+        return jsonify({'error': 'dpi 必须在 50-300 之间'}), 400
+    
+    try:
+        visualizer = PMInfoVisualizer(chart_cache=chart_cache)
+        image_png = visualizer.render_png(pyramid.series, width=width, height=height, dpi=dpi)
+    except Exception as e:
+        logger.error(f"图表渲染失败: {str(e)}")
         logger.error(traceback.format_exc())
-        return jsonify({
-            'error': '文件处理失败',
-            'details': error_msg,
-            'trace': traceback.format_exc()
-        }), 500
-        
-    finally:
-        # 清理临时文件
-        if os.path.exists(temp_path):
-            try:
-                os.remove(temp_path)
-                logger.info(f"临时文件已删除: {temp_path}")
-            except Exception as e:
-                logger.warning(f"清理临时文件失败：{str(e)}")
+        return jsonify({'error': f'图表渲染失败: {str(e)}'}), 500
+    
+    response = Response(image_png, mimetype='image/png')
+    response.headers['Cache-Control'] = 'private, max-age=3600'
+    return response
+
+
+@log_analyzer_bp.route('/analyze/tiles/<dataset_id>', methods=['GET'])
+def get_tiles(dataset_id):
+    """
+    按窗口和分辨率查询瓦片
+    
+    Query Parameters:
+        start (int): 窗口起始样本序号，默认 0
+        end (int): 窗口结束样本序号（不含），默认到末尾
+        max_points (int): 窗口内最大桶数，用于自动选择级别
+        level (int): 指定级别（0 为原始样本），优先于 max_points
+    """
+    pyramid = _get_pyramid(dataset_id)
+    if pyramid is None:
+        return jsonify({'error': '数据集不存在或已过期，请重新上传文件'}), 404
+    
+    try:
+        start = request.args.get('start', 0, type=int)
+        end = request.args.get('end', None, type=int)
+        max_points = request.args.get('max_points', 2048, type=int)
+        level = request.args.get('level', None, type=int)
+        result = query_tiles(pyramid, start=start, end=end, max_points=max_points, level=level)
+    except Exception as e:
+        logger.error(f"瓦片查询失败: {str(e)}")
+        logger.error(traceback.format_exc())
+        return jsonify({'error': f'瓦片查询失败: {str(e)}'}), 500
+    
+    result['dataset_id'] = dataset_id
+    return jsonify(result)
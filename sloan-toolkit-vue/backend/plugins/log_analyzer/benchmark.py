@@ -0,0 +1,177 @@
+"""
+PM:INFO 解析器微基准测试
+
+用法（在 backend 目录下运行）：
+    python -m plugins.log_analyzer.benchmark ../testlog/testlog1.log
+    python -m plugins.log_analyzer.benchmark ../testlog/testlog1.log --parallel
+"""
+import io
+import os
+import re
+import sys
+import time
+from typing import Callable, List
+
+from .parallel import parse_parallel, shutdown_pool
+from .parser import PMInfoParser
+
+DEFAULT_LOG = '../testlog/testlog1.log'
+
+
+def _legacy_is_valid(parser: PMInfoParser, line: str) -> bool:
+    """原有实现：整行大写 + find + 正则校验"""
+    line_upper = line.upper()
+    if "PM:INFO" not in line_upper:
+        return False
+    info_text = line[line_upper.find("PM:INFO") + 7:]
+    if '=' in info_text:
+        found_keys = set(m.group(1).lower() for m in parser.key_value_pattern.finditer(info_text))
+        return len({'curr', 'volt', 'temp', 'charge'} & found_keys) >= 3
+    return len(parser.value_pattern.findall(info_text)) >= 4
+
+
+def _legacy_extract_time(line: str) -> str:
+    """原有实现：逐个使用未编译的模式字符串调用 re.search"""
+    patterns = [
+        r'(\d{2}:\d{2}:\d{2})',
+        r'I>(\d+\.\d+)',
+        r'\d{2}/\d{2}\s+(\d{2}:\d{2}:\d{2})',
+    ]
+    for pattern in patterns:
+        time_match = re.search(pattern, line)
+        if time_match:
+            time_str = time_match.group(1)
+            if ':' in time_str:
+                return time_str
+            seconds = float(time_str)
+            return f"{int(seconds // 3600):02d}:{int((seconds % 3600) // 60):02d}:{int(seconds % 60):02d}"
+    return "00:00:00"
+
+
+def _legacy_extract_values(parser: PMInfoParser, line: str, line_number: int):
+    """原有实现：再次整行大写并定位 PM:INFO"""
+    info_text = line[line.upper().find("PM:INFO") + 7:]
+    if '=' in info_text:
+        return parser.parse_key_value_format(info_text)
+    return parser.parse_numeric_format(info_text, line_number)
+
+
+def legacy_pass(parser: PMInfoParser, lines: List[str]) -> int:
+    """原有三遍处理：预验证、再验证、时间与数值分别提取"""
+    valid_lines = [line for line in lines if _legacy_is_valid(parser, line)]
+    count = 0
+    for line_number, line in enumerate(lines, 1):
+        if not _legacy_is_valid(parser, line):
+            continue
+        _legacy_extract_time(line)
+        _legacy_extract_values(parser, line, line_number)
+        count += 1
+    return count if valid_lines else 0
+
+
+def tokenizer_pass(parser: PMInfoParser, lines: List[str]) -> int:
+    """组合分词器单次扫描"""
+    return sum(1 for _ in parser.iter_records(lines))
+
+
+def _best_of(func: Callable[[], int], repeat: int) -> float:
+    """多次运行取最短耗时"""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def run_tokenizer_benchmark(file_path: str, repeat: int = 5) -> dict:
+    """
+    对比原有三遍处理与组合分词器的逐行耗时
+
+    Args:
+        file_path: 日志文件路径
+        repeat: 重复次数
+
+    Returns:
+        dict: 两种方式的总耗时与逐行耗时（微秒）
+    """
+    with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
+        lines = f.readlines()
+
+    parser = PMInfoParser()
+    assert legacy_pass(parser, lines) == tokenizer_pass(parser, lines)
+
+    legacy = _best_of(lambda: legacy_pass(parser, lines), repeat)
+    tokenizer = _best_of(lambda: tokenizer_pass(parser, lines), repeat)
+    return {
+        'lines': len(lines),
+        'legacy_seconds': legacy,
+        'tokenizer_seconds': tokenizer,
+        'legacy_us_per_line': legacy / len(lines) * 1e6,
+        'tokenizer_us_per_line': tokenizer / len(lines) * 1e6,
+        'speedup': legacy / tokenizer if tokenizer else float('inf'),
+    }
+
+
+def run_parallel_benchmark(file_path: str, target_bytes: int = 30 * 1024 * 1024, repeat: int = 3) -> dict:
+    """
+    对比串行流式解析与不同进程数下的并行分块解析
+
+    Args:
+        file_path: 日志文件路径（重复拼接到 target_bytes 大小）
+        target_bytes: 测试数据大小
+        repeat: 重复次数
+
+    Returns:
+        dict: 串行耗时及各进程数下的耗时和加速比
+    """
+    with open(file_path, 'rb') as f:
+        raw = f.read()
+    if not raw.endswith(b'\n'):
+        raw += b'\n'
+    data = raw * max(1, target_bytes // len(raw))
+
+    serial = _best_of(lambda: PMInfoParser().parse_stream(io.BytesIO(data), streaming=True), repeat)
+
+    cpu_count = os.cpu_count() or 1
+    results = {}
+    for workers in (1, 2, 4, 8):
+        if workers > cpu_count:
+            break
+        # 预热进程池，排除进程启动开销
+        parse_parallel(io.BytesIO(raw), workers=workers)
+        elapsed = _best_of(lambda: parse_parallel(io.BytesIO(data), workers=workers), repeat)
+        results[workers] = {'seconds': elapsed, 'speedup': serial / elapsed}
+    shutdown_pool()
+
+    return {
+        'bytes': len(data),
+        'cpu_count': cpu_count,
+        'serial_seconds': serial,
+        'parallel': results,
+    }
+
+
+def main(argv: List[str]) -> None:
+    args = [arg for arg in argv[1:] if not arg.startswith('--')]
+    file_path = args[0] if args else DEFAULT_LOG
+
+    if '--parallel' in argv:
+        result = run_parallel_benchmark(file_path)
+        print(f"数据大小: {result['bytes'] / 1024 / 1024:.1f} MB, CPU 核数: {result['cpu_count']}")
+        print(f"串行流式解析: {result['serial_seconds']:.2f} s")
+        for workers, item in result['parallel'].items():
+            print(f"并行 {workers} 进程: {item['seconds']:.2f} s, 加速比 {item['speedup']:.2f}x")
+        return
+
+    result = run_tokenizer_benchmark(file_path)
+    print(f"文件: {file_path} ({result['lines']} 行)")
+    print(f"原有三遍处理: {result['legacy_seconds'] * 1000:.1f} ms, "
+          f"{result['legacy_us_per_line']:.2f} μs/行")
+    print(f"组合分词器:   {result['tokenizer_seconds'] * 1000:.1f} ms, "
+          f"{result['tokenizer_us_per_line']:.2f} μs/行")
+    print(f"加速比: {result['speedup']:.2f}x")
+
+
+if __name__ == '__main__':
+    main(sys.argv)
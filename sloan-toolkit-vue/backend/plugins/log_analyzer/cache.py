@@ -0,0 +1,145 @@
+"""
+分析结果缓存
+
+以上传文件内容的 SHA-256（及降采样参数、响应格式）为键，缓存序列化后的响应体：
+- 内存层：LRU，按条目数和总字节数限制
+- 磁盘层（可选）：UPLOAD_FOLDER 下的文件，按总字节数淘汰最旧文件；
+  文件名为缓存键的 SHA-256（键中的 ':' 在 Windows 路径中无效），
+  文件原子替换写入，多 worker 部署时各进程共享
+"""
+import hashlib
+import logging
+import os
+import threading
+from typing import BinaryIO, Dict, Optional
+
+from utils.cache import LRUCache
+from utils.file_utils import atomic_write, evict_oldest_files
+
+logger = logging.getLogger(__name__)
+
+HASH_CHUNK_SIZE = 1024 * 1024
+
+# 磁盘层文件后缀（响应体可能是 JSON 或列式二进制）
+DISK_SUFFIX = '.bin'
+
+
+def hash_stream(stream: BinaryIO) -> str:
+    """
+    计算流内容的 SHA-256，完成后将流指针复位到开头
+
+    Args:
+        stream: 可 seek 的二进制流
+
+    Returns:
+        str: 十六进制摘要
+    """
+    digest = hashlib.sha256()
+    stream.seek(0)
+    for chunk in iter(lambda: stream.read(HASH_CHUNK_SIZE), b''):
+        digest.update(chunk)
+    stream.seek(0)
+    return digest.hexdigest()
+
+
+class AnalysisResultCache:
+    """两级（内存 + 磁盘）分析结果缓存"""
+
+    def __init__(
+        self,
+        max_entries: int = 32,
+        max_bytes: int = 256 * 1024 * 1024,
+        disk_dir: Optional[str] = None,
+        disk_max_bytes: int = 1024 * 1024 * 1024
+    ):
+        """
+        Args:
+            max_entries: 内存层最大条目数
+            max_bytes: 内存层最大字节数
+            disk_dir: 磁盘层目录，None 表示不启用磁盘层
+            disk_max_bytes: 磁盘层最大字节数
+        """
+        self.memory = LRUCache(max_entries=max_entries, max_bytes=max_bytes)
+        self.disk_dir = disk_dir
+        self.disk_max_bytes = disk_max_bytes
+        self.disk_hits = 0
+        self._disk_lock = threading.Lock()
+
+        if self.disk_dir:
+            os.makedirs(self.disk_dir, exist_ok=True)
+
+    def _disk_path(self, key: str) -> str:
+        name = hashlib.sha256(key.encode('utf-8')).hexdigest()
+        return os.path.join(self.disk_dir, f"{name}{DISK_SUFFIX}")
+
+    def get(self, key: str) -> Optional[bytes]:
+        """
+        读取缓存的响应体
+
+        Args:
+            key: 缓存键
+
+        Returns:
+            Optional[bytes]: 命中时返回响应体（JSON 或列式二进制）
+        """
+        body = self.memory.get(key)
+        if body is not None or not self.disk_dir:
+            return body
+
+        path = self._disk_path(key)
+        try:
+            with open(path, 'rb') as f:
+                body = f.read()
+        except FileNotFoundError:
+            return None
+        except OSError as e:
+            logger.warning(f"读取磁盘缓存失败: {str(e)}")
+            return None
+
+        # 磁盘命中后回填内存层
+        with self._disk_lock:
+            self.disk_hits += 1
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        self.memory.put(key, body)
+        return body
+
+    def put(self, key: str, body: bytes) -> None:
+        """
+        写入缓存
+
+        Args:
+            key: 缓存键
+            body: 响应体
+        """
+        self.memory.put(key, body)
+        if not self.disk_dir:
+            return
+
+        try:
+            atomic_write(self._disk_path(key), body)
+        except OSError as e:
+            logger.warning(f"写入磁盘缓存失败: {str(e)}")
+            return
+        self._evict_disk()
+
+    def _evict_disk(self) -> None:
+        """磁盘层超出容量时按修改时间淘汰最旧文件"""
+        with self._disk_lock:
+            evict_oldest_files(self.disk_dir, DISK_SUFFIX, self.disk_max_bytes)
+
+    def stats(self) -> Dict[str, int]:
+        """返回命中/未命中计数（磁盘命中计入 hits）"""
+        memory_stats = self.memory.stats()
+        hits = memory_stats['hits'] + self.disk_hits
+        return {
+            'hits': hits,
+            'misses': memory_stats['misses'] - self.disk_hits,
+            'memory_hits': memory_stats['hits'],
+            'disk_hits': self.disk_hits,
+            'entries': memory_stats['entries'],
+            'bytes': memory_stats['bytes'],
+            'disk_enabled': bool(self.disk_dir),
+        }
@@ -0,0 +1,286 @@
+"""
+压缩日志解压
+
+支持 gzip（.log.gz）、zstd（.log.zst）和 zip 压缩包，边解压边解析，
+解压后的内容不落盘：
+- open_decompressed: 把上传流包装成解压后的只读流（按魔数识别格式）
+- IncrementalDecompressor: 分块上传时逐块解压
+
+zstd 依赖可选的 zstandard 包，未安装时上传 .zst 文件会返回错误。
+"""
+import gzip
+import io
+import logging
+import zipfile
+import zlib
+from typing import BinaryIO, Iterator, Optional
+
+try:
+    import zstandard
+except ImportError:  # 可选依赖
+    zstandard = None
+
+logger = logging.getLogger(__name__)
+
+# 损坏或被截断的压缩文件在读取时抛出的异常
+_DECOMPRESS_ERRORS = (OSError, EOFError, zlib.error, zipfile.BadZipFile)
+if zstandard is not None:
+    _DECOMPRESS_ERRORS += (zstandard.ZstdError,)
+
+COMPRESSION_GZIP = 'gzip'
+COMPRESSION_ZSTD = 'zstd'
+COMPRESSION_ZIP = 'zip'
+
+# 文件头魔数
+_MAGIC = (
+    (b'\x1f\x8b', COMPRESSION_GZIP),
+    (b'\x28\xb5\x2f\xfd', COMPRESSION_ZSTD),
+    (b'PK\x03\x04', COMPRESSION_ZIP),
+)
+
+# 扩展名
+_EXTENSIONS = {
+    'gz': COMPRESSION_GZIP,
+    'zst': COMPRESSION_ZSTD,
+    'zip': COMPRESSION_ZIP,
+}
+
+# zip 包中作为日志解析的成员扩展名（按优先级）
+ZIP_MEMBER_EXTENSIONS = ('log', 'txt')
+
+READ_SIZE = 1024 * 1024
+
+# zstd 逐块解压时每次送入解压器的输入字节数。zstd 块最大 128KB，RLE 块仅需 4 字节，
+# 32 字节输入最多产生约 1MB 输出，使每次调用的输出与 READ_SIZE 同一量级
+ZSTD_INPUT_SLICE = 32
+
+
+def detect_compression(stream: BinaryIO) -> Optional[str]:
+    """
+    按文件头魔数识别压缩格式，完成后将流指针复位到开头
+
+    Args:
+        stream: 可 seek 的二进制流
+
+    Returns:
+        Optional[str]: gzip / zstd / zip，未压缩时返回 None
+    """
+    stream.seek(0)
+    head = stream.read(4)
+    stream.seek(0)
+    for magic, kind in _MAGIC:
+        if head.startswith(magic):
+            return kind
+    return None
+
+
+def compression_from_filename(filename: str) -> Optional[str]:
+    """按扩展名识别压缩格式（分块上传时首个块到达前使用）"""
+    ext = filename.rsplit('.', 1)[-1].lower() if '.' in filename else ''
+    return _EXTENSIONS.get(ext)
+
+
+def _require_zstandard() -> None:
+    if zstandard is None:
+        raise ValueError("服务器未安装 zstandard，无法解析 .zst 文件，请上传 .gz 或未压缩的日志")
+
+
+class _LimitedReader(io.RawIOBase):
+    """限制解压后总字节数，防止压缩炸弹"""
+
+    def __init__(self, raw: BinaryIO, max_bytes: int):
+        self.raw = raw
+        self.max_bytes = max_bytes
+        self.total = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        try:
+            data = self.raw.read(len(buffer))
+        except _DECOMPRESS_ERRORS as e:
+            # 损坏或被截断的压缩文件按格式错误处理
+            raise ValueError(f"解压失败: {str(e)}")
+        self.total += len(data)
+        if self.total > self.max_bytes:
+            raise ValueError(f"解压后的文件超过限制（最大 {self.max_bytes // 1024 // 1024}MB）")
+        buffer[:len(data)] = data
+        return len(data)
+
+    def close(self) -> None:
+        self.raw.close()
+        super().close()
+
+
+class _ZstdReader(io.RawIOBase):
+    """
+    zstd 解压流（支持多个连续的帧）
+
+    zstandard 的 stream_reader 在输入提前结束时直接返回已解压的部分，
+    这里基于 IncrementalDecompressor 逐块解压，输入结束时最后一个帧不完整则按截断处理
+    （与 gzip 的 EOFError 一致）
+    """
+
+    def __init__(self, raw: BinaryIO, max_bytes: int):
+        self.raw = raw
+        self.decompressor = IncrementalDecompressor(COMPRESSION_ZSTD, max_bytes)
+        self._pieces: Iterator[bytes] = iter(())
+        self._pending = memoryview(b'')
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        while not self._pending:
+            piece = next(self._pieces, None)
+            if piece is not None:
+                self._pending = memoryview(piece)
+                break
+            data = self.raw.read(READ_SIZE)
+            if not data:
+                if not self.decompressor.finished:
+                    raise EOFError("zstd 压缩文件不完整（最后一个帧被截断）")
+                return 0
+            self._pieces = self.decompressor.decompress(data)
+
+        size = min(len(buffer), len(self._pending))
+        buffer[:size] = self._pending[:size]
+        self._pending = self._pending[size:]
+        return size
+
+
+def _open_zip_member(stream: BinaryIO) -> BinaryIO:
+    """打开 zip 包中的第一个日志文件（优先 .log，其次 .txt）"""
+    try:
+        archive = zipfile.ZipFile(stream)
+    except zipfile.BadZipFile as e:
+        raise ValueError(f"zip 文件损坏: {str(e)}")
+
+    members = [info for info in archive.infolist() if not info.is_dir()]
+    for ext in ZIP_MEMBER_EXTENSIONS:
+        for info in members:
+            if info.filename.lower().endswith('.' + ext):
+                logger.info(f"解析 zip 成员: {info.filename} ({info.file_size} 字节)")
+                return archive.open(info)
+    raise ValueError("zip 压缩包中没有 .log 或 .txt 文件")
+
+
+def open_decompressed(stream: BinaryIO, kind: str, max_bytes: int) -> BinaryIO:
+    """
+    把压缩流包装成解压后的只读二进制流（可按行迭代，不可 seek）
+
+    Args:
+        stream: 可 seek 的上传流
+        kind: 压缩格式（detect_compression 的返回值）
+        max_bytes: 解压后的最大字节数
+
+    Returns:
+        BinaryIO: 解压流
+
+    Raises:
+        ValueError: 格式不支持或文件损坏
+    """
+    stream.seek(0)
+    if kind == COMPRESSION_GZIP:
+        raw = gzip.GzipFile(fileobj=stream, mode='rb')
+    elif kind == COMPRESSION_ZSTD:
+        _require_zstandard()
+        raw = _ZstdReader(stream, max_bytes)
+    elif kind == COMPRESSION_ZIP:
+        raw = _open_zip_member(stream)
+    else:
+        raise ValueError(f"不支持的压缩格式: {kind}")
+
+    return io.BufferedReader(_LimitedReader(raw, max_bytes), buffer_size=READ_SIZE)
+
+
+class IncrementalDecompressor:
+    """分块上传的逐块解压（gzip / zstd，支持多个连续的压缩帧）"""
+
+    def __init__(self, kind: str, max_bytes: int):
+        """
+        Args:
+            kind: 压缩格式
+            max_bytes: 解压后的最大字节数
+
+        Raises:
+            ValueError: 格式不支持逐块解压（如 zip）
+        """
+        if kind == COMPRESSION_ZIP:
+            raise ValueError("分块上传不支持 zip 压缩包，请使用 .gz / .zst 或直接上传")
+        if kind == COMPRESSION_ZSTD:
+            _require_zstandard()
+        elif kind != COMPRESSION_GZIP:
+            raise ValueError(f"不支持的压缩格式: {kind}")
+        self.kind = kind
+        self.max_bytes = max_bytes
+        self.total = 0
+        self._decoder = self._new_decoder()
+
+    def _new_decoder(self):
+        if self.kind == COMPRESSION_GZIP:
+            return zlib.decompressobj(wbits=zlib.MAX_WBITS | 16)
+        return zstandard.ZstdDecompressor().decompressobj()
+
+    @property
+    def finished(self) -> bool:
+        """最后一个压缩帧是否完整"""
+        return self._decoder.eof
+
+    def decompress(self, data: bytes) -> Iterator[bytes]:
+        """
+        解压一个块，按片段逐个产出（每片约 READ_SIZE 字节）
+
+        每产出一片就累计并检查解压后的总大小，高压缩比的数据（压缩炸弹）
+        在超过限制时立即终止，不会一次性解压到内存中。
+
+        Yields:
+            bytes: 解压后的片段
+
+        Raises:
+            ValueError: 数据损坏或解压后超过大小限制
+        """
+        slices = self._gzip_slices(data) if self.kind == COMPRESSION_GZIP else self._zstd_slices(data)
+        try:
+            for piece in slices:
+                self.total += len(piece)
+                if self.total > self.max_bytes:
+                    raise ValueError(f"解压后的文件超过限制（最大 {self.max_bytes // 1024 // 1024}MB）")
+                if piece:
+                    yield piece
+        except ValueError:
+            raise
+        except Exception as e:
+            # zlib.error / zstandard.ZstdError
+            raise ValueError(f"解压失败: {str(e)}")
+
+    def _gzip_slices(self, data: bytes) -> Iterator[bytes]:
+        """每次最多输出 READ_SIZE 字节，未处理的输入保留在 unconsumed_tail 中"""
+        while True:
+            piece = self._decoder.decompress(data, READ_SIZE)
+            yield piece
+            if self._decoder.eof:
+                # 当前帧结束，剩余数据属于下一个帧
+                data = self._decoder.unused_data
+                if not data:
+                    return
+                self._decoder = self._new_decoder()
+                continue
+            data = self._decoder.unconsumed_tail
+            if not data and len(piece) < READ_SIZE:
+                return
+
+    def _zstd_slices(self, data: bytes) -> Iterator[bytes]:
+        """zstandard 的 decompressobj 不支持限制输出长度，按 ZSTD_INPUT_SLICE 分片送入"""
+        start = 0
+        while start < len(data):
+            if self._decoder.eof:
+                # 上一个帧已结束，剩余数据属于下一个帧
+                self._decoder = self._new_decoder()
+            end = min(start + ZSTD_INPUT_SLICE, len(data))
+            yield self._decoder.decompress(data[start:end])
+            if self._decoder.eof:
+                # 帧结束处之后的输入从下一个帧重新开始
+                end -= len(self._decoder.unused_data)
+            start = end
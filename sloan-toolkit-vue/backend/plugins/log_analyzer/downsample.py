@@ -0,0 +1,120 @@
+"""
+时间序列降采样
+
+支持两种保形降采样方法（x 轴为样本序号，与前端图表一致）：
+- lttb: Largest-Triangle-Three-Buckets，保留视觉上最显著的点
+- minmax: 每个桶保留最小值和最大值，保证峰值不丢失
+
+多个序列共用一条时间轴，因此对每个序列分别选点后取索引并集，
+所有序列在这些索引上取值。
+"""
+import numpy as np
+
+from .series import PMInfoSeries
+
+METHOD_LTTB = 'lttb'
+METHOD_MINMAX = 'minmax'
+METHODS = (METHOD_LTTB, METHOD_MINMAX)
+
+
+def lttb_indices(values: np.ndarray, n_out: int) -> np.ndarray:
+    """
+    Largest-Triangle-Three-Buckets 降采样
+
+    Args:
+        values: y 值
+        n_out: 输出点数（包含首尾点）
+
+    Returns:
+        np.ndarray: 选中的样本索引（升序）
+    """
+    n = len(values)
+    if n_out >= n:
+        return np.arange(n)
+    if n_out < 3:
+        return np.array([0, n - 1][:max(n_out, 0)], dtype=np.intp)
+
+    # 中间 n_out - 2 个桶，首尾点固定保留
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.intp)
+    selected = np.empty(n_out, dtype=np.intp)
+    selected[0] = 0
+    selected[-1] = n - 1
+
+    prev = 0
+    for i in range(n_out - 2):
+        start, end = edges[i], edges[i + 1]
+        # 下一个桶的平均点（最后一个桶使用末尾点）
+        if i + 2 < len(edges):
+            next_start, next_end = edges[i + 1], edges[i + 2]
+            avg_x = (next_start + next_end - 1) / 2.0
+            avg_y = values[next_start:next_end].mean()
+        else:
+            avg_x = n - 1
+            avg_y = values[n - 1]
+
+        xs = np.arange(start, end)
+        # 三角形面积（省略常数 1/2）
+        areas = np.abs(
+            (prev - avg_x) * (values[start:end] - values[prev])
+            - (prev - xs) * (avg_y - values[prev])
+        )
+        prev = start + int(areas.argmax())
+        selected[i + 1] = prev
+
+    return selected
+
+
+def minmax_indices(values: np.ndarray, n_out: int) -> np.ndarray:
+    """
+    每个桶保留最小值和最大值的降采样
+
+    Args:
+        values: y 值
+        n_out: 输出点数上限
+
+    Returns:
+        np.ndarray: 选中的样本索引（升序）
+    """
+    n = len(values)
+    if n_out >= n:
+        return np.arange(n)
+
+    n_buckets = max(1, n_out // 2)
+    edges = np.linspace(0, n, n_buckets + 1).astype(np.intp)
+    indices = []
+    for start, end in zip(edges[:-1], edges[1:]):
+        if end <= start:
+            continue
+        bucket = values[start:end]
+        indices.append(start + int(bucket.argmin()))
+        indices.append(start + int(bucket.argmax()))
+    return np.unique(np.array(indices, dtype=np.intp))
+
+
+def downsample_series(series: PMInfoSeries, max_points: int, method: str = METHOD_LTTB) -> PMInfoSeries:
+    """
+    对列式容器降采样
+
+    Args:
+        series: 原始时间序列
+        max_points: 最大输出点数
+        method: 降采样方法（lttb / minmax）
+
+    Returns:
+        PMInfoSeries: 降采样后的序列；点数不超过 max_points 时原样返回
+    """
+    if method not in METHODS:
+        raise ValueError(f"不支持的降采样方法: {method}")
+    if max_points <= 0 or len(series) <= max_points:
+        return series
+
+    columns = (series.currents, series.temperatures, series.voltages, series.charging_states)
+    # 各序列分摊点数预算，取索引并集后总点数不超过 max_points
+    budget = max(3, max_points // len(columns))
+    select = lttb_indices if method == METHOD_LTTB else minmax_indices
+
+    indices = np.unique(np.concatenate([
+        select(np.asarray(column, dtype=np.float64), budget) for column in columns
+    ]))
+    return series.take(indices)
+
@@ -0,0 +1,281 @@
+"""
+后台分析任务队列
+
+大文件分析在有界线程池中执行，请求立即返回任务 ID，
+客户端通过状态接口轮询进度（已扫描行数、已找到样本数）并获取结果。
+
+任务表只保存状态，结果由任务函数写入分析缓存，查询时按 result_key 读取，
+不在任务表中重复保存响应体。
+
+多 worker 部署时任务状态在每次状态变化时写入共享目录，状态查询落在其他 worker 上
+也能读到（进度为最近一次状态变化时的快照，结果通过共享的分析缓存读取）。
+"""
+import json
+import logging
+import os
+import re
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+from utils.file_utils import atomic_write
+
+logger = logging.getLogger(__name__)
+
+STATUS_QUEUED = 'queued'
+STATUS_RUNNING = 'running'
+STATUS_DONE = 'done'
+STATUS_FAILED = 'failed'
+
+_JOB_ID = re.compile(r'[0-9a-f]{32}')
+
+
+class JobQueueFullError(Exception):
+    """待处理任务数已达上限"""
+
+
+class JobFailed(Exception):
+    """任务失败，携带与同步接口一致的错误响应体和状态码"""
+
+    def __init__(self, payload: Dict, code: int = 500):
+        super().__init__(payload.get('error', ''))
+        self.payload = payload
+        self.code = code
+
+
+class AnalysisJob:
+    """单个后台分析任务"""
+
+    def __init__(self, job_id: str):
+        self.id = job_id
+        self.status = STATUS_QUEUED
+        self.created_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        # 失败时的错误信息和状态码
+        self.error: Optional[Dict] = None
+        self.error_code = 500
+        # 结果在分析缓存中的键（查询任务时据此读取结果）
+        self.result_key: Optional[str] = None
+        # 由任务函数设置，返回当前进度的字典
+        self.progress_source: Optional[Callable[[], Dict]] = None
+
+    @property
+    def finished(self) -> bool:
+        return self.status in (STATUS_DONE, STATUS_FAILED)
+
+    def progress(self) -> Dict:
+        """读取当前进度"""
+        if self.progress_source is None:
+            return {}
+        try:
+            return self.progress_source()
+        except Exception:
+            return {}
+
+    def to_dict(self) -> Dict[str, Any]:
+        """状态信息（不含结果）"""
+        now = self.finished_at or time.time()
+        info = {
+            'job_id': self.id,
+            'status': self.status,
+            'progress': self.progress(),
+            'elapsed': round(now - (self.started_at or now), 3),
+        }
+        if self.error is not None:
+            info['error'] = self.error
+        return info
+
+    def to_state(self) -> Dict[str, Any]:
+        """写入共享目录的状态快照（不含结果）"""
+        return {
+            'job_id': self.id,
+            'status': self.status,
+            'created_at': self.created_at,
+            'started_at': self.started_at,
+            'finished_at': self.finished_at,
+            'error': self.error,
+            'error_code': self.error_code,
+            'result_key': self.result_key,
+            'progress': self.progress(),
+        }
+
+    @classmethod
+    def from_state(cls, state: Dict[str, Any]) -> 'AnalysisJob':
+        """由状态快照恢复（进度固定为快照中的值）"""
+        job = cls(state['job_id'])
+        job.status = state['status']
+        job.created_at = state['created_at']
+        job.started_at = state['started_at']
+        job.finished_at = state['finished_at']
+        job.error = state['error']
+        job.error_code = state['error_code']
+        job.result_key = state['result_key']
+        progress = state.get('progress') or {}
+        job.progress_source = lambda: progress
+        return job
+
+
+class AnalysisJobManager:
+    """有界线程池 + 任务表"""
+
+    def __init__(
+        self,
+        max_workers: int = 2,
+        max_pending: int = 16,
+        ttl: int = 600,
+        state_dir: Optional[str] = None
+    ):
+        """
+        Args:
+            max_workers: 同时执行的任务数
+            max_pending: 排队与执行中任务总数上限（每个 worker 进程）
+            ttl: 已完成任务的保留秒数
+            state_dir: 任务状态共享目录（多 worker 部署），None 表示只保存在内存中
+        """
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self.ttl = ttl
+        self.state_dir = state_dir
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='analysis-job')
+        self._jobs: Dict[str, AnalysisJob] = {}
+        self._lock = threading.Lock()
+
+        if state_dir:
+            os.makedirs(state_dir, exist_ok=True)
+        # fork 出的 worker 不继承父进程的线程，重新创建线程池
+        os.register_at_fork(after_in_child=self._reset_after_fork)
+
+    def _reset_after_fork(self) -> None:
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='analysis-job')
+        self._jobs = {}
+        self._lock = threading.Lock()
+
+    def submit(self, func: Callable[..., Any], *args, **kwargs) -> AnalysisJob:
+        """
+        提交任务
+
+        Args:
+            func: 任务函数，签名为 func(job, *args, **kwargs)，
+                结果写入分析缓存并设置 job.result_key
+
+        Returns:
+            AnalysisJob: 新任务
+
+        Raises:
+            JobQueueFullError: 待处理任务数已达上限
+        """
+        with self._lock:
+            self._cleanup()
+            pending = sum(1 for job in self._jobs.values() if not job.finished)
+            if pending >= self.max_pending:
+                raise JobQueueFullError(f"分析任务已满（{pending} 个待处理），请稍后重试")
+
+            job = AnalysisJob(uuid.uuid4().hex)
+            self._jobs[job.id] = job
+
+        self._save(job)
+        self._executor.submit(self._run, job, func, args, kwargs)
+        logger.info(f"分析任务已提交: {job.id}")
+        return job
+
+    def add_finished(self, result_key: str) -> AnalysisJob:
+        """登记一个已完成的任务（如命中缓存时），客户端处理流程保持一致"""
+        job = AnalysisJob(uuid.uuid4().hex)
+        job.started_at = job.finished_at = time.time()
+        job.status = STATUS_DONE
+        job.result_key = result_key
+        with self._lock:
+            self._cleanup()
+            self._jobs[job.id] = job
+        self._save(job)
+        return job
+
+    def get(self, job_id: str) -> Optional[AnalysisJob]:
+        """
+        查询任务（本进程中没有时读取共享目录中的状态快照）
+
+        Returns:
+            Optional[AnalysisJob]: 任务，不存在或已过期时返回 None
+        """
+        with self._lock:
+            job = self._jobs.get(job_id)
+        if job is not None or not self.state_dir or not _JOB_ID.fullmatch(job_id):
+            return job
+
+        path = self._state_path(job_id)
+        try:
+            with open(path, 'rb') as f:
+                job = AnalysisJob.from_state(json.loads(f.read()))
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, KeyError) as e:
+            logger.warning(f"读取任务状态失败 {job_id}: {str(e)}")
+            return None
+
+        if job.finished and time.time() - job.finished_at > self.ttl:
+            self._remove_state(job_id)
+            return None
+        return job
+
+    def _state_path(self, job_id: str) -> str:
+        return os.path.join(self.state_dir, f"{job_id}.json")
+
+    def _save(self, job: AnalysisJob) -> None:
+        """写入状态快照"""
+        if not self.state_dir:
+            return
+        try:
+            atomic_write(self._state_path(job.id), json.dumps(job.to_state()).encode('utf-8'))
+        except OSError as e:
+            logger.warning(f"写入任务状态失败 {job.id}: {str(e)}")
+
+    def _remove_state(self, job_id: str) -> None:
+        if not self.state_dir:
+            return
+        try:
+            os.remove(self._state_path(job_id))
+        except OSError:
+            pass
+
+    def _run(self, job: AnalysisJob, func: Callable[..., Any], args, kwargs) -> None:
+        job.started_at = time.time()
+        job.status = STATUS_RUNNING
+        self._save(job)
+        status = STATUS_FAILED
+        try:
+            func(job, *args, **kwargs)
+            status = STATUS_DONE
+        except JobFailed as e:
+            job.error, job.error_code = e.payload, e.code
+            logger.error(f"分析任务失败 {job.id}: {str(e)}")
+        except Exception as e:
+            job.error = {'error': '文件处理失败', 'details': str(e)}
+            logger.error(f"分析任务失败 {job.id}: {str(e)}")
+        finally:
+            # 先设置 finished_at 再切换状态：_cleanup 不持有任务的锁，按状态读取 finished_at
+            job.finished_at = time.time()
+            job.status = status
+            self._save(job)
+            logger.info(f"分析任务结束 {job.id}: {job.status}，耗时 {job.finished_at - job.started_at:.2f}s")
+
+    def _cleanup(self) -> None:
+        """移除超过保留时间的已完成任务（调用方持有锁）"""
+        now = time.time()
+        expired = [
+            job_id for job_id, job in self._jobs.items()
+            if job.finished and now - job.finished_at > self.ttl
+        ]
+        for job_id in expired:
+            del self._jobs[job_id]
+            self._remove_state(job_id)
+
+    def stats(self) -> Dict[str, int]:
+        """各状态任务数"""
+        with self._lock:
+            counts = {STATUS_QUEUED: 0, STATUS_RUNNING: 0, STATUS_DONE: 0, STATUS_FAILED: 0}
+            for job in self._jobs.values():
+                counts[job.status] += 1
+            return counts
@@ -0,0 +1,160 @@
+"""
+多进程分块解析
+
+按行边界将日志切分为若干块，交给常驻进程池并行解析，再按顺序合并列式结果。
+每个块携带其在文件中的起始行号，保证 extract_time 后备时间与串行解析一致。
+"""
+import io
+import logging
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import BinaryIO, Iterator, Optional, Tuple
+
+from .parser import PMInfoParser, count_lines, iter_text_lines
+from .series import PMInfoSeries
+
+logger = logging.getLogger(__name__)
+
+# 单个块的最小字节数（过小的块进程间通信开销占比过高）
+MIN_CHUNK_BYTES = 1024 * 1024
+
+# 每个进程分到的块数（多于进程数以平衡负载）
+CHUNKS_PER_WORKER = 4
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_workers = 0
+_pool_lock = threading.Lock()
+
+
+def _reset_pool_after_fork() -> None:
+    """fork 出的子进程（如 gunicorn worker）不能使用父进程的进程池，首次使用时重新创建"""
+    global _pool, _pool_workers, _pool_lock
+    _pool = None
+    _pool_workers = 0
+    _pool_lock = threading.Lock()
+
+
+os.register_at_fork(after_in_child=_reset_pool_after_fork)
+
+
+def get_pool(workers: Optional[int] = None) -> ProcessPoolExecutor:
+    """
+    获取常驻进程池（首次调用时创建，进程数变化时重建）
+
+    Args:
+        workers: 进程数，None 表示 CPU 核数
+
+    Returns:
+        ProcessPoolExecutor: 进程池
+    """
+    global _pool, _pool_workers
+    workers = workers or os.cpu_count() or 1
+    with _pool_lock:
+        if _pool is None or _pool_workers != workers:
+            if _pool is not None:
+                _pool.shutdown(wait=False)
+            _pool = ProcessPoolExecutor(max_workers=workers)
+            _pool_workers = workers
+            logger.info(f"解析进程池已创建，进程数: {workers}")
+        return _pool
+
+
+def shutdown_pool() -> None:
+    """关闭常驻进程池"""
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=True)
+            _pool = None
+
+
+def iter_chunks(source: BinaryIO, chunk_bytes: int) -> Iterator[Tuple[bytes, int]]:
+    """
+    按行边界切分二进制流
+
+    Args:
+        source: 二进制文件对象
+        chunk_bytes: 每块的目标字节数
+
+    Yields:
+        Tuple[块内容, 块起始行号]
+    """
+    first_line = 1
+    while True:
+        chunk = source.read(chunk_bytes)
+        if not chunk:
+            break
+        # 补齐到行尾，保证不切断行
+        if not chunk.endswith(b'\n'):
+            chunk += source.readline()
+        yield chunk, first_line
+        first_line += count_lines(chunk)
+
+
+def _parse_chunk(chunk: bytes, first_line: int, sniff_lines: Optional[int]) -> PMInfoSeries:
+    """进程池任务：解析单个块"""
+    parser = PMInfoParser()
+    series = PMInfoSeries()
+    lines = iter_text_lines(io.BytesIO(chunk))
+    for record in parser.iter_records(lines, sniff_lines=sniff_lines, first_line=first_line):
+        series.append(*record)
+    return series
+
+
+def parse_parallel(
+    source: BinaryIO,
+    workers: Optional[int] = None,
+    chunk_bytes: Optional[int] = None,
+    sniff_lines: Optional[int] = None
+) -> PMInfoSeries:
+    """
+    并行解析二进制日志流
+
+    Args:
+        source: 可 seek 的二进制文件对象（如上传文件流）
+        workers: 进程数，None 表示 CPU 核数
+        chunk_bytes: 每块字节数，None 表示按文件大小和进程数自动计算
+        sniff_lines: 前 N 行内未出现 PM:INFO 时提前终止
+
+    Returns:
+        PMInfoSeries: 按原顺序合并的解析结果
+
+    Raises:
+        ValueError: 未解析到有效数据
+    """
+    pool = get_pool(workers)
+    if chunk_bytes is None:
+        source.seek(0, os.SEEK_END)
+        size = source.tell()
+        chunk_bytes = max(MIN_CHUNK_BYTES, size // (_pool_workers * CHUNKS_PER_WORKER) + 1)
+    source.seek(0)
+
+    # 只有第一个块需要做快速格式检查
+    futures = [
+        pool.submit(_parse_chunk, chunk, first_line, sniff_lines if first_line == 1 else None)
+        for chunk, first_line in iter_chunks(source, chunk_bytes)
+    ]
+
+    series = PMInfoSeries()
+    try:
+        for future in futures:
+            series.extend(future.result())
+    except Exception as e:
+        for future in futures:
+            future.cancel()
+        # 工作进程异常退出后进程池不可再用，下次请求时重建
+        if isinstance(e, BrokenProcessPool):
+            shutdown_pool()
+        raise
+
+    logger.info(f"并行解析 {len(futures)} 个块，进程数: {_pool_workers}")
+
+    if not series:
+        error_msg = "文件中未找到有效的 PM:INFO 数据行"
+        logger.error(error_msg)
+        raise ValueError(error_msg + "。请确认文件格式是否正确。")
+
+    logger.info(f"✅ 成功解析 {len(series)} 条数据")
+    return series
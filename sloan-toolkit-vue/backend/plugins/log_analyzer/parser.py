@@ -16,12 +16,30 @@ PM:INFO 日志解析器
     0: 停充, 1: 放电, 2: 预充电, 3: CC恒流, 4: CV恒压, 5: 充满, 6: 完成, 7: 错误
 [7] = 电流 (μA) ← 倒数第1位
 """
+import io
+import mmap
 import re
 import logging
-from typing import Dict, List, Tuple, Optional
+from typing import BinaryIO, Iterable, Iterator, List, Tuple, Optional, Union
+
+from .series import PMInfoSeries, format_seconds
 
 logger = logging.getLogger(__name__)
 
+# 组合分词器使用的预编译正则（模块级编译一次，所有解析器实例共享）
+PM_INFO_TAG_PATTERN = re.compile(r'PM:INFO', re.IGNORECASE)
+# 时间标记：HH:MM:SS（同时覆盖 MM/DD HH:MM:SS）或 I>秒数
+TIME_TOKEN_PATTERN = re.compile(r'(\d{2}:\d{2}:\d{2})|I>(\d+\.\d+)')
+HMS_PATTERN = re.compile(r'\d{2}:\d{2}:\d{2}')
+VALUE_PATTERN = re.compile(r'[-+]?\d*\.?\d+')
+KEY_VALUE_PATTERN = re.compile(r'(\w+)=([-+]?\d*\.?\d+)')
+# 字节级候选定位：先找 ":INFO"（大小写不敏感），再校验前两个字节是否为 "PM"
+PM_INFO_BYTES_PATTERN = re.compile(rb':[Ii][Nn][Ff][Oo]')
+
+# 分词结果中的格式类型
+FORMAT_KEY_VALUE = 'kv'
+FORMAT_NUMERIC = 'numeric'
+
 
 class PMInfoParser:
     """PM:INFO 格式日志文件解析器"""
@@ -50,38 +68,120 @@ class PMInfoParser:
     
     def __init__(self):
         """初始化解析器"""
-        self.time_pattern = re.compile(r'\d{2}:\d{2}:\d{2}')
-        self.value_pattern = re.compile(r'[-+]?\d*\.?\d+')
-        self.key_value_pattern = re.compile(r'(\w+)=([-+]?\d*\.?\d+)')
+        self.time_pattern = HMS_PATTERN
+        self.value_pattern = VALUE_PATTERN
+        self.key_value_pattern = KEY_VALUE_PATTERN
+        # 解析进度：已扫描行数、已找到样本数（后台任务轮询时读取）
+        self.lines_scanned = 0
+        self.samples_found = 0
     
-    def is_valid_pm_info_line(self, line: str) -> bool:
+    def tokenize_line(self, line: str) -> Optional[Tuple[Optional[str], str, list]]:
         """
-        检查是否为有效的 PM:INFO 行
+        组合分词器：一次扫描得到时间标记、格式类型和数值字段
         
         Args:
             line: 日志行文本
             
         Returns:
-            bool: 是否为有效的PM:INFO行
+            Optional[Tuple[时间标记, 格式类型, 字段列表]]: 非有效 PM:INFO 行返回 None
+                - 时间标记为 HH:MM:SS 或秒数字符串，未找到时为 None
+                - 格式类型为 FORMAT_KEY_VALUE 或 FORMAT_NUMERIC
+                - 字段列表为 (键, 值) 列表或数值字符串列表
         """
-        line_upper = line.upper()
-        if "PM:INFO" not in line_upper:
-            return False
-        
-        # 提取 PM:INFO 后的内容
-        info_start = line_upper.find("PM:INFO") + 7
-        info_text = line[info_start:]
+        # 定位标记：绝大多数日志为大写，find 未命中时才用正则匹配大小写变体（不复制整行）
+        tag = line.find("PM:INFO")
+        if tag < 0:
+            match = PM_INFO_TAG_PATTERN.search(line)
+            if match is None:
+                return None
+            tag = match.start()
+        info_text = line[tag + 7:]
         
-        # 检查是否为键值对格式或数值格式
         if '=' in info_text:
-            # 键值对格式：至少需要curr, volt, temp, charge四个字段
-            required_keys = {'curr', 'volt', 'temp', 'charge'}
-            found_keys = set(match.group(1).lower() for match in self.key_value_pattern.finditer(info_text))
-            return len(required_keys & found_keys) >= 3  # 至少3个关键字段
+            fields = KEY_VALUE_PATTERN.findall(info_text)
+            found_keys = set(key.lower() for key, _ in fields)
+            # 键值对格式：至少需要curr, volt, temp, charge中的3个关键字段
+            if len({'curr', 'volt', 'temp', 'charge'} & found_keys) < 3:
+                return None
+            kind = FORMAT_KEY_VALUE
         else:
+            fields = VALUE_PATTERN.findall(info_text)
             # 数值格式：至少需要4个数值
-            values = self.value_pattern.findall(info_text)
-            return len(values) >= 4
+            if len(fields) < 4:
+                return None
+            kind = FORMAT_NUMERIC
+        
+        return self._scan_time(line), kind, fields
+    
+    def _scan_time(self, line: str) -> Optional[str]:
+        """
+        扫描时间标记，优先级与 extract_time 一致：HH:MM:SS 优先于 I>秒数
+        
+        Args:
+            line: 日志行文本
+            
+        Returns:
+            Optional[str]: 时间标记，未找到时为 None
+        """
+        match = TIME_TOKEN_PATTERN.search(line)
+        if match is None:
+            return None
+        if match.group(1):
+            return match.group(1)
+        # 先遇到 I>秒数 时，行内后续的 HH:MM:SS 仍然优先
+        hms = HMS_PATTERN.search(line, match.end())
+        return hms.group(0) if hms else match.group(2)
+    
+    def _format_time(self, time_token: Optional[str], line_number: int) -> str:
+        """
+        将时间标记格式化为 HH:MM:SS
+        
+        Args:
+            time_token: HH:MM:SS 或秒数字符串
+            line_number: 行号（作为后备时间）
+            
+        Returns:
+            str: 格式化的时间字符串 (HH:MM:SS)
+        """
+        if time_token is not None and ':' in time_token:
+            # 已经是 HH:MM:SS 格式
+            return time_token
+        return format_seconds(self._time_seconds(time_token, line_number))
+    
+    def _time_seconds(self, time_token: Optional[str], line_number: int) -> float:
+        """
+        将时间标记转换为秒数（列式容器中的时间表示）
+        
+        Args:
+            time_token: HH:MM:SS 或秒数字符串
+            line_number: 行号（作为后备时间）
+            
+        Returns:
+            float: 秒数
+        """
+        if time_token is not None:
+            try:
+                if ':' in time_token:
+                    hours, minutes, secs = time_token.split(':')
+                    return int(hours) * 3600 + int(minutes) * 60 + int(secs)
+                return float(time_token)
+            except Exception as e:
+                logger.warning(f"第 {line_number} 行时间解析错误: {str(e)}")
+        
+        # 使用行号作为后备时间（一天内循环）
+        return float(line_number % 86400)
+    
+    def is_valid_pm_info_line(self, line: str) -> bool:
+        """
+        检查是否为有效的 PM:INFO 行
+        
+        Args:
+            line: 日志行文本
+            
+        Returns:
+            bool: 是否为有效的PM:INFO行
+        """
+        return self.tokenize_line(line) is not None
     
     def safe_parse_float(self, value, default: float = 0.0) -> float:
         """
@@ -116,37 +216,7 @@ class PMInfoParser:
         Returns:
             str: 格式化的时间字符串 (HH:MM:SS)
         """
-        # 尝试提取各种时间格式
-        patterns = [
-            r'(\d{2}:\d{2}:\d{2})',  # HH:MM:SS
-            r'I>(\d+\.\d+)',  # I>秒数
-            r'\d{2}/\d{2}\s+(\d{2}:\d{2}:\d{2})',  # MM/DD HH:MM:SS
-        ]
-        
-        for pattern in patterns:
-            time_match = re.search(pattern, line)
-            if time_match:
-                try:
-                    time_str = time_match.group(1)
-                    
-                    if ':' in time_str:
-                        # 已经是 HH:MM:SS 格式
-                        return time_str
-                    else:
-                        # 转换秒数为 HH:MM:SS
-                        seconds = float(time_str)
-                        hours = int(seconds // 3600)
-                        minutes = int((seconds % 3600) // 60)
-                        secs = int(seconds % 60)
-                        return f"{hours:02d}:{minutes:02d}:{secs:02d}"
-                except Exception as e:
-                    logger.warning(f"第 {line_number} 行时间解析错误: {str(e)}")
-        
-        # 使用行号作为后备时间
-        seconds = line_number % 3600
-        minutes = (line_number // 60) % 60
-        hours = (line_number // 3600) % 24
-        return f"{hours:02d}:{minutes:02d}:{seconds:02d}"
+        return self._format_time(self._scan_time(line), line_number)
     
     def parse_key_value_format(self, info_text: str) -> Tuple[float, float, float, int]:
         """
@@ -157,6 +227,18 @@ class PMInfoParser:
         Args:
             info_text: PM:INFO 后的文本
             
+        Returns:
+            Tuple[电流, 电压, 温度, 充电状态]
+        """
+        return self._parse_pairs(self.key_value_pattern.findall(info_text))
+    
+    def _parse_pairs(self, pairs: List[Tuple[str, str]]) -> Tuple[float, float, float, int]:
+        """
+        解析已提取的键值对（供单次扫描路径复用）
+        
+        Args:
+            pairs: (键, 值) 列表
+            
         Returns:
             Tuple[电流, 电压, 温度, 充电状态]
         """
@@ -165,9 +247,8 @@ class PMInfoParser:
         temp = 0.0
         charging = 0
         
-        for match in self.key_value_pattern.finditer(info_text):
-            key = match.group(1).lower()
-            value = match.group(2)
+        for key, value in pairs:
+            key = key.lower()
             
             if key == 'curr':
                 current = self.safe_parse_float(value)
@@ -200,8 +281,19 @@ class PMInfoParser:
         Returns:
             Tuple[电流, 电压, 温度, 充电状态]
         """
-        values = self.value_pattern.findall(info_text)
+        return self._parse_numbers(self.value_pattern.findall(info_text), line_number)
+    
+    def _parse_numbers(self, values: List[str], line_number: int) -> Tuple[float, float, float, int]:
+        """
+        解析已提取的数值列表（供单次扫描路径复用）
         
+        Args:
+            values: 数值字符串列表
+            line_number: 行号（用于日志）
+            
+        Returns:
+            Tuple[电流, 电压, 温度, 充电状态]
+        """
         if len(values) < 8:
             logger.warning(f"第 {line_number} 行数值不足8个，实际找到 {len(values)} 个")
             values.extend(['0'] * (8 - len(values)))
@@ -236,57 +328,174 @@ class PMInfoParser:
             Tuple[电流(μA), 电压(V), 温度(°C), 充电状态(0-7)]
         """
         try:
-            # 提取 PM:INFO 后的内容
-            info_start = line.upper().find("PM:INFO") + 7
-            info_text = line[info_start:]
+            tokens = self.tokenize_line(line)
+            if tokens is None:
+                # 非有效行：按原有方式解析 PM:INFO 后的内容
+                info_text = line[line.upper().find("PM:INFO") + 7:]
+                if '=' in info_text:
+                    return self.parse_key_value_format(info_text)
+                return self.parse_numeric_format(info_text, line_number)
             
             # 根据格式选择解析方法
-            if '=' in info_text:
-                return self.parse_key_value_format(info_text)
+            _, kind, fields = tokens
+            if kind == FORMAT_KEY_VALUE:
+                return self._parse_pairs(fields)
             else:
-                return self.parse_numeric_format(info_text, line_number)
+                return self._parse_numbers(fields, line_number)
                 
         except Exception as e:
             logger.error(f"第 {line_number} 行数值解析失败: {str(e)}")
             return 0.0, 0.0, 0.0, 0
     
-    def parse_file(self, file_path: str) -> Dict[str, List]:
+    def parse_line(self, line: str, line_number: int) -> Optional[Tuple[float, float, float, float, int]]:
+        """
+        单次扫描解析一行：验证与数值提取共用同一次分词结果
+        
+        Args:
+            line: 日志行文本
+            line_number: 行号
+            
+        Returns:
+            Optional[Tuple[时间(秒), 电流, 电压, 温度, 充电状态]]: 非有效 PM:INFO 行返回 None
+        """
+        tokens = self.tokenize_line(line)
+        if tokens is None:
+            return None
+        
+        time_token, kind, fields = tokens
+        if kind == FORMAT_KEY_VALUE:
+            current, voltage, temp, charging = self._parse_pairs(fields)
+        else:
+            current, voltage, temp, charging = self._parse_numbers(fields, line_number)
+        
+        return self._time_seconds(time_token, line_number), current, voltage, temp, charging
+    
+    def iter_records(
+        self,
+        lines: Iterable[str],
+        sniff_lines: Optional[int] = None,
+        first_line: int = 1
+    ) -> Iterator[Tuple[float, float, float, float, int]]:
+        """
+        流式解析：逐行验证并提取，不在内存中保留原始文本
+        
+        Args:
+            lines: 可迭代的日志行（如打开的文件对象）
+            sniff_lines: 若前 N 行内没有出现 PM:INFO 则提前终止，None 表示不检查
+            first_line: 第一行的行号（分块解析时为块在文件中的起始行号）
+            
+        Yields:
+            Tuple[时间(秒), 电流, 电压, 温度, 充电状态]
+            
+        Raises:
+            ValueError: 前 sniff_lines 行内未找到 PM:INFO
+        """
+        self.lines_scanned = 0
+        self.samples_found = 0
+        parse_errors = 0
+        found_tag = sniff_lines is None
+        for line_number, line in enumerate(lines, first_line):
+            self.lines_scanned = line_number - first_line + 1
+            
+            # 快速格式检查（与解析合并在同一次遍历中）
+            if not found_tag:
+                if "PM:INFO" in line.upper():
+                    found_tag = True
+                    logger.info(f"在第 {line_number} 行找到 PM:INFO")
+                elif self.lines_scanned >= sniff_lines:
+                    raise ValueError("文件中未找到 PM:INFO 内容，请确认文件格式是否正确")
+            
+            try:
+                record = self.parse_line(line, line_number)
+            except Exception as e:
+                parse_errors += 1
+                logger.warning(f"处理第 {line_number} 行时出错: {str(e)}")
+                if parse_errors > 10:
+                    logger.error("解析错误过多，终止解析")
+                    break
+                continue
+            
+            if record is not None:
+                self.samples_found += 1
+                yield record
+        
+        if parse_errors > 0:
+            logger.warning(f"⚠️ 解析过程中跳过了 {parse_errors} 行错误数据")
+    
+    def parse_file(self, file_path: str, streaming: bool = False) -> PMInfoSeries:
         """
         解析日志文件
         
         Args:
             file_path: 日志文件路径
+            streaming: 是否使用流式单次扫描模式（内存占用与文件大小无关）
             
         Returns:
-            Dict: 包含时间序列数据的字典
-                - times: 时间列表
-                - currents: 电流列表 (μA)
-                - temperatures: 温度列表 (°C)
-                - voltages: 电压列表 (V)
-                - charging_states: 充电状态列表 (0-7)
+            PMInfoSeries: 列式存储的时间序列数据
+                - times: 时间 (秒)
+                - currents: 电流 (μA)
+                - temperatures: 温度 (°C)
+                - voltages: 电压 (V)
+                - charging_states: 充电状态 (0-7)
                 
         Raises:
             ValueError: 文件读取或解析失败
         """
         logger.info(f"开始解析文件: {file_path}")
         
+        try:
+            with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
+                return self.parse_stream(f, streaming=streaming)
+        except OSError as e:
+            error_msg = f"读取文件失败: {str(e)}"
+            logger.error(error_msg)
+            raise ValueError(error_msg)
+    
+    def parse_stream(
+        self,
+        source: Iterable,
+        streaming: bool = False,
+        sniff_lines: Optional[int] = None,
+        encoding: str = 'utf-8'
+    ) -> PMInfoSeries:
+        """
+        从文件对象或字节流解析（如上传文件的 request.files['file'].stream）
+        
+        Args:
+            source: 可按行迭代的文本或二进制文件对象
+            streaming: 是否使用流式单次扫描模式
+            sniff_lines: 前 N 行内未出现 PM:INFO 时提前终止
+            encoding: 二进制流的文本编码（无法解码的字节将被忽略）
+            
+        Returns:
+            PMInfoSeries: 列式存储的时间序列数据
+            
+        Raises:
+            ValueError: 读取或解析失败
+        """
+        lines = iter_text_lines(source, encoding)
+        if streaming:
+            return self._parse_lines_streaming(lines, sniff_lines)
+        
         # 初始化数据容器
-        times = []
-        currents = []
-        temperatures = []
-        voltages = []
-        charging_states = []
+        series = PMInfoSeries()
         
-        # 读取文件
+        # 读取全部行
+        self.lines_scanned = 0
+        self.samples_found = 0
         try:
-            with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                content = f.readlines()
-                logger.info(f"成功读取文件，共 {len(content)} 行")
+            content = list(lines)
+            logger.info(f"成功读取文件，共 {len(content)} 行")
         except Exception as e:
             error_msg = f"读取文件失败: {str(e)}"
             logger.error(error_msg)
             raise ValueError(error_msg)
         
+        # 快速检查文件头部是否包含 PM:INFO
+        if sniff_lines is not None and \
+                not any("PM:INFO" in line.upper() for line in content[:sniff_lines]):
+            raise ValueError("文件中未找到 PM:INFO 内容，请确认文件格式是否正确")
+        
         # 预验证：检查文件是否包含有效数据
         valid_lines = [line for line in content if self.is_valid_pm_info_line(line)]
         if not valid_lines:
@@ -299,20 +508,18 @@ class PMInfoParser:
         # 解析每一行
         parse_errors = 0
         for line_number, line in enumerate(content, 1):
+            self.lines_scanned = line_number
             try:
                 if not self.is_valid_pm_info_line(line):
                     continue
                 
                 # 提取时间和数值
-                time = self.extract_time(line, line_number)
+                time = self._time_seconds(self._scan_time(line), line_number)
                 current, voltage, temp, charging = self.extract_values(line, line_number)
                 
-                # 添加到列表
-                times.append(time)
-                currents.append(current)
-                temperatures.append(temp)
-                voltages.append(voltage)
-                charging_states.append(charging)
+                # 添加到容器
+                series.append(time, current, voltage, temp, charging)
+                self.samples_found += 1
                 
             except Exception as e:
                 parse_errors += 1
@@ -323,20 +530,217 @@ class PMInfoParser:
                 continue
         
         # 验证解析结果
-        if not times:
+        if not series:
             error_msg = "未能成功解析任何 PM:INFO 数据行"
             logger.error(error_msg)
             raise ValueError(error_msg + "。请检查文件内容是否正确。")
         
-        logger.info(f"✅ 成功解析 {len(times)} 条数据")
+        logger.info(f"✅ 成功解析 {len(series)} 条数据")
+        if parse_errors > 0:
+            logger.warning(f"⚠️ 解析过程中跳过了 {parse_errors} 行错误数据")
+        
+        return series
+    
+    def _parse_lines_streaming(self, lines: Iterable[str], sniff_lines: Optional[int] = None) -> PMInfoSeries:
+        """
+        流式单次扫描解析
+        
+        Args:
+            lines: 可迭代的日志行
+            sniff_lines: 前 N 行内未出现 PM:INFO 时提前终止
+            
+        Returns:
+            PMInfoSeries: 列式存储的时间序列数据
+            
+        Raises:
+            ValueError: 解析失败
+        """
+        series = PMInfoSeries()
+        
+        for record in self.iter_records(lines, sniff_lines=sniff_lines):
+            series.append(*record)
+        
+        logger.info(f"流式扫描 {self.lines_scanned} 行")
+        
+        if not series:
+            error_msg = "文件中未找到有效的 PM:INFO 数据行"
+            logger.error(error_msg)
+            raise ValueError(error_msg + "。请确认文件格式是否正确。")
+        
+        logger.info(f"✅ 成功解析 {len(series)} 条数据")
+        
+        return series
+
+    
+    def iter_buffer_records(
+        self,
+        buffer: Union[bytes, mmap.mmap],
+        sniff_lines: Optional[int] = None,
+        encoding: str = 'utf-8'
+    ) -> Iterator[Tuple[float, float, float, float, int]]:
+        """
+        字节级扫描：直接在 bytes/mmap 中定位 PM:INFO，只解码候选行
+        
+        非 PM:INFO 行不做解码，只参与 C 层面的换行计数（用于行号）。
+        
+        Args:
+            buffer: 日志内容（bytes 或只读 mmap）
+            sniff_lines: 前 N 行内未出现 PM:INFO 时提前终止
+            encoding: 文本编码
+            
+        Yields:
+            Tuple[时间(秒), 电流, 电压, 温度, 充电状态]
+            
+        Raises:
+            ValueError: 前 sniff_lines 行内未找到 PM:INFO
+        """
+        self.lines_scanned = 0
+        self.samples_found = 0
+        parse_errors = 0
+        next_pos = 0
+        counted_pos = 0
+        line_number = 1
+        
+        for match in PM_INFO_BYTES_PATTERN.finditer(buffer):
+            tag = match.start() - 2
+            # 同一行的后续匹配已随整行处理
+            if tag < next_pos or buffer[tag:tag + 2].upper() != b'PM':
+                continue
+            
+            # 行边界：\n 或单独的 \r（与文本模式的通用换行一致）
+            line_start = buffer.rfind(b'\n', 0, tag) + 1
+            line_start = buffer.rfind(b'\r', line_start, tag) + 1 or line_start
+            line_end = buffer.find(b'\n', tag)
+            line_end = len(buffer) if line_end < 0 else line_end + 1
+            cr = buffer.find(b'\r', tag, line_end)
+            if cr >= 0 and buffer[cr + 1:cr + 2] != b'\n':
+                line_end = cr + 1
+            next_pos = line_end
+            
+            # 累计换行数得到行号
+            line_number += count_lines(buffer[counted_pos:line_start])
+            counted_pos = line_start
+            self.lines_scanned = line_number
+            
+            if sniff_lines is not None:
+                if line_number > sniff_lines:
+                    raise ValueError("文件中未找到 PM:INFO 内容，请确认文件格式是否正确")
+                logger.info(f"在第 {line_number} 行找到 PM:INFO")
+                sniff_lines = None
+            
+            line = buffer[line_start:line_end].decode(encoding, errors='ignore')
+            try:
+                record = self.parse_line(line, line_number)
+            except Exception as e:
+                parse_errors += 1
+                logger.warning(f"处理第 {line_number} 行时出错: {str(e)}")
+                if parse_errors > 10:
+                    logger.error("解析错误过多，终止解析")
+                    break
+                continue
+            
+            if record is not None:
+                self.samples_found += 1
+                yield record
+        
+        if sniff_lines is not None:
+            raise ValueError("文件中未找到 PM:INFO 内容，请确认文件格式是否正确")
+        
+        self.lines_scanned = line_number + count_lines(buffer[counted_pos:])
         if parse_errors > 0:
             logger.warning(f"⚠️ 解析过程中跳过了 {parse_errors} 行错误数据")
+    
+    def parse_mmap(
+        self,
+        source: Union[str, BinaryIO],
+        sniff_lines: Optional[int] = None
+    ) -> PMInfoSeries:
+        """
+        内存映射解析：文件不整体解码为 str，只解码包含 PM:INFO 的行
+        
+        Args:
+            source: 文件路径或二进制文件对象（BytesIO 直接使用其内容，
+                其余对象需支持 fileno()）
+            sniff_lines: 前 N 行内未出现 PM:INFO 时提前终止
+            
+        Returns:
+            PMInfoSeries: 列式存储的时间序列数据
+            
+        Raises:
+            ValueError: 文件为空、读取或解析失败
+        """
+        series = PMInfoSeries()
+        
+        if isinstance(source, io.BytesIO):
+            buffer = source.getvalue()
+            if not buffer:
+                raise ValueError("文件为空")
+            for record in self.iter_buffer_records(buffer, sniff_lines=sniff_lines):
+                series.append(*record)
+        else:
+            try:
+                f = open(source, 'rb') if isinstance(source, str) else None
+                fileno = (f or source).fileno()
+                try:
+                    with mmap.mmap(fileno, 0, access=mmap.ACCESS_READ) as buffer:
+                        for record in self.iter_buffer_records(buffer, sniff_lines=sniff_lines):
+                            series.append(*record)
+                finally:
+                    if f is not None:
+                        f.close()
+            except ValueError as e:
+                # 空文件无法映射
+                if 'empty file' in str(e):
+                    raise ValueError("文件为空")
+                raise
+            except OSError as e:
+                error_msg = f"读取文件失败: {str(e)}"
+                logger.error(error_msg)
+                raise ValueError(error_msg)
+        
+        logger.info(f"内存映射扫描 {self.lines_scanned} 行")
+        
+        if not series:
+            error_msg = "文件中未找到有效的 PM:INFO 数据行"
+            logger.error(error_msg)
+            raise ValueError(error_msg + "。请确认文件格式是否正确。")
+        
+        logger.info(f"✅ 成功解析 {len(series)} 条数据")
+        
+        return series
+
+
+def iter_text_lines(source: Iterable, encoding: str = 'utf-8') -> Iterator[str]:
+    """
+    按行迭代文本或二进制来源，二进制行逐行解码
+    
+    UTF-8 多字节序列中不会出现换行字节，因此逐行解码与整体解码结果一致；
+    单独的 \r 按文本模式（通用换行）同样视为换行，保证行号一致。
+    
+    Args:
+        source: 文本/二进制文件对象或字符串列表
+        encoding: 二进制内容的编码
+        
+    Yields:
+        str: 解码后的行
+    """
+    for line in source:
+        if isinstance(line, bytes):
+            line = line.decode(encoding, errors='ignore')
+            if '\r' in line:
+                yield from line.replace('\r\n', '\n').replace('\r', '\n').splitlines(keepends=True)
+                continue
+        yield line
+
+
+def count_lines(data: bytes) -> int:
+    """
+    按通用换行规则（\n、\r\n、单独的 \r）统计换行数
+    
+    Args:
+        data: 字节内容
         
-        # 返回结果
-        return {
-            'times': times,
-            'currents': currents,
-            'temperatures': temperatures,
-            'voltages': voltages,
-            'charging_states': charging_states
-        }
+    Returns:
+        int: 换行数
+    """
+    return data.count(b'\n') + data.count(b'\r') - data.count(b'\r\n')
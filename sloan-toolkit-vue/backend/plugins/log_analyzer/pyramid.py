@@ -0,0 +1,203 @@
+"""
+多分辨率瓦片金字塔
+
+解析完成后按 2 的幂次逐级聚合（每级桶大小翻倍），每个桶保存 min/max/mean，
+缩放时只返回请求窗口内、合适分辨率的瓦片：
+- 第 0 级为原始样本（直接使用列式容器，不额外存储）
+- 第 k 级每个桶覆盖 2^k 个样本
+- 每个瓦片包含 TILE_SIZE 个桶
+
+窗口以样本序号表示（与前端图表的 x 轴一致）。
+"""
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from .series import PMInfoSeries, format_seconds
+
+# 每个瓦片包含的桶数
+TILE_SIZE = 512
+
+# 参与聚合的序列
+PYRAMID_COLUMNS = ('currents', 'temperatures', 'voltages')
+
+
+class _Level:
+    """单个级别的聚合数据（float32 存储）"""
+
+    __slots__ = ('mins', 'maxs', 'sums', 'counts')
+
+    def __init__(self, mins: Dict, maxs: Dict, sums: Dict, counts: np.ndarray):
+        self.mins = mins
+        self.maxs = maxs
+        self.sums = sums
+        self.counts = counts
+
+    def __len__(self) -> int:
+        return len(self.counts)
+
+    @property
+    def nbytes(self) -> int:
+        return self.counts.nbytes + sum(
+            self.mins[name].nbytes + self.maxs[name].nbytes + self.sums[name].nbytes
+            for name in PYRAMID_COLUMNS
+        )
+
+
+def _pairwise(values: np.ndarray, ufunc, pad_value) -> np.ndarray:
+    """相邻两个桶合并（奇数长度时补齐最后一个）"""
+    if len(values) % 2:
+        values = np.append(values, pad_value)
+    return ufunc(values[0::2], values[1::2])
+
+
+class TilePyramid:
+    """PM:INFO 时间序列的多分辨率瓦片金字塔"""
+
+    def __init__(self, series: PMInfoSeries, levels: List[_Level]):
+        self.series = series
+        self.levels = levels
+
+    @classmethod
+    def build(cls, series: PMInfoSeries) -> 'TilePyramid':
+        """
+        由列式容器构建金字塔，逐级两两合并，总耗时 O(n)
+
+        Args:
+            series: 解析结果
+
+        Returns:
+            TilePyramid: 金字塔（levels[k - 1] 为第 k 级）
+        """
+        levels = []
+        raw = {name: np.frombuffer(getattr(series, name), dtype=np.float64) for name in PYRAMID_COLUMNS}
+        mins = maxs = sums = raw
+        counts = np.ones(len(series), dtype=np.int64)
+
+        while len(counts) > 1:
+            mins = {name: _pairwise(mins[name], np.minimum, np.inf).astype(np.float32) for name in PYRAMID_COLUMNS}
+            maxs = {name: _pairwise(maxs[name], np.maximum, -np.inf).astype(np.float32) for name in PYRAMID_COLUMNS}
+            sums = {name: _pairwise(sums[name], np.add, 0.0) for name in PYRAMID_COLUMNS}
+            counts = _pairwise(counts, np.add, 0)
+            levels.append(_Level(mins, maxs, sums, counts))
+
+        return cls(series, levels)
+
+    def __len__(self) -> int:
+        return len(self.series)
+
+    @property
+    def max_level(self) -> int:
+        return len(self.levels)
+
+    @property
+    def nbytes(self) -> int:
+        """金字塔及原始数据占用的字节数"""
+        return self.series.nbytes + sum(level.nbytes for level in self.levels)
+
+    def level_for(self, start: int, end: int, max_points: int) -> int:
+        """
+        选择满足点数限制的最精细级别
+
+        Args:
+            start: 窗口起始样本序号
+            end: 窗口结束样本序号（不含）
+            max_points: 窗口内最大桶数
+
+        Returns:
+            int: 级别
+        """
+        span = max(1, end - start)
+        level = 0
+        while level < self.max_level and (span >> level) > max(1, max_points):
+            level += 1
+        return level
+
+    def tiles(self, start: int, end: int, level: int) -> List[Dict]:
+        """
+        返回覆盖窗口 [start, end) 的瓦片
+
+        Args:
+            start: 窗口起始样本序号
+            end: 窗口结束样本序号（不含）
+            level: 级别（0 为原始样本）
+
+        Returns:
+            List[Dict]: 瓦片列表，每个瓦片包含各桶的起始时间和 min/max/mean
+        """
+        level = max(0, min(level, self.max_level))
+        bucket_size = 1 << level
+        n_buckets = len(self.levels[level - 1]) if level else len(self.series)
+        span = TILE_SIZE * bucket_size
+
+        first_tile = max(0, start) // span
+        last_tile = (min(end, len(self.series)) - 1) // span
+        return [
+            self._tile(level, index, bucket_size, n_buckets)
+            for index in range(first_tile, last_tile + 1)
+        ]
+
+    def _tile(self, level: int, index: int, bucket_size: int, n_buckets: int) -> Dict:
+        """构造单个瓦片"""
+        lo = index * TILE_SIZE
+        hi = min(lo + TILE_SIZE, n_buckets)
+        start_samples = np.arange(lo, hi) * bucket_size
+        times = self.series.times
+
+        tile = {
+            'index': index,
+            'start': lo * bucket_size,
+            'count': hi - lo,
+            'times': [format_seconds(times[i]) for i in start_samples],
+        }
+        for name in PYRAMID_COLUMNS:
+            if level == 0:
+                values = np.frombuffer(getattr(self.series, name), dtype=np.float64)[lo:hi].tolist()
+                tile[name] = {'min': values, 'max': values, 'mean': values}
+            else:
+                data = self.levels[level - 1]
+                tile[name] = {
+                    'min': data.mins[name][lo:hi].tolist(),
+                    'max': data.maxs[name][lo:hi].tolist(),
+                    'mean': (data.sums[name][lo:hi] / data.counts[lo:hi]).tolist(),
+                }
+        return tile
+
+
+def query_tiles(
+    pyramid: TilePyramid,
+    start: int = 0,
+    end: Optional[int] = None,
+    max_points: int = TILE_SIZE * 4,
+    level: Optional[int] = None
+) -> Dict:
+    """
+    按窗口和分辨率查询瓦片
+
+    Args:
+        pyramid: 瓦片金字塔
+        start: 窗口起始样本序号
+        end: 窗口结束样本序号（不含），None 表示到末尾
+        max_points: 未指定级别时，窗口内的最大桶数
+        level: 指定级别
+
+    Returns:
+        Dict: 查询结果
+    """
+    total = len(pyramid)
+    end = total if end is None else min(end, total)
+    start = max(0, min(start, end))
+    if level is None:
+        level = pyramid.level_for(start, end, max_points)
+    level = max(0, min(level, pyramid.max_level))
+
+    return {
+        'total_points': total,
+        'start': start,
+        'end': end,
+        'level': level,
+        'bucket_size': 1 << level,
+        'max_level': pyramid.max_level,
+        'tile_size': TILE_SIZE,
+        'tiles': pyramid.tiles(start, end, level) if end > start else [],
+    }
@@ -0,0 +1,125 @@
+"""
+PM:INFO 时间序列列式容器
+
+使用 array 模块按列紧凑存储解析结果，避免每个样本都创建 Python 对象：
+- times: 时间（秒，array('d')）
+- currents: 电流 μA（array('d')）
+- temperatures: 温度 °C（array('d')）
+- voltages: 电压 V（array('d')）
+- charging_states: 充电状态 0-7（array('b')）
+"""
+from array import array
+from typing import Dict, Iterator, List, Sequence, Tuple
+
+import numpy as np
+
+
+def format_seconds(seconds: float) -> str:
+    """
+    将秒数格式化为 HH:MM:SS
+
+    Args:
+        seconds: 秒数
+
+    Returns:
+        str: 格式化的时间字符串
+    """
+    hours = int(seconds // 3600)
+    minutes = int((seconds % 3600) // 60)
+    secs = int(seconds % 60)
+    return f"{hours:02d}:{minutes:02d}:{secs:02d}"
+
+
+class PMInfoSeries:
+    """PM:INFO 解析结果的列式容器"""
+
+    # 列名与 array 类型码
+    COLUMNS = (
+        ('times', 'd'),
+        ('currents', 'd'),
+        ('temperatures', 'd'),
+        ('voltages', 'd'),
+        ('charging_states', 'b'),
+    )
+
+    def __init__(self):
+        """初始化空列"""
+        self.times = array('d')
+        self.currents = array('d')
+        self.temperatures = array('d')
+        self.voltages = array('d')
+        self.charging_states = array('b')
+
+    def append(self, time: float, current: float, voltage: float, temp: float, charging: int) -> None:
+        """
+        追加一个样本
+
+        Args:
+            time: 时间（秒）
+            current: 电流 (μA)
+            voltage: 电压 (V)
+            temp: 温度 (°C)
+            charging: 充电状态 (0-7)
+        """
+        self.times.append(time)
+        self.currents.append(current)
+        self.temperatures.append(temp)
+        self.voltages.append(voltage)
+        self.charging_states.append(charging)
+
+    def extend(self, other: 'PMInfoSeries') -> None:
+        """
+        按顺序拼接另一个容器的全部样本
+
+        Args:
+            other: 另一个 PMInfoSeries
+        """
+        for name, _ in self.COLUMNS:
+            getattr(self, name).extend(getattr(other, name))
+
+    def take(self, indices: Sequence[int]) -> 'PMInfoSeries':
+        """
+        按索引取出样本子集
+
+        Args:
+            indices: 样本索引（升序）
+
+        Returns:
+            PMInfoSeries: 新的容器
+        """
+        subset = PMInfoSeries()
+        for name, typecode in self.COLUMNS:
+            values = np.frombuffer(getattr(self, name), dtype=np.dtype(typecode))[indices]
+            getattr(subset, name).frombytes(values.tobytes())
+        return subset
+
+    def __len__(self) -> int:
+        return len(self.times)
+
+    def __iter__(self) -> Iterator[Tuple[float, float, float, float, int]]:
+        """按样本迭代 (时间, 电流, 电压, 温度, 充电状态)"""
+        return zip(self.times, self.currents, self.voltages, self.temperatures, self.charging_states)
+
+    @property
+    def nbytes(self) -> int:
+        """各列数据占用的字节数"""
+        return sum(len(col) * col.itemsize for col in (getattr(self, name) for name, _ in self.COLUMNS))
+
+    def time_labels(self) -> List[str]:
+        """返回 HH:MM:SS 格式的时间标签列表"""
+        return [format_seconds(t) for t in self.times]
+
+    def to_dict(self) -> Dict[str, List]:
+        """
+        转换为可 JSON 序列化的字典（前端图表使用的格式）
+
+        Returns:
+            Dict: times 为 HH:MM:SS 字符串，其余为数值列表
+        """
+        return {
+            'times': self.time_labels(),
+            'currents': self.currents.tolist(),
+            'temperatures': self.temperatures.tolist(),
+            'voltages': self.voltages.tolist(),
+            'charging_states': self.charging_states.tolist()
+        }
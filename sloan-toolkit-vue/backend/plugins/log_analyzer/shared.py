@@ -0,0 +1,84 @@
+"""
+多 worker 部署时进程间共享的数据集
+
+gunicorn 等多进程部署中，上传请求与之后的瓦片、图表请求可能由不同的 worker 处理。
+解析结果（列式数据，按原始字节）写入共享目录，其他 worker 的内存中没有该数据集时
+从这里读取并重建瓦片金字塔。
+"""
+import logging
+import os
+import re
+import struct
+from typing import Optional
+
+from .series import PMInfoSeries
+from utils.file_utils import atomic_write, evict_oldest_files
+
+logger = logging.getLogger(__name__)
+
+# 数据集 ID 为上传内容的 SHA-256
+_DATASET_ID = re.compile(r'[0-9a-f]{64}')
+
+_SUFFIX = '.series'
+
+
+class SharedDatasetStore:
+    """共享目录中的数据集（文件格式：uint64 样本数 + 各列原始字节）"""
+
+    def __init__(self, directory: str, max_bytes: int = 1024 * 1024 * 1024):
+        """
+        Args:
+            directory: 共享目录（所有 worker 可读写）
+            max_bytes: 目录中数据集总字节数上限，超过时删除最旧的
+        """
+        self.directory = directory
+        self.max_bytes = max_bytes
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, dataset_id: str) -> Optional[str]:
+        if not _DATASET_ID.fullmatch(dataset_id):
+            return None
+        return os.path.join(self.directory, dataset_id + _SUFFIX)
+
+    def put(self, dataset_id: str, series: PMInfoSeries) -> None:
+        """写入数据集（已存在时只更新修改时间）"""
+        path = self._path(dataset_id)
+        if path is None:
+            return
+        try:
+            if os.path.exists(path):
+                os.utime(path)
+                return
+            columns = [getattr(series, name).tobytes() for name, _ in PMInfoSeries.COLUMNS]
+            atomic_write(path, b''.join([struct.pack('<Q', len(series))] + columns))
+            evict_oldest_files(self.directory, _SUFFIX, self.max_bytes)
+        except OSError as e:
+            logger.warning(f"写入共享数据集失败: {str(e)}")
+
+    def get(self, dataset_id: str) -> Optional[PMInfoSeries]:
+        """读取数据集，不存在或文件损坏时返回 None"""
+        path = self._path(dataset_id)
+        if path is None:
+            return None
+        try:
+            with open(path, 'rb') as f:
+                raw = f.read()
+        except FileNotFoundError:
+            return None
+        except OSError as e:
+            logger.warning(f"读取共享数据集失败: {str(e)}")
+            return None
+
+        series = PMInfoSeries()
+        columns = [getattr(series, name) for name, _ in PMInfoSeries.COLUMNS]
+        count = struct.unpack_from('<Q', raw)[0] if len(raw) >= 8 else -1
+        if count < 0 or len(raw) != 8 + count * sum(column.itemsize for column in columns):
+            logger.warning(f"共享数据集文件损坏: {dataset_id}")
+            return None
+
+        offset = 8
+        for column in columns:
+            size = count * column.itemsize
+            column.frombytes(raw[offset:offset + size])
+            offset += size
+        return series
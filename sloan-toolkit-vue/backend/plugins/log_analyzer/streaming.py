@@ -0,0 +1,82 @@
+"""
+NDJSON 流式响应
+
+边解析边按批次输出样本，不在内存中拼接完整的 JSON 文本，每行一个 JSON 对象：
+- {"type": "meta", ...}                 数据集 ID 等元数据
+- {"type": "samples", "times": [...], ...} 一批样本（字段与 /analyze 的 data 相同）
+- {"type": "stats", "stats": {...}, ...}   解析完成后的统计数据
+- {"type": "error", "error": ..., ...}     解析中途出错（响应头已发送，无法再改状态码）
+"""
+import json
+import logging
+from typing import Callable, Dict, Iterable, Iterator, Tuple
+
+from .series import PMInfoSeries
+
+logger = logging.getLogger(__name__)
+
+NDJSON_MIMETYPE = 'application/x-ndjson'
+
+# 每行的样本数
+NDJSON_BATCH_SIZE = 2000
+
+
+def _line(payload: Dict) -> bytes:
+    return json.dumps(payload).encode('utf-8') + b'\n'
+
+
+def iter_ndjson(
+    records: Iterable[Tuple[float, float, float, float, int]],
+    header: Dict,
+    finalize: Callable[[PMInfoSeries], Dict],
+    on_error: Callable[[Exception], Dict],
+    batch_size: int = NDJSON_BATCH_SIZE
+) -> Iterator[bytes]:
+    """
+    将解析记录转换为 NDJSON 行
+
+    第一行在取到第一条记录后才输出，因此格式错误（如快速格式检查失败）
+    会在发送响应头之前抛出，调用方可以先取第一行再决定返回 400。
+
+    Args:
+        records: 解析记录迭代器（PMInfoParser.iter_records）
+        header: meta 行的内容
+        finalize: 解析完成后调用，参数为完整序列，返回 stats 行的内容
+        on_error: 中途出错时调用，返回 error 行的内容
+        batch_size: 每行的样本数
+
+    Yields:
+        bytes: 以换行结尾的 JSON 行
+
+    Raises:
+        ValueError: 未找到有效数据（在输出第一行之前）
+    """
+    records = iter(records)
+    first = next(records, None)
+    if first is None:
+        error_msg = "文件中未找到有效的 PM:INFO 数据行"
+        logger.error(error_msg)
+        raise ValueError(error_msg + "。请确认文件格式是否正确。")
+
+    yield _line({'type': 'meta', **header})
+
+    # 统计分位数和瓦片金字塔仍需要完整的列数据（每个样本约 33 字节），
+    # 但不会生成完整的 JSON 文本
+    series = PMInfoSeries()
+    batch = PMInfoSeries()
+    batch.append(*first)
+    try:
+        for record in records:
+            batch.append(*record)
+            if len(batch) >= batch_size:
+                yield _line({'type': 'samples', **batch.to_dict()})
+                series.extend(batch)
+                batch = PMInfoSeries()
+        if batch:
+            yield _line({'type': 'samples', **batch.to_dict()})
+            series.extend(batch)
+
+        logger.info(f"✅ 流式输出 {len(series)} 条数据")
+        yield _line({'type': 'stats', **finalize(series)})
+    except Exception as e:
+        yield _line({'type': 'error', **on_error(e)})
@@ -0,0 +1,264 @@
+"""
+分块（可续传）上传
+
+客户端按顺序分块上传文件，每个块到达后立即送入解析器，服务端不重组完整文件：
+- 跨块的不完整行保留在缓冲区中，与下一个块拼接
+- 行号、快速格式检查和错误计数与整文件流式解析一致
+- 边接收边计算 SHA-256，完成后作为数据集 ID 和缓存键
+- gzip / zstd 压缩文件逐块解压后再解析
+
+每个块携带其在文件中的字节偏移量，重复发送已接收的块会被忽略，
+客户端可根据 received_bytes 从断点继续上传。
+
+解析状态保存在创建会话的进程中，多 worker 部署时同一会话的请求须由同一个 worker 处理。
+"""
+import hashlib
+import io
+import logging
+import os
+import threading
+import time
+import uuid
+from typing import Dict, Optional
+
+from .compression import IncrementalDecompressor
+from .parser import PMInfoParser, iter_text_lines
+from .series import PMInfoSeries
+
+logger = logging.getLogger(__name__)
+
+# 单行最大字节数，超过时视为格式错误（避免没有换行的数据使行缓冲区无限增长）
+MAX_LINE_BYTES = 1024 * 1024
+
+
+class UploadOffsetError(Exception):
+    """块偏移量与已接收字节数不连续"""
+
+
+class ChunkedUpload:
+    """单个分块上传会话：增量解析已到达的内容"""
+
+    def __init__(
+        self,
+        upload_id: str,
+        filename: str,
+        max_bytes: int,
+        sniff_lines: Optional[int] = None,
+        encoding: str = 'utf-8',
+        options: Optional[Dict] = None,
+        decompressor: Optional[IncrementalDecompressor] = None
+    ):
+        """
+        Args:
+            upload_id: 会话 ID
+            filename: 原始文件名
+            max_bytes: 允许上传的最大字节数
+            sniff_lines: 前 N 行内未出现 PM:INFO 时提前终止
+            encoding: 文本编码
+            options: 完成时使用的分析参数（如降采样设置）
+            decompressor: 压缩文件的逐块解压器，None 表示未压缩
+        """
+        self.id = upload_id
+        self.filename = filename
+        self.max_bytes = max_bytes
+        self.encoding = encoding
+        self.options = options or {}
+        self.decompressor = decompressor
+        self.received_bytes = 0
+        self.updated_at = time.time()
+        self.parser = PMInfoParser()
+        self.series = PMInfoSeries()
+        self.lock = threading.Lock()
+
+        self._digest = hashlib.sha256()
+        self._pending = b''
+        self._next_line = 1
+        self._sniff_lines = sniff_lines
+        self._found_tag = sniff_lines is None
+        self._parse_errors = 0
+        self._stopped = False
+
+    def write(self, offset: int, data: bytes) -> int:
+        """
+        写入一个块并解析其中的完整行
+
+        Args:
+            offset: 块在文件中的起始字节偏移量
+            data: 块内容
+
+        Returns:
+            int: 实际新接收的字节数（重复部分不计）
+
+        Raises:
+            UploadOffsetError: offset 大于已接收字节数（中间有缺失）
+            ValueError: 超过大小限制、解压失败或文件格式不正确
+        """
+        if offset > self.received_bytes:
+            raise UploadOffsetError(f"块偏移量 {offset} 不连续，已接收 {self.received_bytes} 字节")
+
+        # 重传的块只取尚未接收的部分
+        data = data[self.received_bytes - offset:]
+        if not data:
+            return 0
+        if self.received_bytes + len(data) > self.max_bytes:
+            raise ValueError(f"文件大小超过限制（最大 {self.max_bytes // 1024 // 1024}MB）")
+
+        self._digest.update(data)
+        self.received_bytes += len(data)
+        self.updated_at = time.time()
+        received = len(data)
+        if self.decompressor is None:
+            self._feed(data)
+        else:
+            # 逐片解析，解压后的内容不会整体驻留内存
+            for piece in self.decompressor.decompress(data):
+                self._feed(piece)
+        return received
+
+    def _feed(self, data: bytes) -> None:
+        """解析到最后一个行边界为止，剩余部分留待下一个块"""
+        buffer = self._pending + data
+        cut = max(buffer.rfind(b'\n'), buffer.rfind(b'\r'))
+        # 末尾的 \r 可能与下一个块开头的 \n 组成 \r\n，暂不处理
+        if cut == len(buffer) - 1 and buffer.endswith(b'\r'):
+            cut = max(buffer.rfind(b'\n', 0, cut), buffer.rfind(b'\r', 0, cut))
+        self._pending = buffer[cut + 1:]
+        if len(self._pending) > MAX_LINE_BYTES:
+            raise ValueError(f"单行超过 {MAX_LINE_BYTES // 1024}KB，请确认文件格式是否正确")
+        if cut >= 0:
+            self._parse(buffer[:cut + 1])
+
+    def _parse(self, complete: bytes) -> None:
+        """逐行解析（与 PMInfoParser.iter_records 的规则一致）"""
+        parser = self.parser
+        for line in iter_text_lines(io.BytesIO(complete), self.encoding):
+            line_number = self._next_line
+            self._next_line += 1
+            parser.lines_scanned = line_number
+            if self._stopped:
+                continue
+
+            if not self._found_tag:
+                if "PM:INFO" in line.upper():
+                    self._found_tag = True
+                    logger.info(f"在第 {line_number} 行找到 PM:INFO")
+                elif line_number >= self._sniff_lines:
+                    raise ValueError("文件中未找到 PM:INFO 内容，请确认文件格式是否正确")
+
+            try:
+                record = parser.parse_line(line, line_number)
+            except Exception as e:
+                self._parse_errors += 1
+                logger.warning(f"处理第 {line_number} 行时出错: {str(e)}")
+                if self._parse_errors > 10:
+                    logger.error("解析错误过多，终止解析")
+                    self._stopped = True
+                continue
+
+            if record is not None:
+                parser.samples_found += 1
+                self.series.append(*record)
+
+    def finish(self) -> PMInfoSeries:
+        """
+        解析最后一个不完整行并返回结果
+
+        Returns:
+            PMInfoSeries: 解析结果
+
+        Raises:
+            ValueError: 文件为空或未解析到有效数据
+        """
+        if self.received_bytes == 0:
+            raise ValueError("文件为空")
+        if self.decompressor is not None and not self.decompressor.finished:
+            raise ValueError("压缩数据不完整，请确认文件已完整上传")
+        if self._pending:
+            self._parse(self._pending)
+            self._pending = b''
+        logger.info(f"分块上传 {self.filename}: 接收 {self.received_bytes} 字节，扫描 {self.parser.lines_scanned} 行")
+        if self._parse_errors > 0:
+            logger.warning(f"⚠️ 解析过程中跳过了 {self._parse_errors} 行错误数据")
+
+        if not self.series:
+            error_msg = "文件中未找到有效的 PM:INFO 数据行"
+            logger.error(error_msg)
+            raise ValueError(error_msg + "。请确认文件格式是否正确。")
+
+        logger.info(f"✅ 成功解析 {len(self.series)} 条数据")
+        return self.series
+
+    @property
+    def content_hash(self) -> str:
+        """已接收内容的 SHA-256"""
+        return self._digest.hexdigest()
+
+    def to_dict(self) -> Dict:
+        """会话状态（客户端据此续传）"""
+        return {
+            'upload_id': self.id,
+            'filename': self.filename,
+            'received_bytes': self.received_bytes,
+            'lines_scanned': self.parser.lines_scanned,
+            'samples_found': self.parser.samples_found,
+        }
+
+
+class UploadSessionStore:
+    """上传会话表，超过空闲时间的会话自动丢弃"""
+
+    def __init__(self, max_sessions: int = 16, ttl: int = 1800):
+        """
+        Args:
+            max_sessions: 同时进行的会话数上限
+            ttl: 会话最长空闲秒数
+        """
+        self.max_sessions = max_sessions
+        self.ttl = ttl
+        self._sessions: Dict[str, ChunkedUpload] = {}
+        self._lock = threading.Lock()
+        os.register_at_fork(after_in_child=self._reset_after_fork)
+
+    def _reset_after_fork(self) -> None:
+        self._sessions = {}
+        self._lock = threading.Lock()
+
+    def create(self, filename: str, max_bytes: int, **kwargs) -> Optional[ChunkedUpload]:
+        """
+        创建会话
+
+        Returns:
+            Optional[ChunkedUpload]: 新会话，会话数已达上限时返回 None
+        """
+        with self._lock:
+            self._cleanup()
+            if len(self._sessions) >= self.max_sessions:
+                return None
+            session = ChunkedUpload(uuid.uuid4().hex, filename, max_bytes, **kwargs)
+            self._sessions[session.id] = session
+        logger.info(f"创建分块上传会话: {session.id} ({filename})")
+        return session
+
+    def get(self, upload_id: str) -> Optional[ChunkedUpload]:
+        with self._lock:
+            self._cleanup()
+            return self._sessions.get(upload_id)
+
+    def discard(self, upload_id: str) -> None:
+        with self._lock:
+            self._sessions.pop(upload_id, None)
+
+    def _cleanup(self) -> None:
+        """移除空闲超时的会话（调用方持有锁）"""
+        now = time.time()
+        expired = [
+            upload_id for upload_id, session in self._sessions.items()
+            if now - session.updated_at > self.ttl
+        ]
+        for upload_id in expired:
+            logger.info(f"分块上传会话超时: {upload_id}")
+            del self._sessions[upload_id]
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._sessions)
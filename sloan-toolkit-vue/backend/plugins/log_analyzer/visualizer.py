@@ -1,24 +1,269 @@
 """
 PM:INFO 数据可视化
+
+两种渲染模式：
+- pyplot: 原有实现，每次通过 pyplot 全局状态新建图表
+- agg: 面向对象的 Figure/FigureCanvasAgg（不依赖全局状态，可在多线程中使用），
+  从进程内的模板池取出预先构建的图表模板，只通过 Line2D.set_data 更新数据；
+  大序列按像素列做 min/max 抽稀（点数与图片宽度成正比），渲染结果按数据哈希和尺寸缓存
+
+matplotlib 在首次渲染时才导入（见 utils.matplotlib_config.ensure_matplotlib），
+仅计算统计数据时不会加载。
 """
-import matplotlib.pyplot as plt
+import numpy as np
 import base64
+import hashlib
+import queue
+import threading
+from array import array
+from collections import OrderedDict
 from io import BytesIO
 import logging
-from typing import Dict, List
+from typing import Dict, Optional, Sequence
+
+from .downsample import minmax_indices
+from .series import PMInfoSeries, format_seconds
+from utils.cache import LRUCache
+from utils.matplotlib_config import ensure_matplotlib
 
 logger = logging.getLogger(__name__)
 
+# 充电状态 (0-7) 对应的统计键名
+CHARGE_STATE_KEYS = (
+    'no_charge',   # 停充
+    'discharge',   # 放电
+    'precharge',   # 预充电
+    'cc_charge',   # CC恒流充电
+    'cv_charge',   # CV恒压充电
+    'full',        # 充满
+    'done',        # 充电完成
+    'fault',       # 充电错误
+)
+
+# 统计输出的分位数
+PERCENTILES = (50, 95, 99)
+
+# 渲染模式
+RENDER_PYPLOT = 'pyplot'
+RENDER_AGG = 'agg'
+
+# 默认图表尺寸（与原有 12x12 英寸、100 dpi 一致）
+DEFAULT_WIDTH = 1200
+DEFAULT_HEIGHT = 1200
+DEFAULT_DPI = 100
+
+# 三个子图：序列名、标题、y 轴标签、线型、图例
+CHART_PANELS = (
+    ('currents', '电流变化趋势', '电流 (mA)', '-b', '电流(mA)'),
+    ('temperatures', '温度变化趋势', '温度 (°C)', '-r', '温度(°C)'),
+    ('voltages', '电压变化趋势', '电压 (V)', '-g', '电压(V)'),
+)
+
+# x 轴刻度数
+TICK_COUNT = 10
+
+# 每个像素列保留的点数（min/max 各一个）
+POINTS_PER_PIXEL = 2
+
+# 每种尺寸空闲模板的保留数量（同时渲染更多时临时新建，归还时超出的丢弃）
+TEMPLATES_PER_SIZE = 4
+
+# 保留模板池的尺寸数（超过时丢弃最早创建的）
+TEMPLATE_SIZES = 4
+
+# (width, height, dpi) -> 空闲模板队列
+_templates: 'OrderedDict[tuple, queue.Queue]' = OrderedDict()
+_templates_lock = threading.Lock()
+
+
+class _ChartTemplate:
+    """预先构建的三子图模板（Figure 不是线程安全的，同一时间只由一个线程从池中取出使用）"""
+
+    def __init__(self, width: int, height: int, dpi: int):
+        ensure_matplotlib()
+        from matplotlib.backends.backend_agg import FigureCanvasAgg
+        from matplotlib.figure import Figure
+
+        self.width = width
+        self.figure = Figure(figsize=(width / dpi, height / dpi), dpi=dpi, facecolor='#f8f9fa')
+        self.canvas = FigureCanvasAgg(self.figure)
+        self.axes = self.figure.subplots(len(CHART_PANELS), 1)
+        self.lines = []
+
+        for ax, (_, title, ylabel, style, label) in zip(self.axes, CHART_PANELS):
+            ax.grid(True, linestyle='--', alpha=0.7)
+            line, = ax.plot([], [], style, label=label, linewidth=1)
+            ax.set_title(title, fontsize=14, fontweight='bold', pad=15)
+            ax.set_ylabel(ylabel, fontsize=12)
+            ax.legend(loc='upper right')
+            self.lines.append(line)
+        self.axes[-1].set_xlabel('时间', fontsize=12)
+
+        # 用代表性的刻度标签计算一次布局，之后渲染不再重新布局
+        for ax in self.axes:
+            ax.set_xticks(range(TICK_COUNT))
+            ax.set_xticklabels(['00:00:00'] * TICK_COUNT, rotation=45)
+        self.figure.tight_layout()
+
+    def render(self, data: PMInfoSeries) -> bytes:
+        """更新线条数据并渲染 PNG"""
+        num_points = len(data)
+        step = max(1, num_points // TICK_COUNT)
+        ticks = range(0, num_points, step)
+        labels = [format_seconds(data.times[i]) for i in ticks]
+        # 每个像素列最多保留 min/max 两个点
+        budget = self.width * POINTS_PER_PIXEL
+
+        for ax, line, (name, *_) in zip(self.axes, self.lines, CHART_PANELS):
+            values = np.frombuffer(getattr(data, name), dtype=np.float64)
+            if num_points > budget:
+                x = minmax_indices(values, budget)
+                line.set_data(x, values[x])
+            else:
+                line.set_data(np.arange(num_points), values)
+            ax.relim()
+            ax.autoscale_view()
+            ax.set_xticks(ticks)
+            ax.set_xticklabels(labels, rotation=45)
+
+        buffer = BytesIO()
+        self.canvas.print_png(buffer)
+        return buffer.getvalue()
+
+
+def _template_pool(key: tuple) -> queue.Queue:
+    """指定尺寸的空闲模板队列（尺寸数超过上限时丢弃最早创建的）"""
+    with _templates_lock:
+        pool = _templates.get(key)
+        if pool is None:
+            pool = _templates[key] = queue.Queue(maxsize=TEMPLATES_PER_SIZE)
+            while len(_templates) > TEMPLATE_SIZES:
+                _templates.popitem(last=False)
+        return pool
+
+
+def _render_with_template(data: PMInfoSeries, width: int, height: int, dpi: int) -> bytes:
+    """从模板池取出模板渲染，完成后归还（池中没有空闲模板时新建）"""
+    pool = _template_pool((width, height, dpi))
+    try:
+        template = pool.get_nowait()
+    except queue.Empty:
+        template = _ChartTemplate(width, height, dpi)
+    try:
+        return template.render(data)
+    finally:
+        try:
+            pool.put_nowait(template)
+        except queue.Full:
+            pass
+
+
+def warm_up() -> None:
+    """加载 matplotlib 并渲染一次小图表，预先填充字体查找和字形缓存（多 worker 部署时在 fork 前调用）"""
+    ensure_matplotlib()
+    sample = PMInfoSeries()
+    for i in range(TICK_COUNT):
+        sample.append(float(i), 0.0, 0.0, 0.0, 0)
+    _render_with_template(sample, DEFAULT_WIDTH, DEFAULT_HEIGHT, DEFAULT_DPI)
+
+
+def series_digest(data: PMInfoSeries) -> str:
+    """绘图数据（时间及三个序列）的 SHA-256"""
+    digest = hashlib.sha256()
+    for name in ('times',) + tuple(panel[0] for panel in CHART_PANELS):
+        digest.update(getattr(data, name))
+    return digest.hexdigest()
+
 class PMInfoVisualizer:
     """PM:INFO 数据可视化工具"""
     
-    def create_charts(self, data: Dict[str, List]) -> Dict:
-        """创建图表并返回结果"""
-        times = data['times']
-        currents = data['currents']
-        temperatures = data['temperatures']
-        voltages = data['voltages']
-        charging_states = data['charging_states']
+    def __init__(self, chart_cache: Optional[LRUCache] = None):
+        """
+        Args:
+            chart_cache: agg 模式下渲染结果（PNG 字节）的缓存，None 表示不缓存
+        """
+        self.chart_cache = chart_cache
+    
+    def create_charts(
+        self,
+        data: PMInfoSeries,
+        mode: str = RENDER_PYPLOT,
+        width: int = DEFAULT_WIDTH,
+        height: int = DEFAULT_HEIGHT,
+        dpi: int = DEFAULT_DPI
+    ) -> Dict:
+        """
+        创建图表并返回结果
+        
+        Args:
+            data: 时间序列
+            mode: 渲染模式（pyplot / agg）
+            width: 图片宽度（像素，仅 agg 模式）
+            height: 图片高度（像素，仅 agg 模式）
+            dpi: 分辨率（仅 agg 模式）
+            
+        Returns:
+            Dict: base64 编码的图表（graph）和统计数据（stats）
+        """
+        if mode == RENDER_AGG:
+            image_png = self.render_png(data, width, height, dpi)
+        elif mode == RENDER_PYPLOT:
+            image_png = self._render_pyplot(data)
+        else:
+            raise ValueError(f"不支持的渲染模式: {mode}")
+        
+        # 计算统计数据
+        stats = self._calculate_statistics(
+            data.currents, data.temperatures, data.voltages, data.charging_states
+        )
+        
+        logger.info("图表生成完成")
+        
+        return {
+            'graph': base64.b64encode(image_png).decode('utf-8'),
+            'stats': stats
+        }
+    
+    def render_png(
+        self,
+        data: PMInfoSeries,
+        width: int = DEFAULT_WIDTH,
+        height: int = DEFAULT_HEIGHT,
+        dpi: int = DEFAULT_DPI
+    ) -> bytes:
+        """
+        使用复用的 Figure 模板渲染 PNG，结果按数据哈希和尺寸缓存
+        
+        Args:
+            data: 时间序列
+            width: 图片宽度（像素）
+            height: 图片高度（像素）
+            dpi: 分辨率
+            
+        Returns:
+            bytes: PNG 图片
+        """
+        key = f"{series_digest(data)}:{width}x{height}@{dpi}"
+        if self.chart_cache is not None:
+            cached = self.chart_cache.get(key)
+            if cached is not None:
+                return cached
+        
+        image_png = _render_with_template(data, width, height, dpi)
+        
+        if self.chart_cache is not None:
+            self.chart_cache.put(key, image_png)
+        return image_png
+    
+    def _render_pyplot(self, data: PMInfoSeries) -> bytes:
+        """原有实现：通过 pyplot 新建图表并渲染 PNG"""
+        ensure_matplotlib()
+        import matplotlib.pyplot as plt
+
+        times = data.times
+        currents = data.currents
+        temperatures = data.temperatures
+        voltages = data.voltages
         
         # 使用默认样式
         plt.style.use('default')
@@ -56,7 +301,7 @@ class PMInfoVisualizer:
             step = max(1, num_points // 10)
             ax.set_xticks(range(0, num_points, step))
             ax.set_xticklabels(
-                [times[i] for i in range(0, num_points, step)],
+                [format_seconds(times[i]) for i in range(0, num_points, step)],
                 rotation=45
             )
         
@@ -69,47 +314,89 @@ class PMInfoVisualizer:
         image_png = buffer.getvalue()
         buffer.close()
         plt.close()
-        
-        # 计算统计数据
-        stats = self._calculate_statistics(
-            currents, temperatures, voltages, charging_states
-        )
-        
-        logger.info("图表生成完成")
-        
-        return {
-            'graph': base64.b64encode(image_png).decode('utf-8'),
-            'stats': stats
-        }
+        return image_png
     
     def _calculate_statistics(
         self,
-        currents: List[float],
-        temperatures: List[float],
-        voltages: List[float],
-        charging_states: List[int]
+        currents: Sequence[float],
+        temperatures: Sequence[float],
+        voltages: Sequence[float],
+        charging_states: Sequence[int]
     ) -> Dict:
-        """计算统计数据"""
-        # 统计各充电状态出现次数
+        """
+        计算统计数据（NumPy 向量化，单次遍历各列）
+        
+        列式容器中的 array 通过 np.frombuffer 零拷贝转换；
+        各充电状态的计数和电流/温度均值通过 bincount 一次得到。
+        """
+        current_arr = _as_ndarray(currents, np.float64)
+        temp_arr = _as_ndarray(temperatures, np.float64)
+        voltage_arr = _as_ndarray(voltages, np.float64)
+        state_arr = _as_ndarray(charging_states, np.int8).astype(np.intp)
+        
+        # 统计各充电状态出现次数及对应的电流、温度总和
+        num_states = len(CHARGE_STATE_KEYS)
+        state_counts = np.bincount(state_arr, minlength=num_states)[:num_states]
+        current_sums = np.bincount(state_arr, weights=current_arr, minlength=num_states)[:num_states]
+        temp_sums = np.bincount(state_arr, weights=temp_arr, minlength=num_states)[:num_states]
+        
         charge_state_counts = {
-            'no_charge': sum(1 for state in charging_states if state == 0),      # 停充
-            'discharge': sum(1 for state in charging_states if state == 1),      # 放电
-            'precharge': sum(1 for state in charging_states if state == 2),      # 预充电
-            'cc_charge': sum(1 for state in charging_states if state == 3),      # CC恒流充电
-            'cv_charge': sum(1 for state in charging_states if state == 4),      # CV恒压充电
-            'full': sum(1 for state in charging_states if state == 5),           # 充满
-            'done': sum(1 for state in charging_states if state == 6),           # 充电完成
-            'fault': sum(1 for state in charging_states if state == 7),          # 充电错误
+            key: int(count) for key, count in zip(CHARGE_STATE_KEYS, state_counts)
         }
+        charge_state_averages = {
+            key: {
+                'avg_current': float(current_sums[i] / state_counts[i]) if state_counts[i] else 0,
+                'avg_temp': float(temp_sums[i] / state_counts[i]) if state_counts[i] else 0,
+            }
+            for i, key in enumerate(CHARGE_STATE_KEYS)
+        }
+        
+        current_stats = _describe(current_arr)
+        temp_stats = _describe(temp_arr)
+        voltage_stats = _describe(voltage_arr)
         
         return {
-            'total_points': len(currents),
-            'avg_current': sum(currents) / len(currents) if currents else 0,
-            'max_current': max(currents) if currents else 0,
-            'min_current': min(currents) if currents else 0,
-            'avg_temp': sum(temperatures) / len(temperatures) if temperatures else 0,
-            'max_temp': max(temperatures) if temperatures else 0,
-            'min_temp': min(temperatures) if temperatures else 0,
-            'avg_voltage': sum(voltages) / len(voltages) if voltages else 0,
+            'total_points': len(current_arr),
+            'avg_current': current_stats['avg'],
+            'max_current': current_stats['max'],
+            'min_current': current_stats['min'],
+            'std_current': current_stats['std'],
+            'current_percentiles': current_stats['percentiles'],
+            'avg_temp': temp_stats['avg'],
+            'max_temp': temp_stats['max'],
+            'min_temp': temp_stats['min'],
+            'std_temp': temp_stats['std'],
+            'temp_percentiles': temp_stats['percentiles'],
+            'avg_voltage': voltage_stats['avg'],
+            'max_voltage': voltage_stats['max'],
+            'min_voltage': voltage_stats['min'],
+            'std_voltage': voltage_stats['std'],
+            'voltage_percentiles': voltage_stats['percentiles'],
             'charge_state_counts': charge_state_counts,
+            'charge_state_averages': charge_state_averages,
         }
+
+
+def _as_ndarray(values: Sequence, dtype) -> np.ndarray:
+    """将 array/list 转为 ndarray，array 类型时零拷贝"""
+    if isinstance(values, array) and np.dtype(dtype).itemsize == values.itemsize:
+        return np.frombuffer(values, dtype=dtype)
+    return np.asarray(values, dtype=dtype)
+
+
+def _describe(values: np.ndarray) -> Dict:
+    """计算单列的均值、极值、标准差和分位数"""
+    if not len(values):
+        return {
+            'avg': 0, 'max': 0, 'min': 0, 'std': 0,
+            'percentiles': {f'p{q}': 0 for q in PERCENTILES},
+        }
+    
+    percentiles = np.percentile(values, PERCENTILES)
+    return {
+        'avg': float(values.mean()),
+        'max': float(values.max()),
+        'min': float(values.min()),
+        'std': float(values.std()),
+        'percentiles': {f'p{q}': float(v) for q, v in zip(PERCENTILES, percentiles)},
+    }
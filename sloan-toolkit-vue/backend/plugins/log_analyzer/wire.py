@@ -0,0 +1,70 @@
+"""
+列式二进制传输格式
+
+直接由列式容器生成，浏览器端可用 TypedArray 零拷贝读取，无需解析 JSON 数组：
+
+    偏移  长度   内容
+    0     4      魔数 b'PMC1'
+    4     4      头部长度 H（uint32，小端，含补齐空格）
+    8     H      JSON 头部（UTF-8，补齐到 8 字节边界）
+    8+H   ...    各列数据（小端，每列补齐到 8 字节边界）
+
+头部中的 columns 描述每列的 name / dtype / offset（相对 8+H）/ length（元素个数）：
+- times: float64（秒，前端格式化为 HH:MM:SS）
+- currents / temperatures / voltages: float32
+- charging_states: int8
+统计数据等其余字段与 JSON 响应相同，也放在头部中。
+"""
+import json
+import struct
+from typing import Dict
+
+import numpy as np
+
+from .series import PMInfoSeries
+
+BINARY_MIMETYPE = 'application/vnd.pminfo.columns'
+
+MAGIC = b'PMC1'
+
+ALIGNMENT = 8
+
+# 列名、numpy 小端类型、头部中的类型名
+WIRE_COLUMNS = (
+    ('times', '<f8', 'float64'),
+    ('currents', '<f4', 'float32'),
+    ('temperatures', '<f4', 'float32'),
+    ('voltages', '<f4', 'float32'),
+    ('charging_states', '<i1', 'int8'),
+)
+
+
+def _padding(length: int) -> int:
+    return -length % ALIGNMENT
+
+
+def encode_columns(series: PMInfoSeries, header: Dict) -> bytes:
+    """
+    将列式容器编码为二进制响应
+
+    Args:
+        series: 时间序列
+        header: 头部附加字段（stats、dataset_id 等）
+
+    Returns:
+        bytes: 响应体
+    """
+    buffers = []
+    columns = []
+    offset = 0
+    for name, dtype, type_name in WIRE_COLUMNS:
+        source = getattr(series, name)
+        data = np.frombuffer(source, dtype=source.typecode).astype(dtype, copy=False).tobytes()
+        columns.append({'name': name, 'dtype': type_name, 'offset': offset, 'length': len(source)})
+        buffers.append(data)
+        buffers.append(b'\0' * _padding(len(data)))
+        offset += len(data) + _padding(len(data))
+
+    head = json.dumps({**header, 'count': len(series), 'columns': columns}).encode('utf-8')
+    head += b' ' * _padding(len(MAGIC) + 4 + len(head))
+    return b''.join([MAGIC, struct.pack('<I', len(head)), head] + buffers)
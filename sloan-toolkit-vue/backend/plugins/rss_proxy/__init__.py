@@ -3,93 +3,259 @@ RSS代理插件
 提供RSS源的跨域代理访问
 """
 
-from flask import Blueprint, jsonify, request
-import feedparser
+from flask import Blueprint, Response, jsonify, request
 import requests
 from datetime import datetime
 import logging
+import math
+import queue
+
+from .aggregate import FeedAggregator
+from .cache import FeedCache
+from .client import UpstreamClient
+from .fetcher import FeedFetcher
+from .index import FeedItemIndex
+from .stream import RESET, FeedStreamHub, format_event
+from config.settings import AppConfig
 
 logger = logging.getLogger(__name__)
 
 # 创建蓝图
 rss_proxy_bp = Blueprint('rss_proxy', __name__)
 
+# 订阅源缓存（按 URL，过期后先返回旧数据并在后台重新验证）
+feed_cache = FeedCache(
+    ttl=AppConfig.RSS_CACHE_TTL,
+    max_stale=AppConfig.RSS_CACHE_MAX_STALE,
+    max_feeds=AppConfig.RSS_CACHE_MAX_FEEDS
+)
+
+# 共享的上游连接池（keep-alive、按主机限制连接数、失败重试）
+upstream_client = UpstreamClient(
+    pool_hosts=AppConfig.RSS_POOL_HOSTS,
+    connections_per_host=AppConfig.RSS_POOL_CONNECTIONS_PER_HOST,
+    max_retries=AppConfig.RSS_RETRY_TOTAL,
+    backoff_factor=AppConfig.RSS_RETRY_BACKOFF,
+    timeout=AppConfig.RSS_FETCH_TIMEOUT,
+    max_retry_wait=AppConfig.RSS_RETRY_MAX_WAIT
+)
+feed_fetcher = FeedFetcher(feed_cache, upstream_client, max_items=AppConfig.RSS_MAX_ITEMS)
+
+# 各订阅源的条目索引（增量下发）
+feed_index = FeedItemIndex(
+    max_items=AppConfig.RSS_INDEX_MAX_ITEMS,
+    max_feeds=AppConfig.RSS_CACHE_MAX_FEEDS
+)
+
+
+def _stream_max_clients() -> int:
+    """
+    每个 worker 的推送连接数上限
+
+    推送连接在连接期间占用一个请求线程，未配置时按 WSGI_THREADS 留出
+    RSS_STREAM_RESERVED_THREADS 个线程给普通请求，避免推送连接占满 worker
+
+    Returns:
+        int: 连接数上限（0 表示不提供推送）
+    """
+    if AppConfig.RSS_STREAM_MAX_CLIENTS is not None:
+        return AppConfig.RSS_STREAM_MAX_CLIENTS
+    return max(0, AppConfig.WSGI_THREADS - AppConfig.RSS_STREAM_RESERVED_THREADS)
+
+
+# SSE 推送（每个订阅源一个后台轮询线程）
+feed_stream = FeedStreamHub(
+    feed_fetcher, feed_index,
+    interval=AppConfig.RSS_STREAM_POLL_INTERVAL,
+    max_clients=_stream_max_clients()
+)
+
+# 多订阅源聚合（并发获取）
+feed_aggregator = FeedAggregator(feed_fetcher, max_workers=AppConfig.RSS_AGGREGATE_WORKERS)
+
+# 36氪RSS源地址
+KR36_RSS_URL = 'https://36kr.com/feed'
+
+# 36氪RSS请求头，模拟浏览器访问
+KR36_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+    'Accept': 'application/rss+xml, application/xml, text/xml, */*',
+    'Accept-Language': 'zh-CN,zh;q=0.9,en;q=0.8',
+}
+
+# 通用代理的上游请求头
+PROXY_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36',
+    'Accept': 'application/rss+xml, application/xml, text/xml, */*',
+}
+
+
+def _parse_cursor():
+    """
+    读取增量游标查询参数 since（毫秒时间戳）和 sinceId
+
+    Returns:
+        tuple: (since, since_id)，未指定 since 时为 (None, None)
+
+    Raises:
+        ValueError: since 不是有限的数字
+    """
+    since = request.args.get('since')
+    if not since:
+        return None, None
+    since = float(since)
+    if not math.isfinite(since):
+        raise ValueError(since)
+    return since, request.args.get('sinceId') or None
+
+
+def _select_items(url: str, feed, since, since_id) -> dict:
+    """
+    同步条目索引，按游标选出要返回的条目
+
+    Returns:
+        dict: items、cursor（下次请求使用的游标），指定游标时还有 incremental、truncated
+    """
+    feed_index.sync(url, feed)
+    if since is None:
+        return {'items': feed.items, 'cursor': feed_index.cursor(url)}
+    result = feed_index.since(url, since, since_id)
+    return {**result, 'incremental': True}
+
+
+def _format_36kr_items(items: list) -> list:
+    """36氪条目补充 description，缺少发布时间时使用当前时间"""
+    now = datetime.now().timestamp() * 1000
+    return [
+        {
+            **item,
+            'description': item['summary'],
+            'publishTime': item['publishTime'] or now,
+        }
+        for item in items
+    ]
+
+
+def _stream_feed(url: str, headers: dict, format_items=None):
+    """
+    SSE 推送响应：先发送游标之后的条目（未指定游标时为全部条目），之后推送新条目
+
+    消息：
+        items: {items, cursor[, incremental, truncated]}
+        reset: 客户端消费过慢，需带游标重新连接
+    空闲时每 AppConfig.RSS_STREAM_HEARTBEAT 秒发送注释行保活，同时及时发现断开的连接
+    """
+    format_items = format_items or (lambda items: items)
+    try:
+        since, since_id = _parse_cursor()
+    except ValueError:
+        return jsonify({
+            'success': False,
+            'message': '参数错误: since 必须是毫秒时间戳',
+            'items': []
+        }), 400
+
+    try:
+        entry, _ = feed_fetcher.get(url, headers)
+    except requests.RequestException as e:
+        logger.error(f"订阅RSS失败 {url}: {str(e)}")
+        return jsonify({
+            'success': False,
+            'message': f'请求失败: {str(e)}',
+            'items': []
+        }), 502
+
+    # 轮询线程从索引中的最新游标开始，须在订阅（启动轮询）之前同步
+    feed_index.sync(url, entry.feed)
+    client = feed_stream.subscribe(url, headers)
+    if client is None:
+        return jsonify({
+            'success': False,
+            'message': f'推送连接数已达上限（{feed_stream.max_clients}），请稍后重试或使用普通接口',
+            'items': []
+        }), 503
+
+    # 先订阅再取初始数据，两者之间出现的新条目最多重复推送（客户端按 id 合并），不会遗漏
+    initial = _select_items(url, entry.feed, since, since_id)
+
+    def generate():
+        yield format_event('items', {**initial, 'items': format_items(initial['items'])})
+        while True:
+            try:
+                message = client.get(timeout=AppConfig.RSS_STREAM_HEARTBEAT)
+            except queue.Empty:
+                yield ': ping\n\n'
+                continue
+            if message is RESET:
+                yield format_event('reset', {})
+                return
+            yield format_event('items', {**message, 'items': format_items(message['items'])})
+
+    response = Response(generate(), mimetype='text/event-stream')
+    response.headers['Cache-Control'] = 'no-cache'
+    # 关闭反向代理（nginx）缓冲
+    response.headers['X-Accel-Buffering'] = 'no'
+    # 客户端断开或生成器结束时取消订阅（响应未开始发送时也会调用）
+    response.call_on_close(lambda: feed_stream.unsubscribe(url, client))
+    return response
+
+
 @rss_proxy_bp.route('/36kr/rss', methods=['GET'])
 def get_36kr_rss():
     """
     获取36氪RSS数据
-    
+
+    Query Parameters:
+        since (float): 增量游标，上次响应 cursor.since，只返回更新的条目
+        sinceId (str): 增量游标，上次响应 cursor.sinceId
+
     Returns:
-        JSON: 格式化的RSS数据
+        JSON: 格式化的RSS数据及下次请求使用的游标 cursor（响应头 X-Cache 为缓存状态）
     """
     try:
-        # 36氪RSS源地址
-        rss_url = 'https://36kr.com/feed'
-        
+        since, since_id = _parse_cursor()
+    except ValueError:
+        return jsonify({
+            'success': False,
+            'message': '参数错误: since 必须是毫秒时间戳',
+            'items': []
+        }), 400
+
+    try:
+        rss_url = KR36_RSS_URL
+
         logger.info(f"开始获取36氪RSS: {rss_url}")
-        
-        # 设置请求头，模拟浏览器访问
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-            'Accept': 'application/rss+xml, application/xml, text/xml, */*',
-            'Accept-Language': 'zh-CN,zh;q=0.9,en;q=0.8',
-        }
-        
-        # 获取RSS内容
-        response = requests.get(rss_url, headers=headers, timeout=10)
-        response.raise_for_status()
-        
-        # 解析RSS
-        feed = feedparser.parse(response.content)
-        
-        if not feed.entries:
+
+        # 获取RSS内容（优先使用缓存）
+        entry, cache_status = feed_fetcher.get(rss_url, KR36_HEADERS)
+        feed = entry.feed
+
+        if not feed.items:
             logger.warning("RSS解析结果为空")
             return jsonify({
                 'success': False,
                 'message': 'RSS解析结果为空',
                 'items': []
             }), 200
-        
-        # 格式化数据
-        items = []
-        for entry in feed.entries:
-            # 解析发布时间
-            publish_time = None
-            if hasattr(entry, 'published_parsed') and entry.published_parsed:
-                publish_time = datetime(*entry.published_parsed[:6]).timestamp() * 1000
-            elif hasattr(entry, 'updated_parsed') and entry.updated_parsed:
-                publish_time = datetime(*entry.updated_parsed[:6]).timestamp() * 1000
-            else:
-                publish_time = datetime.now().timestamp() * 1000
-            
-            # 提取摘要（移除HTML标签）
-            summary = ''
-            if hasattr(entry, 'summary'):
-                import re
-                summary = re.sub(r'<[^>]+>', '', entry.summary)
-                summary = summary.strip()[:200]  # 限制长度
-            
-            item = {
-                'id': entry.get('id', entry.get('link', '')),
-                'title': entry.get('title', ''),
-                'summary': summary,
-                'description': summary,
-                'link': entry.get('link', ''),
-                'publishTime': publish_time,
-                'author': entry.get('author', ''),
-            }
-            items.append(item)
-        
-        logger.info(f"成功获取{len(items)}条RSS数据")
-        
-        return jsonify({
+
+        selected = _select_items(rss_url, feed, since, since_id)
+
+        # 格式化数据（缺少发布时间时使用当前时间）
+        items = _format_36kr_items(selected['items'])
+
+        logger.info(f"成功获取{len(items)}条RSS数据（缓存: {cache_status}）")
+
+        response = jsonify({
+            **selected,
             'success': True,
             'count': len(items),
             'items': items,
-            'feedTitle': feed.feed.get('title', '36氪'),
-            'feedLink': feed.feed.get('link', 'https://36kr.com')
+            'feedTitle': feed.title or '36氪',
+            'feedLink': feed.link or 'https://36kr.com'
         })
-        
+        response.headers['X-Cache'] = cache_status
+        return response
+
     except requests.Timeout:
         logger.error("请求36氪RSS超时")
         return jsonify({
@@ -97,7 +263,7 @@ def get_36kr_rss():
             'message': '请求超时',
             'items': []
         }), 504
-        
+
     except requests.RequestException as e:
         logger.error(f"请求36氪RSS失败: {str(e)}")
         return jsonify({
@@ -105,7 +271,7 @@ def get_36kr_rss():
             'message': f'请求失败: {str(e)}',
             'items': []
         }), 502
-        
+
     except Exception as e:
         logger.error(f"解析RSS失败: {str(e)}", exc_info=True)
         return jsonify({
@@ -115,81 +281,117 @@ def get_36kr_rss():
         }), 500
 
 
+@rss_proxy_bp.route('/36kr/rss/stream', methods=['GET'])
+def stream_36kr_rss():
+    """
+    36氪RSS推送（Server-Sent Events）
+
+    Query Parameters:
+        since (float): 增量游标，只推送更新的条目
+        sinceId (str): 增量游标
+
+    Returns:
+        text/event-stream: items / reset 消息
+    """
+    return _stream_feed(KR36_RSS_URL, KR36_HEADERS, _format_36kr_items)
+
+
+@rss_proxy_bp.route('/rss/stream', methods=['GET'])
+def stream_rss():
+    """
+    通用RSS推送（Server-Sent Events）
+
+    Query Parameters:
+        url (str): RSS源URL
+        since (float): 增量游标，只推送更新的条目
+        sinceId (str): 增量游标
+
+    Returns:
+        text/event-stream: items / reset 消息
+    """
+    rss_url = request.args.get('url')
+    if not rss_url:
+        return jsonify({
+            'success': False,
+            'message': '缺少url参数',
+            'items': []
+        }), 400
+    return _stream_feed(rss_url, PROXY_HEADERS)
+
+
+@rss_proxy_bp.route('/rss/metrics', methods=['GET'])
+def rss_metrics():
+    """
+    RSS代理运行指标
+
+    Returns:
+        JSON: 缓存命中统计、请求合并统计、条目索引规模、推送连接和各上游主机的请求数、错误数及延迟
+    """
+    return jsonify({
+        'cache': feed_cache.stats(),
+        'index': feed_index.stats(),
+        'stream': feed_stream.stats(),
+        'singleflight': feed_fetcher.flight.stats(),
+        'upstreams': upstream_client.stats()
+    })
+
+
 @rss_proxy_bp.route('/rss/proxy', methods=['GET'])
 def proxy_rss():
     """
     通用RSS代理接口
-    
+
     Query Parameters:
         url (str): RSS源URL
-        
+        since (float): 增量游标，上次响应 cursor.since，只返回更新的条目
+        sinceId (str): 增量游标，上次响应 cursor.sinceId
+
     Returns:
-        JSON: 格式化的RSS数据
+        JSON: 格式化的RSS数据及下次请求使用的游标 cursor（响应头 X-Cache 为缓存状态）
     """
     try:
         rss_url = request.args.get('url')
-        
+
         if not rss_url:
             return jsonify({
                 'success': False,
                 'message': '缺少url参数',
                 'items': []
             }), 400
-        
+
+        try:
+            since, since_id = _parse_cursor()
+        except ValueError:
+            return jsonify({
+                'success': False,
+                'message': '参数错误: since 必须是毫秒时间戳',
+                'items': []
+            }), 400
+
         logger.info(f"代理RSS请求: {rss_url}")
-        
-        # 设置请求头
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36',
-            'Accept': 'application/rss+xml, application/xml, text/xml, */*',
-        }
-        
-        # 获取RSS内容
-        response = requests.get(rss_url, headers=headers, timeout=10)
-        response.raise_for_status()
-        
-        # 解析RSS
-        feed = feedparser.parse(response.content)
-        
-        if not feed.entries:
+
+        # 获取RSS内容（优先使用缓存）
+        entry, cache_status = feed_fetcher.get(rss_url, PROXY_HEADERS)
+        feed = entry.feed
+
+        if not feed.items:
             return jsonify({
                 'success': False,
                 'message': 'RSS解析结果为空',
                 'items': []
             }), 200
-        
-        # 格式化数据
-        items = []
-        for entry in feed.entries:
-            publish_time = None
-            if hasattr(entry, 'published_parsed') and entry.published_parsed:
-                publish_time = datetime(*entry.published_parsed[:6]).timestamp() * 1000
-            elif hasattr(entry, 'updated_parsed') and entry.updated_parsed:
-                publish_time = datetime(*entry.updated_parsed[:6]).timestamp() * 1000
-            
-            # 提取摘要
-            summary = ''
-            if hasattr(entry, 'summary'):
-                import re
-                summary = re.sub(r'<[^>]+>', '', entry.summary).strip()[:200]
-            
-            item = {
-                'id': entry.get('id', entry.get('link', '')),
-                'title': entry.get('title', ''),
-                'summary': summary,
-                'link': entry.get('link', ''),
-                'publishTime': publish_time,
-            }
-            items.append(item)
-        
-        return jsonify({
+
+        selected = _select_items(rss_url, feed, since, since_id)
+        response = jsonify({
+            **selected,
             'success': True,
-            'count': len(items),
-            'items': items,
-            'feedTitle': feed.feed.get('title', ''),
-            'feedLink': feed.feed.get('link', '')
+            'count': len(selected['items']),
+            'feedTitle': feed.title,
+            'feedLink': feed.link
         })
-        
+        response.headers['X-Cache'] = cache_status
+        return response
+
     except Exception as e:
         logger.error(f"RSS代理失败: {str(e)}", exc_info=True)
         return jsonify({
@@ -197,3 +399,69 @@ def proxy_rss():
             'message': f'代理失败: {str(e)}',
             'items': []
         }), 500
+
+
+@rss_proxy_bp.route('/rss/aggregate', methods=['GET', 'POST'])
+def aggregate_rss():
+    """
+    多RSS源聚合接口：并发获取，按发布时间倒序合并并去重
+
+    Query Parameters（GET）/ JSON Body（POST）:
+        url (str, 可重复) / urls (list): RSS源URL列表
+        deadline (float): 截止时间（秒），超时的RSS源不参与合并，默认 AppConfig.RSS_AGGREGATE_DEADLINE
+        limit (int): 最多返回的条目数，默认全部
+
+    Returns:
+        JSON: 合并后的条目及各RSS源的状态（feeds），有RSS源失败或超时时 partial 为 true
+    """
+    if request.method == 'POST':
+        body = request.get_json(silent=True) or {}
+        urls = body.get('urls') or []
+        deadline = body.get('deadline', AppConfig.RSS_AGGREGATE_DEADLINE)
+        limit = body.get('limit', 0)
+    else:
+        urls = request.args.getlist('url')
+        deadline = request.args.get('deadline', AppConfig.RSS_AGGREGATE_DEADLINE)
+        limit = request.args.get('limit', 0)
+
+    try:
+        if not isinstance(urls, list) or not all(isinstance(url, str) and url for url in urls):
+            raise ValueError('urls 必须是非空字符串列表')
+        # 保持顺序去重
+        urls = list(dict.fromkeys(urls))
+        if not urls:
+            raise ValueError('缺少url参数')
+        if len(urls) > AppConfig.RSS_AGGREGATE_MAX_FEEDS:
+            raise ValueError(f'一次最多聚合 {AppConfig.RSS_AGGREGATE_MAX_FEEDS} 个RSS源')
+        deadline = float(deadline)
+        limit = int(limit)
+        if not 0 < deadline <= AppConfig.RSS_AGGREGATE_MAX_DEADLINE:
+            raise ValueError(f'deadline 必须在 0-{AppConfig.RSS_AGGREGATE_MAX_DEADLINE} 秒之间')
+        if limit < 0:
+            raise ValueError('limit 不能为负数')
+    except (TypeError, ValueError) as e:
+        return jsonify({
+            'success': False,
+            'message': f'参数错误: {str(e)}',
+            'items': []
+        }), 400
+
+    try:
+        result = feed_aggregator.aggregate(urls, PROXY_HEADERS, deadline)
+    except Exception as e:
+        logger.error(f"RSS聚合失败: {str(e)}", exc_info=True)
+        return jsonify({
+            'success': False,
+            'message': f'聚合失败: {str(e)}',
+            'items': []
+        }), 500
+
+    items = result['items'][:limit] if limit else result['items']
+    return jsonify({
+        'success': any(feed['success'] for feed in result['feeds']),
+        'count': len(items),
+        'items': items,
+        'feeds': result['feeds'],
+        'partial': result['partial'],
+        'elapsedMs': result['elapsed_ms']
+    })
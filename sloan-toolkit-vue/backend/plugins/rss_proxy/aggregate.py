@@ -0,0 +1,109 @@
+"""
+多订阅源聚合
+
+在线程池中并发获取多个订阅源，整个请求受一个截止时间约束：
+- 截止时间内完成的订阅源参与合并，超时或失败的订阅源在 feeds 中标记，返回部分结果
+- 合并后按 publishTime 倒序排列（缺少发布时间的排在最后），按 id / link 去重
+- 超时的请求不取消，完成后写入缓存，下次聚合可直接命中
+"""
+import logging
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from typing import Dict, List
+
+from .fetcher import FeedFetcher
+
+logger = logging.getLogger(__name__)
+
+
+def _item_sort_key(item: Dict) -> float:
+    publish_time = item.get('publishTime')
+    return -publish_time if publish_time is not None else float('inf')
+
+
+def merge_items(feeds: List[List[Dict]]) -> List[Dict]:
+    """
+    合并多个订阅源的条目：按 publishTime 倒序，按 id / link 去重（保留较新的一条）
+
+    Args:
+        feeds: 各订阅源的条目列表
+
+    Returns:
+        List[Dict]: 合并后的条目
+    """
+    merged = sorted((item for items in feeds for item in items), key=_item_sort_key)
+    seen = set()
+    result = []
+    for item in merged:
+        keys = {key for key in (item.get('id'), item.get('link')) if key}
+        if keys & seen:
+            continue
+        seen |= keys
+        result.append(item)
+    return result
+
+
+class FeedAggregator:
+    """并发获取并合并多个订阅源"""
+
+    def __init__(self, fetcher: FeedFetcher, max_workers: int = 8):
+        """
+        Args:
+            fetcher: 订阅源获取（共享缓存和连接池）
+            max_workers: 并发获取的线程数（所有聚合请求共用）
+        """
+        self.fetcher = fetcher
+        self.max_workers = max_workers
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='rss-aggregate')
+        os.register_at_fork(after_in_child=self._reset_after_fork)
+
+    def _reset_after_fork(self) -> None:
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='rss-aggregate')
+
+    def aggregate(self, urls: List[str], headers: Dict[str, str], deadline: float) -> Dict:
+        """
+        并发获取订阅源并合并条目
+
+        Args:
+            urls: 订阅源 URL 列表（已去重）
+            headers: 上游请求头
+            deadline: 截止时间（秒）
+
+        Returns:
+            Dict: items（合并后的条目）、feeds（各订阅源状态）、partial（是否有订阅源未成功）
+        """
+        start = time.perf_counter()
+        futures = {url: self._executor.submit(self.fetcher.get, url, headers) for url in urls}
+        wait(futures.values(), timeout=deadline)
+
+        feeds = []
+        collected = []
+        for url, future in futures.items():
+            status = {'url': url}
+            if not future.done():
+                status.update({'success': False, 'error': 'timeout'})
+            elif future.exception() is not None:
+                status.update({'success': False, 'error': str(future.exception())})
+            else:
+                entry, cache_status = future.result()
+                feed = entry.feed
+                status.update({
+                    'success': True,
+                    'title': feed.title,
+                    'count': len(feed.items),
+                    'cache': cache_status,
+                })
+                collected.append([{**item, 'feedTitle': feed.title, 'feedUrl': url} for item in feed.items])
+            feeds.append(status)
+
+        items = merge_items(collected)
+        failed = sum(1 for status in feeds if not status['success'])
+        elapsed = time.perf_counter() - start
+        logger.info(f"聚合 {len(urls)} 个订阅源: {len(items)} 条，失败/超时 {failed} 个，耗时 {elapsed:.2f}s")
+        return {
+            'items': items,
+            'feeds': feeds,
+            'partial': failed > 0,
+            'elapsed_ms': round(elapsed * 1000, 1),
+        }
@@ -0,0 +1,121 @@
+"""
+RSS / Atom 解析器基准测试
+
+生成大型 RSS 2.0 / Atom 样例，校验快速路径与 feedparser 结果一致后对比耗时。
+
+用法（在 backend 目录下运行）：
+    python -m plugins.rss_proxy.benchmark
+    python -m plugins.rss_proxy.benchmark --items 5000 --max-items 200
+"""
+import sys
+import time
+from typing import Callable, List, Optional
+
+from .feeds import parse_feed_compat, parse_feed_fast
+
+DEFAULT_ITEMS = 2000
+
+
+def build_rss(count: int) -> bytes:
+    """生成包含 count 个条目的 RSS 2.0 样例"""
+    parts = [
+        '<?xml version="1.0" encoding="utf-8"?>',
+        '<rss version="2.0" xmlns:dc="http://purl.org/dc/elements/1.1/" '
+        'xmlns:content="http://purl.org/rss/1.0/modules/content/">',
+        '<channel><title>基准测试 RSS</title><link>https://example.com/</link>',
+    ]
+    for i in range(count):
+        parts.append(
+            f'<item><title>第 {i} 条新闻</title>'
+            f'<link>https://example.com/news/{i}</link>'
+            f'<guid isPermaLink="false">news-{i}</guid>'
+            f'<description><![CDATA[<p>摘要 {i}：<b>重点</b>内容</p>{"正文段落。" * 40}]]></description>'
+            f'<content:encoded><![CDATA[<div>{"<p>完整正文。</p>" * 40}</div>]]></content:encoded>'
+            f'<pubDate>Mon, {1 + i % 28:02d} Jan 2024 {i % 24:02d}:{i % 60:02d}:00 +0800</pubDate>'
+            f'<dc:creator>作者 {i % 10}</dc:creator></item>'
+        )
+    parts.append('</channel></rss>')
+    return ''.join(parts).encode('utf-8')
+
+
+def build_atom(count: int) -> bytes:
+    """生成包含 count 个条目的 Atom 样例"""
+    parts = [
+        '<?xml version="1.0" encoding="utf-8"?>',
+        '<feed xmlns="http://www.w3.org/2005/Atom"><title>基准测试 Atom</title>',
+        '<link rel="alternate" href="https://example.com/"/><id>urn:bench</id>',
+        '<updated>2024-01-31T00:00:00Z</updated>',
+    ]
+    for i in range(count):
+        parts.append(
+            f'<entry><id>urn:bench:{i}</id><title>第 {i} 条新闻</title>'
+            f'<link rel="alternate" href="https://example.com/news/{i}"/>'
+            f'<link rel="enclosure" href="https://example.com/media/{i}.mp3"/>'
+            f'<published>2024-01-{1 + i % 28:02d}T{i % 24:02d}:{i % 60:02d}:00+08:00</published>'
+            f'<updated>2024-01-{1 + i % 28:02d}T{i % 24:02d}:{i % 60:02d}:30Z</updated>'
+            f'<author><name>作者 {i % 10}</name></author>'
+            f'<summary>摘要 {i}：{"正文段落。" * 40}</summary>'
+            f'<content type="html">&lt;p&gt;{"完整正文。" * 40}&lt;/p&gt;</content></entry>'
+        )
+    parts.append('</feed>')
+    return ''.join(parts).encode('utf-8')
+
+
+def _best_of(func: Callable[[], object], repeat: int) -> float:
+    """多次运行取最短耗时"""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def run_parser_benchmark(content: bytes, max_items: Optional[int] = None, repeat: int = 3) -> dict:
+    """
+    对比快速路径与 feedparser 的解析耗时
+
+    Args:
+        content: 订阅源内容
+        max_items: 条目数上限（两种方式相同）
+        repeat: 重复次数
+
+    Returns:
+        dict: 条目数、两种方式的耗时（秒）和加速比
+    """
+    fast = parse_feed_fast(content, max_items)
+    compat = parse_feed_compat(content, max_items)
+    assert (fast.title, fast.link) == (compat.title, compat.link)
+    assert fast.items == compat.items
+
+    fast_seconds = _best_of(lambda: parse_feed_fast(content, max_items), repeat)
+    compat_seconds = _best_of(lambda: parse_feed_compat(content, max_items), repeat)
+    return {
+        'bytes': len(content),
+        'items': len(fast.items),
+        'fast_seconds': fast_seconds,
+        'feedparser_seconds': compat_seconds,
+        'speedup': compat_seconds / fast_seconds if fast_seconds else float('inf'),
+    }
+
+
+def _option(argv: List[str], name: str, default: Optional[int]) -> Optional[int]:
+    if name in argv:
+        return int(argv[argv.index(name) + 1])
+    return default
+
+
+def main(argv: List[str]) -> None:
+    count = _option(argv, '--items', DEFAULT_ITEMS)
+    max_items = _option(argv, '--max-items', None)
+
+    for name, builder in (('RSS 2.0', build_rss), ('Atom', build_atom)):
+        result = run_parser_benchmark(builder(count), max_items)
+        print(f"{name}: {result['bytes'] / 1024 / 1024:.1f} MB, 解析 {result['items']} 条")
+        print(f"  feedparser: {result['feedparser_seconds'] * 1000:.1f} ms")
+        print(f"  快速路径:   {result['fast_seconds'] * 1000:.1f} ms")
+        print(f"  加速比: {result['speedup']:.2f}x")
+
+
+if __name__ == '__main__':
+    main(sys.argv)
@@ -0,0 +1,106 @@
+"""
+订阅源缓存
+
+按 URL 缓存解析后的条目列表及条件请求所需的 ETag / Last-Modified：
+- 未超过 TTL：直接返回（fresh）
+- 超过 TTL 但未超过 TTL + max_stale：先返回旧数据，后台重新验证（stale-while-revalidate）
+- 更旧的条目仍保留校验信息，同步请求时带上条件请求头，304 时无需重新解析
+"""
+import threading
+import time
+from typing import Dict, Optional
+
+from .feeds import ParsedFeed
+from utils.cache import LRUCache
+
+
+class CachedFeed:
+    """缓存条目"""
+
+    def __init__(
+        self,
+        url: str,
+        feed: ParsedFeed,
+        etag: Optional[str] = None,
+        last_modified: Optional[str] = None
+    ):
+        """
+        Args:
+            url: 订阅源 URL
+            feed: 解析结果
+            etag: 上游响应的 ETag
+            last_modified: 上游响应的 Last-Modified
+        """
+        self.url = url
+        self.feed = feed
+        self.etag = etag
+        self.last_modified = last_modified
+        self.fetched_at = time.time()
+
+    @property
+    def age(self) -> float:
+        """距上次从上游获取（或验证）的秒数"""
+        return time.time() - self.fetched_at
+
+    def touch(self) -> None:
+        """上游确认内容未变化（304），重新开始新鲜期"""
+        self.fetched_at = time.time()
+
+    def conditional_headers(self) -> Dict[str, str]:
+        """条件请求头"""
+        headers = {}
+        if self.etag:
+            headers['If-None-Match'] = self.etag
+        if self.last_modified:
+            headers['If-Modified-Since'] = self.last_modified
+        return headers
+
+
+class FeedCache:
+    """按 URL 的订阅源缓存（LRU）"""
+
+    def __init__(self, ttl: int = 300, max_stale: int = 3600, max_feeds: int = 64):
+        """
+        Args:
+            ttl: 新鲜期（秒）
+            max_stale: 超过新鲜期后仍可先返回旧数据的秒数
+            max_feeds: 最多缓存的订阅源数
+        """
+        self.ttl = ttl
+        self.max_stale = max_stale
+        self._entries = LRUCache(max_entries=max_feeds, sizeof=lambda entry: 0)
+        self._lock = threading.Lock()
+        self.stale_hits = 0
+        self.revalidated = 0
+
+    def get(self, url: str) -> Optional[CachedFeed]:
+        return self._entries.get(url)
+
+    def put(self, entry: CachedFeed) -> None:
+        self._entries.put(entry.url, entry)
+
+    def is_fresh(self, entry: CachedFeed) -> bool:
+        return entry.age < self.ttl
+
+    def is_usable_stale(self, entry: CachedFeed) -> bool:
+        """过期但仍可先返回、后台重新验证"""
+        return entry.age < self.ttl + self.max_stale
+
+    def record_stale_hit(self) -> None:
+        with self._lock:
+            self.stale_hits += 1
+
+    def record_revalidated(self) -> None:
+        """上游返回 304"""
+        with self._lock:
+            self.revalidated += 1
+
+    def stats(self) -> Dict[str, int]:
+        entries = self._entries.stats()
+        return {
+            'hits': entries['hits'],
+            'misses': entries['misses'],
+            'stale_hits': self.stale_hits,
+            'not_modified': self.revalidated,
+            'feeds': entries['entries'],
+        }
@@ -0,0 +1,172 @@
+"""
+上游 HTTP 客户端
+
+所有订阅源请求共用一个 requests.Session，复用 TCP / TLS 连接（keep-alive）：
+- 连接池按主机划分，每个主机的连接数有上限，超过时等待空闲连接
+- 连接错误和 429 / 5xx 按指数退避重试（遵循 Retry-After），每次重试前的等待有上限，
+  上游要求长时间等待时不阻塞请求线程，由过期缓存兜底
+- 按上游主机统计请求数、错误数和延迟分位数
+"""
+import inspect
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict, deque
+from typing import Dict, Optional
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+logger = logging.getLogger(__name__)
+
+# 每个主机保留的最近延迟样本数（用于计算分位数）
+LATENCY_SAMPLES = 256
+
+# 最多统计的上游主机数（通用代理接口可请求任意主机，超过时丢弃最久未请求的）
+MAX_TRACKED_HOSTS = 128
+
+# 需要重试的上游状态码
+RETRY_STATUS = (429, 500, 502, 503, 504)
+
+# 当前 urllib3 的 Retry 参数：retry_after_max（限制 Retry-After 的等待，超过时按上限等待）
+# 在较新的 2.x 中才有，更早的版本默认最长等待 6 小时，不支持上限时不遵循 Retry-After；
+# backoff_max 在 1.x 中不是构造参数
+_RETRY_PARAMS = inspect.signature(Retry.__init__).parameters
+
+
+class UpstreamStats:
+    """单个上游主机的请求统计"""
+
+    def __init__(self):
+        self.requests = 0
+        self.errors = 0
+        self.last_status: Optional[int] = None
+        self.total_seconds = 0.0
+        self.samples = deque(maxlen=LATENCY_SAMPLES)
+
+    def record(self, seconds: float, status: Optional[int]) -> None:
+        """记录一次请求（status 为 None 表示连接失败或超时）"""
+        self.requests += 1
+        self.total_seconds += seconds
+        self.samples.append(seconds)
+        self.last_status = status
+        if status is None or status >= 400:
+            self.errors += 1
+
+    def to_dict(self) -> Dict:
+        ordered = sorted(self.samples)
+
+        def percentile(p: float) -> Optional[float]:
+            if not ordered:
+                return None
+            return round(ordered[min(len(ordered) - 1, int(len(ordered) * p))] * 1000, 1)
+
+        return {
+            'requests': self.requests,
+            'errors': self.errors,
+            'last_status': self.last_status,
+            'avg_ms': round(self.total_seconds / self.requests * 1000, 1) if self.requests else None,
+            'p50_ms': percentile(0.5),
+            'p95_ms': percentile(0.95),
+            'max_ms': round(ordered[-1] * 1000, 1) if ordered else None,
+        }
+
+
+class UpstreamClient:
+    """带连接池、重试和延迟统计的 HTTP 客户端"""
+
+    def __init__(
+        self,
+        pool_hosts: int = 16,
+        connections_per_host: int = 4,
+        max_retries: int = 2,
+        backoff_factor: float = 0.5,
+        timeout: float = 10,
+        max_retry_wait: float = 3
+    ):
+        """
+        Args:
+            pool_hosts: 保留连接池的主机数
+            connections_per_host: 每个主机的最大连接数（超过时等待空闲连接）
+            max_retries: 最大重试次数
+            backoff_factor: 退避系数，第 n 次重试前等待 backoff_factor * 2^(n-1) 秒
+            timeout: 连接和读取超时（秒）
+            max_retry_wait: 每次重试前的最长等待（秒，含 Retry-After），
+                重试的总等待不超过 max_retries * max_retry_wait
+        """
+        self.pool_hosts = pool_hosts
+        self.connections_per_host = connections_per_host
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        self.timeout = timeout
+        self.max_retry_wait = max_retry_wait
+        self.session = self._new_session()
+        self._stats: 'OrderedDict[str, UpstreamStats]' = OrderedDict()
+        self._lock = threading.Lock()
+        # fork 出的 worker 不能与父进程共用连接
+        os.register_at_fork(after_in_child=self._reset_after_fork)
+
+    def _new_session(self) -> requests.Session:
+        options = {
+            name: self.max_retry_wait
+            for name in ('retry_after_max', 'backoff_max') if name in _RETRY_PARAMS
+        }
+        retry = Retry(
+            total=self.max_retries,
+            backoff_factor=self.backoff_factor,
+            status_forcelist=RETRY_STATUS,
+            allowed_methods=frozenset(['GET', 'HEAD']),
+            respect_retry_after_header='retry_after_max' in _RETRY_PARAMS,
+            raise_on_status=False,
+            **options
+        )
+        adapter = HTTPAdapter(
+            pool_connections=self.pool_hosts,
+            pool_maxsize=self.connections_per_host,
+            pool_block=True,
+            max_retries=retry
+        )
+        session = requests.Session()
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+        return session
+
+    def _reset_after_fork(self) -> None:
+        self.session = self._new_session()
+        self._stats = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, url: str, headers: Optional[Dict[str, str]] = None) -> requests.Response:
+        """
+        发送 GET 请求（含重试）并记录延迟
+
+        Raises:
+            requests.RequestException: 连接失败、超时或重试耗尽
+        """
+        start = time.perf_counter()
+        status = None
+        try:
+            response = self.session.get(url, headers=headers, timeout=self.timeout)
+            status = response.status_code
+            return response
+        finally:
+            self._record(urlsplit(url).netloc, time.perf_counter() - start, status)
+
+    def _record(self, host: str, seconds: float, status: Optional[int]) -> None:
+        with self._lock:
+            stats = self._stats.get(host)
+            if stats is None:
+                stats = self._stats[host] = UpstreamStats()
+                while len(self._stats) > MAX_TRACKED_HOSTS:
+                    self._stats.popitem(last=False)
+            else:
+                self._stats.move_to_end(host)
+            stats.record(seconds, status)
+
+    def stats(self) -> Dict[str, Dict]:
+        """各上游主机的请求统计"""
+        with self._lock:
+            return {host: stats.to_dict() for host, stats in self._stats.items()}
@@ -0,0 +1,257 @@
+"""
+RSS / Atom 解析
+
+把订阅源内容转换为前端使用的条目结构：
+id / title / summary / link / publishTime（毫秒时间戳，缺失时为 None）/ author
+
+快速路径基于 ElementTree.iterparse 增量解析，只提取上述字段，达到条目数上限后立即停止；
+XML 格式不正确（如未声明的 HTML 实体）、编码不受支持或不是 RSS / Atom 时
+回退到 feedparser（完整的容错解析和编码检测）。
+"""
+import io
+import logging
+import re
+import xml.etree.ElementTree as ET
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Dict, List, Optional
+
+import feedparser
+
+logger = logging.getLogger(__name__)
+
+# 摘要中的 HTML 标签
+_TAG_PATTERN = re.compile(r'<[^>]+>')
+
+# 摘要最大长度
+SUMMARY_MAX_LENGTH = 200
+
+# 快速路径支持的根元素（RSS 2.0 / RSS 1.0 / Atom）
+_ROOTS = ('rss', 'RDF', 'feed')
+
+# 条目元素（RSS 为 item，Atom 为 entry）
+_ITEM_TAGS = ('item', 'entry')
+
+# 订阅源标题 / 链接所在的父元素
+_CHANNEL_TAGS = ('channel', 'feed')
+
+# 条目字段所在的命名空间
+_RSS1_NS = '{http://purl.org/rss/1.0/}'
+_ATOM_NS = '{http://www.w3.org/2005/Atom}'
+_ATOM03_NS = '{http://purl.org/atom/ns#}'
+_CONTENT_NS = '{http://purl.org/rss/1.0/modules/content/}'
+_DC_NS = '{http://purl.org/dc/elements/1.1/}'
+
+
+def _item_fields() -> Dict[str, str]:
+    """带命名空间的条目子元素标签 -> 字段名（其他命名空间的同名元素如 media:content 不参与）"""
+    fields = {}
+    for ns in ('', _RSS1_NS):
+        fields.update({
+            f'{ns}title': 'title', f'{ns}link': 'link', f'{ns}guid': 'id',
+            f'{ns}description': 'summary', f'{ns}pubDate': 'published', f'{ns}author': 'author',
+        })
+    for ns in (_ATOM_NS, _ATOM03_NS):
+        fields.update({
+            f'{ns}title': 'title', f'{ns}link': 'link', f'{ns}id': 'id', f'{ns}author': 'author',
+            f'{ns}summary': 'summary', f'{ns}content': 'content',
+            f'{ns}published': 'published', f'{ns}issued': 'published',
+            f'{ns}updated': 'updated', f'{ns}modified': 'updated',
+        })
+    fields.update({
+        f'{_CONTENT_NS}encoded': 'content',
+        f'{_DC_NS}creator': 'creator',
+        f'{_DC_NS}date': 'updated',
+    })
+    return fields
+
+
+_ITEM_FIELDS = _item_fields()
+
+
+class ParsedFeed:
+    """解析后的订阅源"""
+
+    def __init__(self, title: str, link: str, items: List[Dict]):
+        self.title = title
+        self.link = link
+        self.items = items
+
+
+def strip_html(text: str) -> str:
+    """移除 HTML 标签并截断到 SUMMARY_MAX_LENGTH"""
+    return _TAG_PATTERN.sub('', text).strip()[:SUMMARY_MAX_LENGTH]
+
+
+def _timestamp_ms(value: datetime) -> float:
+    """
+    毫秒时间戳，与 feedparser 路径一致：先换算为 UTC 时间，再按本地时间解释
+    （datetime(*entry.published_parsed[:6]).timestamp()）
+    """
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value.timestamp() * 1000
+
+
+def _parse_date(text: Optional[str]) -> Optional[float]:
+    """解析 RFC 822（RSS pubDate）或 ISO 8601（Atom、dc:date）时间"""
+    if not text:
+        return None
+    text = text.strip()
+    try:
+        return _timestamp_ms(parsedate_to_datetime(text))
+    except (TypeError, ValueError, IndexError):
+        pass
+    try:
+        return _timestamp_ms(datetime.fromisoformat(text.replace('Z', '+00:00')))
+    except ValueError:
+        return None
+
+
+def _local_name(tag: str) -> str:
+    return tag.rsplit('}', 1)[-1]
+
+
+def _atom_link(element: ET.Element) -> Optional[str]:
+    """Atom link 元素的地址（只取 rel 为 alternate 或缺省的）"""
+    if element.get('rel', 'alternate') != 'alternate':
+        return None
+    return element.get('href')
+
+
+def _parse_item(element: ET.Element) -> Dict:
+    """提取一个条目的字段"""
+    fields = {}
+    for child in element:
+        name = _ITEM_FIELDS.get(child.tag)
+        if name is None:
+            continue
+        if child.get('type') == 'xhtml':
+            # Atom xhtml 内容为 div 子元素，取其中的全部文本
+            text = ''.join(child.itertext())
+        else:
+            text = child.text or ''
+        if name == 'link':
+            link = _atom_link(child) if child.get('href') is not None else text.strip()
+            if link:
+                fields.setdefault('link', link)
+        elif name == 'author':
+            # Atom 的 author 包含 name 子元素
+            author_name = next((c.text for c in child if _local_name(c.tag) == 'name'), None)
+            fields.setdefault('author', (author_name or text).strip())
+        elif name in ('summary', 'content', 'published', 'updated'):
+            fields.setdefault(name, text)
+        else:
+            fields.setdefault(name, text.strip())
+
+    link = fields.get('link', '')
+    # 没有摘要时使用正文（与 feedparser 一致）
+    summary = fields.get('summary', fields.get('content'))
+    publish_time = _parse_date(fields.get('published'))
+    if publish_time is None:
+        publish_time = _parse_date(fields.get('updated'))
+    return {
+        'id': fields.get('id') or link,
+        'title': fields.get('title', ''),
+        'summary': strip_html(summary) if summary is not None else '',
+        'link': link,
+        'publishTime': publish_time,
+        'author': fields.get('author') or fields.get('creator', ''),
+    }
+
+
+def parse_feed_fast(content: bytes, max_items: Optional[int] = None) -> ParsedFeed:
+    """
+    增量解析 RSS / Atom，只提取所需字段
+
+    Args:
+        content: 响应体
+        max_items: 最多解析的条目数，None 表示不限制
+
+    Returns:
+        ParsedFeed: 解析结果
+
+    Raises:
+        ValueError: 不是格式正确的 RSS / Atom，或编码不受支持（多字节编码以外的未知编码也转换为 ValueError）
+    """
+    title = link = None
+    items = []
+    path = []
+    try:
+        for event, element in ET.iterparse(io.BytesIO(content), events=('start', 'end')):
+            name = _local_name(element.tag)
+            if event == 'start':
+                if not path and name not in _ROOTS:
+                    raise ValueError(f"不是 RSS / Atom: <{name}>")
+                path.append(name)
+                continue
+
+            path.pop()
+            parent = path[-1] if path else None
+            if name in _ITEM_TAGS:
+                items.append(_parse_item(element))
+                # 已处理的条目不再保留，内存占用与条目数无关
+                element.clear()
+                if max_items is not None and len(items) >= max_items:
+                    break
+            elif parent in _CHANNEL_TAGS:
+                if name == 'title' and title is None:
+                    title = (element.text or '').strip()
+                elif name == 'link' and link is None:
+                    link = _atom_link(element) if element.get('href') is not None else (element.text or '').strip()
+    except (ET.ParseError, LookupError) as e:
+        raise ValueError(f"XML 解析失败: {str(e)}")
+
+    return ParsedFeed(title or '', link or '', items)
+
+
+def _publish_time(entry) -> Optional[float]:
+    """发布时间（毫秒），依次取 published / updated"""
+    if hasattr(entry, 'published_parsed') and entry.published_parsed:
+        return datetime(*entry.published_parsed[:6]).timestamp() * 1000
+    if hasattr(entry, 'updated_parsed') and entry.updated_parsed:
+        return datetime(*entry.updated_parsed[:6]).timestamp() * 1000
+    return None
+
+
+def parse_feed_compat(content: bytes, max_items: Optional[int] = None) -> ParsedFeed:
+    """
+    使用 feedparser 解析（容错，支持各种编码）
+
+    Args:
+        content: 响应体
+        max_items: 最多返回的条目数，None 表示不限制
+
+    Returns:
+        ParsedFeed: 解析结果（条目为空时 items 为空列表）
+    """
+    feed = feedparser.parse(content)
+    items = []
+    for entry in feed.entries[:max_items]:
+        items.append({
+            'id': entry.get('id', entry.get('link', '')),
+            'title': entry.get('title', ''),
+            'summary': strip_html(entry.summary) if hasattr(entry, 'summary') else '',
+            'link': entry.get('link', ''),
+            'publishTime': _publish_time(entry),
+            'author': entry.get('author', ''),
+        })
+    return ParsedFeed(feed.feed.get('title', ''), feed.feed.get('link', ''), items)
+
+
+def parse_feed(content: bytes, max_items: Optional[int] = None) -> ParsedFeed:
+    """
+    解析 RSS / Atom 内容：优先使用快速路径，失败时回退到 feedparser
+
+    Args:
+        content: 响应体
+        max_items: 最多解析的条目数，None 表示不限制
+
+    Returns:
+        ParsedFeed: 订阅源标题、链接和条目列表
+    """
+    try:
+        return parse_feed_fast(content, max_items)
+    except ValueError as e:
+        logger.info(f"快速解析失败，回退到 feedparser: {str(e)}")
+        return parse_feed_compat(content, max_items)
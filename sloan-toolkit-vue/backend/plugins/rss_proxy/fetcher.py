@@ -0,0 +1,150 @@
+"""
+订阅源获取
+
+先查缓存，过期条目先返回旧数据并在后台重新验证，用户请求不等待上游；
+向上游请求时带上 ETag / Last-Modified 条件请求头，304 时只刷新获取时间，不重新解析。
+同一个 URL 的并发上游请求（包括后台重新验证）合并为一次。
+"""
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Optional, Tuple
+
+from .cache import CachedFeed, FeedCache
+from .client import UpstreamClient
+from .feeds import parse_feed
+from .singleflight import SingleFlight
+
+logger = logging.getLogger(__name__)
+
+# 缓存状态（响应头 X-Cache）
+CACHE_HIT = 'HIT'
+CACHE_STALE = 'STALE'
+CACHE_MISS = 'MISS'
+CACHE_REVALIDATED = 'REVALIDATED'
+
+
+class FeedFetcher:
+    """带缓存和条件请求的订阅源获取"""
+
+    def __init__(
+        self,
+        cache: FeedCache,
+        client: UpstreamClient,
+        revalidate_workers: int = 2,
+        max_items: Optional[int] = None
+    ):
+        """
+        Args:
+            cache: 订阅源缓存
+            client: 上游 HTTP 客户端（共享连接池）
+            revalidate_workers: 后台重新验证的线程数
+            max_items: 每个订阅源最多解析的条目数，None 表示不限制
+        """
+        self.cache = cache
+        self.client = client
+        self.max_items = max_items
+        self.revalidate_workers = revalidate_workers
+        self._executor = ThreadPoolExecutor(max_workers=revalidate_workers, thread_name_prefix='rss-revalidate')
+        # 正在后台重新验证的 URL，同一 URL 只提交一次
+        self._revalidating = set()
+        self._lock = threading.Lock()
+        self.flight = SingleFlight()
+        os.register_at_fork(after_in_child=self._reset_after_fork)
+
+    def _reset_after_fork(self) -> None:
+        self._executor = ThreadPoolExecutor(max_workers=self.revalidate_workers, thread_name_prefix='rss-revalidate')
+        self._revalidating = set()
+        self._lock = threading.Lock()
+        self.flight = SingleFlight()
+
+    def get(self, url: str, headers: Dict[str, str]) -> Tuple[CachedFeed, str]:
+        """
+        获取订阅源
+
+        Args:
+            url: 订阅源 URL
+            headers: 请求头
+
+        Returns:
+            Tuple[CachedFeed, str]: 缓存条目和缓存状态（HIT / STALE / MISS / REVALIDATED）
+
+        Raises:
+            requests.RequestException: 无可用缓存且上游请求失败
+        """
+        entry = self.cache.get(url)
+        if entry is not None:
+            if self.cache.is_fresh(entry):
+                return entry, CACHE_HIT
+            if self.cache.is_usable_stale(entry):
+                self.cache.record_stale_hit()
+                self._schedule_revalidate(url, headers, entry)
+                return entry, CACHE_STALE
+
+        # 并发请求同一个 URL 时共用一次上游请求和解析
+        refreshed, _ = self.flight.do(url, lambda: self.refresh(url, headers, entry))
+        return refreshed, CACHE_REVALIDATED if refreshed is entry else CACHE_MISS
+
+    def revalidate(self, url: str, headers: Dict[str, str]) -> CachedFeed:
+        """
+        不论缓存是否新鲜都向上游重新验证（条件请求，与同一 URL 的其他请求合并）
+
+        Returns:
+            CachedFeed: 最新的缓存条目
+
+        Raises:
+            requests.RequestException: 请求失败
+        """
+        entry = self.cache.get(url)
+        refreshed, _ = self.flight.do(url, lambda: self.refresh(url, headers, entry))
+        return refreshed
+
+    def refresh(self, url: str, headers: Dict[str, str], entry: Optional[CachedFeed] = None) -> CachedFeed:
+        """
+        向上游请求（有缓存条目时使用条件请求）并更新缓存
+
+        Returns:
+            CachedFeed: 上游返回 304 时为原条目，否则为新条目
+
+        Raises:
+            requests.RequestException: 请求失败
+        """
+        request_headers = dict(headers)
+        if entry is not None:
+            request_headers.update(entry.conditional_headers())
+
+        response = self.client.get(url, headers=request_headers)
+        if response.status_code == 304 and entry is not None:
+            logger.info(f"RSS 未变化 (304): {url}")
+            self.cache.record_revalidated()
+            entry.touch()
+            return entry
+        response.raise_for_status()
+
+        feed = parse_feed(response.content, self.max_items)
+        refreshed = CachedFeed(
+            url, feed,
+            etag=response.headers.get('ETag'),
+            last_modified=response.headers.get('Last-Modified')
+        )
+        self.cache.put(refreshed)
+        logger.info(f"RSS 已更新: {url}（{len(feed.items)} 条）")
+        return refreshed
+
+    def _schedule_revalidate(self, url: str, headers: Dict[str, str], entry: CachedFeed) -> None:
+        with self._lock:
+            if url in self._revalidating:
+                return
+            self._revalidating.add(url)
+        self._executor.submit(self._revalidate, url, headers, entry)
+
+    def _revalidate(self, url: str, headers: Dict[str, str], entry: CachedFeed) -> None:
+        """后台重新验证，失败时保留旧数据"""
+        try:
+            self.flight.do(url, lambda: self.refresh(url, headers, entry))
+        except Exception as e:
+            logger.warning(f"后台刷新 RSS 失败 {url}: {str(e)}")
+        finally:
+            with self._lock:
+                self._revalidating.discard(url)
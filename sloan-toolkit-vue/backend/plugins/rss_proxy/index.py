@@ -0,0 +1,173 @@
+"""
+订阅源条目索引（增量下发）
+
+每个订阅源按 (发布时间, id) 倒序保存最近见过的条目，每次从上游获取新内容时合并：
+- 缺少发布时间的条目使用首次出现的时间排序，同一条目的排序键在多次刷新间保持不变
+- 上游只保留最近若干条时，已滚出订阅源的条目仍留在索引中，长时间未刷新的客户端也不会漏掉
+- 客户端带上次响应的游标（since / sinceId）请求，只返回比游标更新的条目
+
+路由每次响应前调用 sync：缓存条目未变化时（同一个解析结果）直接跳过，开销为 O(1)。
+
+索引在进程内，多 worker 部署时各 worker 独立维护；游标基于条目内容，在不同 worker 间仍可使用
+（只有缺少发布时间的条目排序可能不同）。
+"""
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+from .feeds import ParsedFeed
+
+# 排序键：(毫秒时间戳, id)
+ItemKey = Tuple[float, str]
+
+
+def item_id(item: Dict) -> str:
+    """条目的唯一标识（id，缺失时为 link）"""
+    return item.get('id') or item.get('link') or ''
+
+
+class _FeedIndex:
+    """单个订阅源的条目索引"""
+
+    def __init__(self):
+        # id -> (排序键, 条目)
+        self.entries: Dict[str, Tuple[ItemKey, Dict]] = {}
+        # 排序键倒序（最新在前）
+        self.keys: List[ItemKey] = []
+        # 索引中被淘汰的最新排序键，早于它的游标无法保证完整
+        self.evicted_key: Optional[ItemKey] = None
+        # 最近一次合并的解析结果
+        self.source: Optional[ParsedFeed] = None
+
+
+class FeedItemIndex:
+    """按订阅源 URL 的条目索引"""
+
+    def __init__(self, max_items: int = 500, max_feeds: int = 64):
+        """
+        Args:
+            max_items: 每个订阅源保留的条目数
+            max_feeds: 最多索引的订阅源数（超过时淘汰最久未更新的）
+        """
+        self.max_items = max_items
+        self.max_feeds = max_feeds
+        self._feeds: 'OrderedDict[str, _FeedIndex]' = OrderedDict()
+        self._lock = threading.Lock()
+        os.register_at_fork(after_in_child=self._reset_after_fork)
+
+    def _reset_after_fork(self) -> None:
+        self._lock = threading.Lock()
+
+    def sync(self, url: str, feed: ParsedFeed) -> List[Dict]:
+        """
+        合并订阅源的最新解析结果（已合并过的解析结果直接跳过）
+
+        Args:
+            url: 订阅源 URL
+            feed: 解析结果
+
+        Returns:
+            List[Dict]: 新出现或发布时间变新的条目（最新在前）
+        """
+        now = time.time() * 1000
+        added = []
+        changed = False
+        with self._lock:
+            index = self._feeds.get(url)
+            if index is None:
+                index = self._feeds[url] = _FeedIndex()
+                while len(self._feeds) > self.max_feeds:
+                    self._feeds.popitem(last=False)
+            elif index.source is feed:
+                return []
+            else:
+                self._feeds.move_to_end(url)
+            index.source = feed
+
+            for item in feed.items:
+                key_id = item_id(item)
+                if not key_id:
+                    continue
+                existing = index.entries.get(key_id)
+                publish_time = item.get('publishTime')
+                if publish_time is None:
+                    # 沿用首次出现的时间，避免每次刷新都被当作新条目
+                    publish_time = existing[0][0] if existing else now
+                key = (publish_time, key_id)
+                if existing is None or key != existing[0]:
+                    # 发布时间变早（如上游修改）的条目不算新条目，但排序位置同样需要更新
+                    changed = True
+                    if existing is None or key > existing[0]:
+                        added.append((key, item))
+                index.entries[key_id] = (key, item)
+
+            if changed:
+                ordered = sorted(index.entries.values(), key=lambda entry: entry[0], reverse=True)
+                for key, item in ordered[self.max_items:]:
+                    del index.entries[item_id(item)]
+                    if index.evicted_key is None or key > index.evicted_key:
+                        index.evicted_key = key
+                index.keys = [key for key, _ in ordered[:self.max_items]]
+                # 超出保留条数、合并后即被淘汰的条目不算新条目
+                added = [(key, item) for key, item in added if key[1] in index.entries]
+
+        added.sort(key=lambda entry: entry[0], reverse=True)
+        return [item for _, item in added]
+
+    def since(
+        self,
+        url: str,
+        since: Optional[float] = None,
+        since_id: Optional[str] = None
+    ) -> Dict:
+        """
+        查询比游标更新的条目
+
+        Args:
+            url: 订阅源 URL
+            since: 游标的毫秒时间戳（None 表示返回全部）
+            since_id: 游标条目的 id，与 since 相同时间的条目按 id 区分
+
+        Returns:
+            Dict: items（最新在前）、cursor（下次请求使用的游标，索引为空时为 None）、
+                  truncated（游标早于索引保留范围，可能缺少条目，客户端应全量刷新）
+        """
+        with self._lock:
+            index = self._feeds.get(url)
+            if index is None:
+                return {'items': [], 'cursor': None, 'truncated': since is not None}
+
+            if since is None:
+                keys = index.keys
+            elif since_id:
+                keys = [key for key in index.keys if key > (since, since_id)]
+            else:
+                keys = [key for key in index.keys if key[0] > since]
+
+            items = [index.entries[key[1]][1] for key in keys]
+            truncated = (
+                since is not None
+                and index.evicted_key is not None
+                and (since, since_id or '') < index.evicted_key
+            )
+
+        return {'items': items, 'cursor': self.cursor(url), 'truncated': truncated}
+
+    def cursor(self, url: str) -> Optional[Dict]:
+        """最新条目的游标（since / sinceId），订阅源未索引或为空时为 None"""
+        with self._lock:
+            index = self._feeds.get(url)
+            if index is None or not index.keys:
+                return None
+            newest = index.keys[0]
+        return {'since': newest[0], 'sinceId': newest[1]}
+
+    def stats(self) -> Dict[str, int]:
+        """索引的订阅源数和条目总数"""
+        with self._lock:
+            return {
+                'feeds': len(self._feeds),
+                'items': sum(len(index.entries) for index in self._feeds.values()),
+            }
@@ -0,0 +1,80 @@
+"""
+请求合并（single-flight）
+
+同一个键的并发调用只执行一次，其余调用等待并得到相同的结果（或相同的异常），
+避免大量页面同时加载时对同一个订阅源重复请求和解析。
+"""
+import threading
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+
+class _Call:
+    """一次进行中的调用"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class SingleFlight:
+    """按键合并并发调用"""
+
+    def __init__(self):
+        self._calls: Dict[Hashable, _Call] = {}
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.executions = 0
+        self.coalesced = 0
+
+    def do(self, key: Hashable, func: Callable[[], Any]) -> Tuple[Any, bool]:
+        """
+        执行 func，同一个键已有调用在进行时等待其结果
+
+        Args:
+            key: 合并键（如订阅源 URL）
+            func: 无参数函数
+
+        Returns:
+            Tuple[Any, bool]: 结果，以及是否为合并得到的结果（未实际执行 func）
+
+        Raises:
+            Exception: func 抛出的异常（等待者收到同一个异常）
+        """
+        with self._lock:
+            self.calls += 1
+            call = self._calls.get(key)
+            if call is not None:
+                self.coalesced += 1
+                leader = False
+            else:
+                call = self._calls[key] = _Call()
+                self.executions += 1
+                leader = True
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result, True
+
+        try:
+            call.result = func()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result, False
+
+    def stats(self) -> Dict[str, int]:
+        """调用次数、实际执行次数、合并次数和进行中的键数"""
+        with self._lock:
+            return {
+                'calls': self.calls,
+                'executions': self.executions,
+                'coalesced': self.coalesced,
+                'in_flight': len(self._calls),
+            }
@@ -0,0 +1,173 @@
+"""
+订阅源推送（Server-Sent Events）
+
+每个有客户端订阅的订阅源只有一个后台轮询线程，按固定间隔向上游重新验证（条件请求），
+发现新条目后推送给该订阅源的所有客户端：
+- 上游请求频率与打开的页面数无关，只取决于订阅源数和轮询间隔
+- 第一个客户端订阅时启动轮询，最后一个客户端断开后停止
+- 新条目由条目索引按游标计算，与普通接口的增量下发一致
+- 客户端消费过慢（队列已满）时发送 reset 并断开，客户端带游标重新连接
+
+每个 SSE 连接在连接期间占用一个请求线程，同时在线的客户端数受 max_clients 限制。
+"""
+import json
+import logging
+import os
+import queue
+import threading
+from typing import Dict, Optional
+
+from .fetcher import FeedFetcher
+from .index import FeedItemIndex
+
+logger = logging.getLogger(__name__)
+
+# 每个客户端待发送的消息上限
+CLIENT_QUEUE_SIZE = 32
+
+# 通知客户端重新同步的消息
+RESET = None
+
+
+def format_event(event: str, data: Dict) -> str:
+    """格式化一条 SSE 消息"""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+class _Topic:
+    """一个订阅源的订阅者和轮询线程"""
+
+    def __init__(self, url: str, headers: Dict[str, str]):
+        self.url = url
+        self.headers = headers
+        self.subscribers = set()
+        self.stop = threading.Event()
+        self.thread: Optional[threading.Thread] = None
+        self.polls = 0
+        self.pushed = 0
+
+
+class FeedStreamHub:
+    """按订阅源管理 SSE 客户端和后台轮询"""
+
+    def __init__(self, fetcher: FeedFetcher, index: FeedItemIndex, interval: float = 60, max_clients: int = 32):
+        """
+        Args:
+            fetcher: 订阅源获取（共享缓存、连接池和请求合并）
+            index: 条目索引
+            interval: 轮询间隔（秒）
+            max_clients: 同时在线的客户端数上限
+        """
+        self.fetcher = fetcher
+        self.index = index
+        self.interval = interval
+        self.max_clients = max_clients
+        self._topics: Dict[str, _Topic] = {}
+        self._clients = 0
+        self._lock = threading.Lock()
+        os.register_at_fork(after_in_child=self._reset_after_fork)
+
+    def _reset_after_fork(self) -> None:
+        # 轮询线程不会被 fork 复制，worker 中重新开始
+        self._topics = {}
+        self._clients = 0
+        self._lock = threading.Lock()
+
+    def subscribe(self, url: str, headers: Dict[str, str]) -> Optional[queue.Queue]:
+        """
+        订阅订阅源，必要时启动轮询线程
+
+        Args:
+            url: 订阅源 URL
+            headers: 上游请求头（只在启动轮询时使用）
+
+        Returns:
+            Optional[queue.Queue]: 该客户端的消息队列，客户端数已达上限时为 None
+        """
+        client = queue.Queue(maxsize=CLIENT_QUEUE_SIZE)
+        with self._lock:
+            if self._clients >= self.max_clients:
+                return None
+            self._clients += 1
+            topic = self._topics.get(url)
+            if topic is None:
+                topic = self._topics[url] = _Topic(url, dict(headers))
+                topic.thread = threading.Thread(
+                    target=self._poll, args=(topic,), name='rss-poller', daemon=True
+                )
+                topic.thread.start()
+                logger.info(f"开始轮询 RSS: {url}（间隔 {self.interval}s）")
+            topic.subscribers.add(client)
+        return client
+
+    def unsubscribe(self, url: str, client: queue.Queue) -> None:
+        """取消订阅，最后一个客户端断开时停止轮询"""
+        with self._lock:
+            topic = self._topics.get(url)
+            if topic is None or client not in topic.subscribers:
+                return
+            topic.subscribers.discard(client)
+            self._clients -= 1
+            if not topic.subscribers:
+                topic.stop.set()
+                del self._topics[url]
+                logger.info(f"停止轮询 RSS: {url}")
+
+    def _poll(self, topic: _Topic) -> None:
+        """轮询线程：重新验证订阅源，把游标之后的新条目推送给订阅者"""
+        cursor = self.index.cursor(topic.url)
+        while not topic.stop.wait(self.interval):
+            topic.polls += 1
+            try:
+                entry = self.fetcher.revalidate(topic.url, topic.headers)
+            except Exception as e:
+                logger.warning(f"轮询 RSS 失败 {topic.url}: {str(e)}")
+                continue
+
+            self.index.sync(topic.url, entry.feed)
+            if cursor is None:
+                result = self.index.since(topic.url)
+            else:
+                result = self.index.since(topic.url, cursor['since'], cursor['sinceId'])
+            cursor = result['cursor'] or cursor
+            if result['items']:
+                # 与带游标的普通请求一致，客户端只合并新条目
+                self._publish(topic, {'items': result['items'], 'cursor': cursor, 'incremental': True})
+
+    def _publish(self, topic: _Topic, message: Dict) -> None:
+        with self._lock:
+            subscribers = list(topic.subscribers)
+            topic.pushed += len(message['items'])
+        logger.info(f"推送 {len(message['items'])} 条新 RSS 条目给 {len(subscribers)} 个客户端: {topic.url}")
+        for client in subscribers:
+            try:
+                client.put_nowait(message)
+            except queue.Full:
+                # 客户端跟不上推送：清空队列并通知其重新同步
+                self._drain(client)
+                client.put_nowait(RESET)
+
+    @staticmethod
+    def _drain(client: queue.Queue) -> None:
+        try:
+            while True:
+                client.get_nowait()
+        except queue.Empty:
+            pass
+
+    def stats(self) -> Dict:
+        """在线客户端数和各订阅源的订阅者数、轮询次数、推送条目数"""
+        with self._lock:
+            return {
+                'clients': self._clients,
+                'max_clients': self.max_clients,
+                'interval': self.interval,
+                'feeds': {
+                    url: {
+                        'subscribers': len(topic.subscribers),
+                        'polls': topic.polls,
+                        'pushed': topic.pushed,
+                    }
+                    for url, topic in self._topics.items()
+                },
+            }
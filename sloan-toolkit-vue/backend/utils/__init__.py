@@ -2,12 +2,15 @@
 工具函数包
 """
 from .logger import setup_logger
-from .matplotlib_config import setup_matplotlib
-from .file_utils import allowed_file, safe_parse_float
+from .matplotlib_config import setup_matplotlib, ensure_matplotlib, preload_matplotlib
+from .file_utils import allowed_file, safe_parse_float, SpooledUploadRequest
 
 __all__ = [
     'setup_logger',
     'setup_matplotlib',
+    'ensure_matplotlib',
+    'preload_matplotlib',
     'allowed_file',
-    'safe_parse_float'
+    'safe_parse_float',
+    'SpooledUploadRequest'
 ]
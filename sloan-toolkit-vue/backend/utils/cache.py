@@ -0,0 +1,83 @@
+"""
+内存缓存工具
+"""
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional
+
+
+class LRUCache:
+    """线程安全的 LRU 缓存，同时限制条目数和总字节数"""
+
+    def __init__(
+        self,
+        max_entries: int = 128,
+        max_bytes: Optional[int] = None,
+        sizeof: Callable[[Any], int] = len
+    ):
+        """
+        Args:
+            max_entries: 最大条目数
+            max_bytes: 最大总字节数，None 表示不限制
+            sizeof: 计算单个值字节数的函数
+        """
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._sizeof = sizeof
+        self._data: 'OrderedDict[Hashable, Any]' = OrderedDict()
+        self._sizes: Dict[Hashable, int] = {}
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """读取缓存，命中时将条目移到最近使用位置"""
+        with self._lock:
+            if key in self._data:
+                self._data.move_to_end(key)
+                self.hits += 1
+                return self._data[key]
+            self.misses += 1
+            return None
+
+    def put(self, key: Hashable, value: Any) -> None:
+        """写入缓存，超出容量时淘汰最久未使用的条目"""
+        size = self._sizeof(value)
+        with self._lock:
+            if key in self._data:
+                self._bytes -= self._sizes.pop(key)
+                del self._data[key]
+
+            # 单个值超过总容量时不缓存
+            if self.max_bytes is not None and size > self.max_bytes:
+                return
+
+            self._data[key] = value
+            self._sizes[key] = size
+            self._bytes += size
+
+            while len(self._data) > self.max_entries or \
+                    (self.max_bytes is not None and self._bytes > self.max_bytes):
+                old_key, _ = self._data.popitem(last=False)
+                self._bytes -= self._sizes.pop(old_key)
+
+    def clear(self) -> None:
+        """清空缓存（不重置计数器）"""
+        with self._lock:
+            self._data.clear()
+            self._sizes.clear()
+            self._bytes = 0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def stats(self) -> Dict[str, int]:
+        """返回命中/未命中计数和当前占用"""
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'entries': len(self._data),
+                'bytes': self._bytes,
+            }
@@ -1,11 +1,24 @@
 """
 文件处理工具函数
 """
+import os
+import tempfile
+import threading
 
-def allowed_file(filename, allowed_extensions={'log', 'txt'}):
-    """检查文件扩展名是否允许"""
-    return '.' in filename and \
-           filename.rsplit('.', 1)[1].lower() in allowed_extensions
+from flask import Request
+
+def allowed_file(filename, allowed_extensions={'log', 'txt'}, compressed_extensions={'gz', 'zst', 'zip'}):
+    """检查文件扩展名是否允许（支持 .log.gz / .log.zst 等压缩文件及 zip 压缩包）"""
+    if '.' not in filename:
+        return False
+    name, ext = filename.rsplit('.', 1)
+    ext = ext.lower()
+    if ext in allowed_extensions:
+        return True
+    if ext not in compressed_extensions:
+        return False
+    # zip 为压缩包，其余压缩格式要求内层为允许的扩展名
+    return ext == 'zip' or allowed_file(name, allowed_extensions, set())
 
 def safe_parse_float(value, default=0.0):
     """安全地将值转换为浮点数"""
@@ -13,3 +26,57 @@ def safe_parse_float(value, default=0.0):
         return float(value) if value is not None else default
     except (ValueError, TypeError):
         return default
+
+def atomic_write(path, data):
+    """
+    先写临时文件再重命名，其他进程（多 worker 部署）只会读到完整的文件
+
+    Raises:
+        OSError: 写入失败
+    """
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    except OSError:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+
+def evict_oldest_files(directory, suffix, max_bytes):
+    """目录中以 suffix 结尾的文件总大小超过 max_bytes 时，按修改时间删除最旧的文件"""
+    entries = []
+    total = 0
+    for entry in os.scandir(directory):
+        if not entry.name.endswith(suffix):
+            continue
+        try:
+            stat = entry.stat()
+        except OSError:
+            # 已被其他进程删除
+            continue
+        entries.append((stat.st_mtime, stat.st_size, entry.path))
+        total += stat.st_size
+
+    entries.sort()
+    for _, size, path in entries:
+        if total <= max_bytes:
+            break
+        try:
+            os.remove(path)
+            total -= size
+        except OSError:
+            pass
+
+
+class SpooledUploadRequest(Request):
+    """上传文件先缓存在内存中，超过阈值才写入磁盘临时文件"""
+    
+    # 内存缓存上限（字节），由 create_app 根据配置设置
+    spool_max_size = 8 * 1024 * 1024
+    
+    def _get_file_stream(self, total_content_length, content_type, filename=None, content_length=None):
+        return tempfile.SpooledTemporaryFile(max_size=self.spool_max_size, mode='rb+')
@@ -1,20 +1,31 @@
 """
 Matplotlib 配置工具
+
+导入 matplotlib 及扫描系统字体需要数百毫秒，推迟到首次渲染图表时执行：
+- ensure_matplotlib: 首次调用时导入并配置 matplotlib，之后直接返回
+- preload_matplotlib: 在后台线程中提前执行 ensure_matplotlib
 """
-import matplotlib
-matplotlib.use('Agg')  # 设置无界面后端
-import matplotlib.pyplot as plt
 import platform
 import logging
+import threading
+import time
+from typing import Dict, Optional
 
 logger = logging.getLogger(__name__)
 
+_lock = threading.Lock()
+_ready = False
+_load_seconds: Optional[float] = None
+
 def setup_matplotlib():
     """配置 matplotlib 的中文字体支持"""
-    
+    import matplotlib
+    matplotlib.use('Agg')  # 设置无界面后端（须在导入 pyplot 之前）
+    rcParams = matplotlib.rcParams
+
     # 根据操作系统配置字体
     if platform.system() == 'Darwin':  # macOS
-        plt.rcParams['font.sans-serif'] = [
+        rcParams['font.sans-serif'] = [
             'Arial Unicode MS',
             'Hiragino Sans GB',
             'Heiti TC',
@@ -23,25 +34,25 @@ def setup_matplotlib():
             'Songti SC'
         ]
     elif platform.system() == 'Windows':
-        plt.rcParams['font.sans-serif'] = ['SimHei', 'Microsoft YaHei']
+        rcParams['font.sans-serif'] = ['SimHei', 'Microsoft YaHei']
     else:  # Linux
-        plt.rcParams['font.sans-serif'] = [
+        rcParams['font.sans-serif'] = [
             'WenQuanYi Micro Hei',
             'Noto Sans CJK SC',
             'DejaVu Sans'
         ]
-    
+
     # 用来正常显示负号
-    plt.rcParams['axes.unicode_minus'] = False
-    
-    logger.info(f"matplotlib 字体设置: {plt.rcParams['font.sans-serif']}")
-    
+    rcParams['axes.unicode_minus'] = False
+
+    logger.info(f"matplotlib 字体设置: {rcParams['font.sans-serif']}")
+
     # 验证可用字体
     try:
         import matplotlib.font_manager as fm
         available_fonts = [f.name for f in fm.fontManager.ttflist]
         logger.info(f"系统可用字体数量: {len(available_fonts)}")
-        
+
         # 检查推荐字体是否可用
         test_fonts = ['Arial Unicode MS', 'Hiragino Sans GB', 'STHeiti']
         for font in test_fonts:
@@ -49,3 +60,30 @@ def setup_matplotlib():
                 logger.info(f"✓ 找到推荐字体: {font}")
     except Exception as e:
         logger.warning(f"字体检查失败: {str(e)}")
+
+def ensure_matplotlib():
+    """首次调用时导入并配置 matplotlib（线程安全，之后的调用直接返回）"""
+    global _ready, _load_seconds
+    if _ready:
+        return
+    with _lock:
+        if _ready:
+            return
+        start = time.perf_counter()
+        setup_matplotlib()
+        _load_seconds = time.perf_counter() - start
+        _ready = True
+    logger.info(f"matplotlib 加载完成，耗时 {_load_seconds * 1000:.0f}ms")
+
+def preload_matplotlib() -> threading.Thread:
+    """在后台线程中加载 matplotlib，不阻塞启动"""
+    thread = threading.Thread(target=ensure_matplotlib, name='matplotlib-preload', daemon=True)
+    thread.start()
+    return thread
+
+def matplotlib_status() -> Dict:
+    """加载状态（健康检查使用）"""
+    return {
+        'loaded': _ready,
+        'load_ms': round(_load_seconds * 1000, 1) if _load_seconds is not None else None
+    }
@@ -0,0 +1,41 @@
+# -*- coding: utf-8 -*-
+"""
+gunicorn 配置（gunicorn -c gunicorn.conf.py wsgi:app）
+
+- 参数取自 AppConfig.WSGI_*
+- preload_app: master 进程中创建应用并预热插件后再 fork，worker 共享已加载的模块
+- 多个 worker 时启用共享状态目录：分析结果缓存（磁盘层）、任务状态和解析后的数据集
+  在 worker 之间共享，任务查询和瓦片/图表请求可以由任意 worker 处理
+- 分块上传的解析状态保存在创建会话的 worker 中，多个 worker 时关闭分块上传
+  （接口返回 501，前端改为整个文件上传）；需要分块上传时请使用默认的
+  WSGI_WORKERS = 1 并通过 WSGI_THREADS 提高并发
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'backend'))
+
+from config.settings import AppConfig
+
+bind = f"{AppConfig.HOST}:{AppConfig.PORT}"
+workers = AppConfig.WSGI_WORKERS
+threads = AppConfig.WSGI_THREADS
+worker_class = 'gthread'
+timeout = AppConfig.WSGI_TIMEOUT
+preload_app = True
+
+if workers > 1:
+    # 须在导入应用（wsgi.py）之前设置，插件模块导入时读取
+    if AppConfig.SHARED_STATE_DIR is None:
+        AppConfig.SHARED_STATE_DIR = os.path.join(AppConfig.UPLOAD_FOLDER, 'sloan_toolkit_shared')
+    AppConfig.ANALYSIS_CACHE_DISK = True
+    # 后续的块可能由其他 worker 处理，找不到会话
+    AppConfig.CHUNKED_UPLOAD_ENABLED = False
+
+
+def when_ready(server):
+    server.log.info(f"gunicorn 已就绪: {bind}，{workers} 个 worker × {threads} 线程")
+
+
+def post_fork(server, worker):
+    server.log.info(f"worker 已启动 (pid: {worker.pid})")
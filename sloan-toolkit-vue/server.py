@@ -5,6 +5,9 @@ Flask 后端服务器 - 主入口
 支持插件化架构，便于扩展新功能
 """
 
+import time
+_import_start = time.perf_counter()
+
 from flask import Flask
 from flask_cors import CORS
 import os
@@ -26,14 +29,15 @@ sys.path.insert(0, backend_dir)
 # 导入配置和工具
 from config.settings import AppConfig
 from utils.logger import setup_logger
-from utils.matplotlib_config import setup_matplotlib
+from utils.matplotlib_config import ensure_matplotlib, preload_matplotlib, matplotlib_status
+from utils.file_utils import SpooledUploadRequest
 
 # 导入插件
-from plugins.log_analyzer import log_analyzer_bp
+from plugins.log_analyzer import log_analyzer_bp, analysis_cache, warm_up as warm_up_log_analyzer
 
 # 导入 RSS 代理插件
 try:
-    from plugins.rss_proxy import rss_proxy_bp
+    from plugins.rss_proxy import rss_proxy_bp, feed_cache
     HAS_RSS_PROXY = True
     logger.info("✓ RSS代理插件加载成功")
 except Exception as e:
@@ -46,18 +50,29 @@ except Exception as e:
 # from plugins.weather import weather_bp
 # from plugins.other_plugin import other_plugin_bp
 
+# 启动耗时（秒），健康检查中返回
+startup_timings = {'import': time.perf_counter() - _import_start}
+
 def create_app():
     """创建并配置 Flask 应用"""
+    create_start = time.perf_counter()
     app = Flask(__name__)
     
     # 加载配置
     app.config.from_object(AppConfig)
     
+    # 上传文件在内存中缓存，超过阈值才落盘
+    SpooledUploadRequest.spool_max_size = AppConfig.UPLOAD_SPOOL_MAX_MEMORY
+    app.request_class = SpooledUploadRequest
+    
     # 启用 CORS
     CORS(app, resources={r"/*": {"origins": "*"}})
     
-    # 配置 matplotlib
-    setup_matplotlib()
+    # 配置 matplotlib（默认推迟到首次渲染图表时）
+    if AppConfig.MATPLOTLIB_PRELOAD == 'eager':
+        ensure_matplotlib()
+    elif AppConfig.MATPLOTLIB_PRELOAD == 'background':
+        preload_matplotlib()
     
     # 注册蓝图（插件）
     app.register_blueprint(log_analyzer_bp, url_prefix='/api')
@@ -79,15 +94,24 @@ def create_app():
         plugins = [
             {'name': 'log-analyzer', 'endpoint': '/api/analyze'}
         ]
+        cache = {'analyze': analysis_cache.stats()}
         # 动态检查插件是否已注册
         if 'rss_proxy' in app.blueprints:
             plugins.append({'name': 'rss-proxy', 'endpoint': '/api/36kr/rss'})
+            cache['rss'] = feed_cache.stats()
             
         return jsonify({
             'status': 'ok',
             'message': 'Flask server is running',
             'version': '2.0.0',
-            'plugins': plugins
+            'plugins': plugins,
+            'cache': cache,
+            'startup': {
+                'import_ms': round(startup_timings['import'] * 1000, 1),
+                'create_app_ms': round(startup_timings.get('create_app', 0) * 1000, 1),
+                'warm_up_ms': round(startup_timings.get('warm_up', 0) * 1000, 1),
+                'matplotlib': matplotlib_status()
+            }
         })
     
     # 全局异常处理
@@ -103,8 +127,25 @@ def create_app():
             'details': traceback.format_exc()
         }), 500
     
+    startup_timings['create_app'] = time.perf_counter() - create_start
+    logger.info(
+        f"应用初始化完成: 导入 {startup_timings['import'] * 1000:.0f}ms，"
+        f"创建应用 {startup_timings['create_app'] * 1000:.0f}ms（matplotlib: {AppConfig.MATPLOTLIB_PRELOAD}）"
+    )
     return app
 
+def warm_up_plugins():
+    """
+    预热插件（加载 matplotlib、填充字体缓存等）
+
+    多 worker 部署（gunicorn preload_app）时在 fork 之前调用，
+    各 worker 通过写时复制共享已加载的模块，不必各自在首个请求时加载。
+    """
+    start = time.perf_counter()
+    warm_up_log_analyzer()
+    startup_timings['warm_up'] = time.perf_counter() - start
+    logger.info(f"插件预热完成，耗时 {startup_timings['warm_up'] * 1000:.0f}ms")
+
 def check_config_files():
     """检查配置文件并返回优先级最高的配置"""
     import json
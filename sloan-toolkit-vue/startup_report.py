@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+服务器启动耗时报告
+
+在新的子进程中分别以不同的 matplotlib 加载时机（AppConfig.MATPLOTLIB_PRELOAD）
+启动应用，测量从进程启动到第一个请求完成的耗时，以及第一次渲染图表的耗时。
+
+用法（在项目根目录下运行）：
+    python startup_report.py
+    python startup_report.py --repeat 5
+"""
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from typing import Dict, List
+
+MODES = ('eager', 'background', 'lazy')
+
+# 子进程：导入 server、创建应用、处理第一个请求、渲染第一张图表，输出各阶段耗时
+_CHILD = """
+import json, logging, sys, time
+start = time.perf_counter()
+import server
+imported = time.perf_counter()
+logging.disable(logging.CRITICAL)
+from config.settings import AppConfig
+AppConfig.MATPLOTLIB_PRELOAD = sys.argv[1]
+app = server.create_app()
+created = time.perf_counter()
+assert app.test_client().get('/').status_code == 200
+first_request = time.perf_counter()
+from plugins.log_analyzer.series import PMInfoSeries
+from plugins.log_analyzer.visualizer import PMInfoVisualizer
+series = PMInfoSeries()
+for i in range(1000):
+    series.append(float(i), 100.0 + i % 7, 4.0, 25.0, 3)
+PMInfoVisualizer().render_png(series)
+first_chart = time.perf_counter()
+print(json.dumps({
+    'import': imported - start,
+    'create_app': created - imported,
+    'first_request': first_request - start,
+    'first_chart': first_chart - first_request,
+}))
+"""
+
+
+def run_once(mode: str) -> Dict[str, float]:
+    """
+    启动一次子进程并返回各阶段耗时（秒）
+
+    Args:
+        mode: matplotlib 加载时机（eager / background / lazy）
+
+    Returns:
+        Dict[str, float]: 各阶段耗时，wall 为含解释器启动的总耗时
+    """
+    root = os.path.dirname(os.path.abspath(__file__))
+    start = time.perf_counter()
+    output = subprocess.run(
+        [sys.executable, '-c', _CHILD, mode],
+        cwd=root, capture_output=True, text=True, check=True
+    ).stdout
+    result = json.loads(output.strip().splitlines()[-1])
+    # 进程启动到第一个请求完成（含解释器启动，不含图表渲染）
+    result['wall'] = time.perf_counter() - start - result['first_chart']
+    return result
+
+
+def run_startup_report(repeat: int = 3) -> Dict[str, Dict[str, float]]:
+    """
+    各加载时机下重复启动 repeat 次，取中位数
+
+    Returns:
+        Dict[str, Dict[str, float]]: 加载时机 -> 各阶段耗时中位数（秒）
+    """
+    report = {}
+    for mode in MODES:
+        runs = [run_once(mode) for _ in range(repeat)]
+        report[mode] = {key: statistics.median(run[key] for run in runs) for key in runs[0]}
+    return report
+
+
+def main(argv: List[str]) -> None:
+    repeat = int(argv[argv.index('--repeat') + 1]) if '--repeat' in argv else 3
+    report = run_startup_report(repeat)
+
+    print(f"启动耗时（{repeat} 次中位数，毫秒）")
+    print(f"{'加载时机':<12}{'导入':>8}{'创建应用':>10}{'首个请求':>10}{'进程总计':>10}{'首张图表':>10}")
+    for mode, item in report.items():
+        print(f"{mode:<14}{item['import'] * 1000:>10.0f}{item['create_app'] * 1000:>12.0f}"
+              f"{item['first_request'] * 1000:>12.0f}{item['wall'] * 1000:>12.0f}"
+              f"{item['first_chart'] * 1000:>12.0f}")
+
+    baseline = report['eager']['wall']
+    lazy = report['lazy']['wall']
+    print(f"lazy 相比 eager，首个请求提前 {(baseline - lazy) * 1000:.0f}ms（{baseline / lazy:.2f}x）")
+
+
+if __name__ == '__main__':
+    main(sys.argv)
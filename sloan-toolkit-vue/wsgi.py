@@ -0,0 +1,30 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+生产环境 WSGI 入口
+
+gunicorn（多进程，Linux / macOS）:
+    gunicorn -c gunicorn.conf.py wsgi:app
+waitress（单进程多线程，Windows 可用）:
+    python wsgi.py
+
+worker / 线程数等配置见 AppConfig.WSGI_*。
+"""
+import sys
+
+from server import AppConfig, create_app, warm_up_plugins, logger
+
+app = create_app()
+
+# gunicorn preload_app 时在 master 进程中执行（fork 之前）
+warm_up_plugins()
+
+if __name__ == '__main__':
+    try:
+        from waitress import serve
+    except ImportError:
+        logger.error("未安装 waitress，请执行 pip install waitress，或使用 gunicorn -c gunicorn.conf.py wsgi:app")
+        sys.exit(1)
+
+    logger.info(f"waitress 启动: {AppConfig.HOST}:{AppConfig.PORT}，线程数 {AppConfig.WSGI_THREADS}")
+    serve(app, host=AppConfig.HOST, port=AppConfig.PORT, threads=AppConfig.WSGI_THREADS)